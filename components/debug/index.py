@@ -1,11 +1,13 @@
 """This module contains the DebugUI class, which is responsible for 
 displaying the debug settings page."""
 
+from kivy.clock import Clock
 from kivy.logger import Logger
 from kivy.properties import BooleanProperty, StringProperty
 from kivy.uix.boxlayout import BoxLayout
 
 from helpers import load_kv_file_for_class, SettingsHandler, SettingsKeys
+from monitoring import SamplingProfiler
 
 load_kv_file_for_class("index.kv")
 
@@ -15,13 +17,18 @@ class DebugUI(BoxLayout):
 
     debug_mode = BooleanProperty(False)
     debug_mode_text = StringProperty("Debug mode - Not active")
+    profiler_text = StringProperty("")
 
-    def __init__(self, settings: SettingsHandler, **kwargs):
+    PROFILE_DURATION = 10
+
+    def __init__(self, settings: SettingsHandler, profiler: SamplingProfiler, **kwargs):
         super().__init__(**kwargs)
 
         self.settings = settings
+        self.profiler = profiler
         self.debug_mode = self.settings.get_value(SettingsKeys.DEBUG_MODE)
         self._update_debug_mode_text()
+        self._update_profiler_text()
 
     def toggle_debug_mode(self) -> None:
         """
@@ -32,6 +39,34 @@ class DebugUI(BoxLayout):
         Logger.info("Debug Component: Debug mode set to %s", self.debug_mode)
         self._update_debug_mode_text()
 
+    def start_profiling(self) -> None:
+        """
+        Profile the running application for a few seconds in the background.
+        """
+        if not self.profiler.start(self.PROFILE_DURATION, self._on_profile_complete):
+            return
+        Logger.info("Debug Component: Profiling for %s s", self.PROFILE_DURATION)
+        self._update_profiler_text()
+
+    def _on_profile_complete(self, path: str) -> None:
+        """
+        Called from the profiler thread once the profile is written.
+
+        :param path: The path of the written profile.
+        """
+        Clock.schedule_once(lambda dt: self._update_profiler_text(path))
+
+    def _update_profiler_text(self, path: str = None) -> None:
+        """
+        Update the profiler text.
+        """
+        if self.profiler.running:
+            self.profiler_text = "Profiling..."
+        elif path:
+            self.profiler_text = f"Profile saved - {path}"
+        else:
+            self.profiler_text = f"Profile flight loop ({self.PROFILE_DURATION} s)"
+
     def _update_debug_mode_text(self) -> None:
         """
         Update the debug mode text.
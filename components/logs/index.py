@@ -1,9 +1,100 @@
+"""This module contains the LogsUI class, which is responsible for 
+displaying the logs page."""
+
+from typing import Optional
+
+from kivy.clock import Clock
+from kivy.properties import StringProperty
 from kivy.uix.boxlayout import BoxLayout
 
-from helpers import load_kv_file_for_class
+from helpers import load_kv_file_for_class, LogReader
 
 load_kv_file_for_class("index.kv")
 
 class LogsUI(BoxLayout):
     """LogsUI class is a BoxLayout that displays the logs page 
-    of the application."""
+    of the application. Only one page of the log is read and rendered at a time."""
+
+    PAGE_SIZE = 200
+    LEVEL_FILTERS = (None, "INFO", "WARNING", "ERROR")
+
+    title_text = StringProperty("Logs")
+
+    def __init__(self, log_reader: LogReader, **kwargs):
+        super().__init__(**kwargs)
+
+        self.log_reader = log_reader
+        self.page: Optional[int] = None # None follows the last page
+        self.total_pages = 1
+        self.level_filter: Optional[str] = None
+        self.source_filter: Optional[str] = None
+
+        self._refresh_event = Clock.schedule_interval(self._refresh, 1)
+        self._refresh(0)
+
+    def previous_page(self) -> None:
+        """
+        Show the previous page of the log.
+        """
+        current_page = self.total_pages - 1 if self.page is None else self.page
+        self.page = max(current_page - 1, 0)
+        self._render()
+
+    def next_page(self) -> None:
+        """
+        Show the next page of the log, following new lines once the last page is reached.
+        """
+        if self.page is not None:
+            self.page += 1
+            if self.page >= self.total_pages - 1:
+                self.page = None
+        self._render()
+
+    def cycle_level_filter(self) -> None:
+        """
+        Switch to the next minimum level filter.
+        """
+        index = self.LEVEL_FILTERS.index(self.level_filter)
+        self.level_filter = self.LEVEL_FILTERS[(index + 1) % len(self.LEVEL_FILTERS)]
+        self.page = None
+        self._render()
+
+    def set_source_filter(self, source: str) -> None:
+        """
+        Show only the lines whose source starts with the given text.
+
+        :param source: The source prefix, an empty string shows all sources.
+        """
+        self.source_filter = source.strip() or None
+        self.page = None
+        self._render()
+
+    def on_parent(self, _, parent) -> None:
+        """
+        Stop tailing the log once the page is removed from the window.
+        """
+        if parent is None:
+            self._refresh_event.cancel()
+
+    # dt argument is required by Clock.schedule_interval
+    def _refresh(self, dt: float) -> None:# pylint: disable=[C0103,W0613]
+        """
+        Private method that indexes new log lines and re-renders when following the log.
+        """
+        new_lines = self.log_reader.refresh()
+        if dt == 0 or (new_lines and self.page is None):
+            self._render()
+
+    def _render(self) -> None:
+        """
+        Private method that renders the current page of the log.
+        """
+        page = -1 if self.page is None else self.page
+        lines, self.total_pages = self.log_reader.read_page(
+            page, self.PAGE_SIZE, self.level_filter, self.source_filter
+            )
+        self.ids.log_view.data = [{"text": line} for line in lines]
+
+        current_page = self.total_pages if self.page is None else self.page + 1
+        level = self.level_filter or "ALL"
+        self.title_text = f"Logs ({level}) {current_page}/{self.total_pages}"
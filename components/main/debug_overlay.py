@@ -0,0 +1,91 @@
+"""This module contains the DebugOverlay class, which is responsible for 
+displaying live metrics over the video feed in debug mode."""
+
+import time
+
+from kivymd.uix.label import MDLabel
+
+from monitoring import METRICS
+from monitoring.memory import MB
+
+
+class DebugOverlay(MDLabel):
+    """DebugOverlay class is a MDLabel that displays the FPS, stage latencies, drop counts,
+    command rate and memory footprint collected in the metrics registry."""
+
+    STAGES = (
+        ("Frame", "frame_processing_seconds"),
+        ("Preprocess", "detector_preprocess_seconds"),
+        ("Inference", "detector_inference_seconds"),
+        ("Postprocess", "detector_postprocess_seconds"),
+        ("Tracker", "tracker_seconds"),
+        ("Frame age", "frame_age_seconds"),
+        ("UI", "ui_frame_seconds"),
+        ("Preview", "ui_preview_seconds"),
+    )
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._previous_commands = 0
+        self._previous_time = time.monotonic()
+
+    # dt argument is required by Clock.schedule_interval
+    def refresh(self, dt: float) -> None:# pylint: disable=[C0103,W0613]
+        """
+        Refresh the displayed metrics.
+        """
+        now = time.monotonic()
+        elapsed = max(now - self._previous_time, 1e-6)
+        commands = METRICS.counter("rc_commands_total").value
+        command_rate = (commands - self._previous_commands) / elapsed
+        self._previous_commands = commands
+        self._previous_time = now
+
+        lines = [
+            f"FPS: {METRICS.gauge('ui_fps').value:.1f}",
+            f"RC commands: {command_rate:.1f}/s",
+        ]
+        for title, name in self.STAGES:
+            for labels, histogram in METRICS.find(name).items():
+                if not histogram.recent_count:
+                    continue
+                label = " ".join([title] + [value for _, value in labels])
+                lines.append(
+                    f"{label}: p50 {histogram.recent_quantile(0.5) * 1000:.1f} ms"
+                    f" p99 {histogram.recent_quantile(0.99) * 1000:.1f} ms"
+                    )
+        for name, title in (
+            ("frames_skipped_total", "Skipped frames"),
+            ("frames_duplicate_total", "Duplicate frames"),
+            ("log_records_dropped", "Dropped logs"),
+        ):
+            for _, metric in METRICS.find(name).items():
+                lines.append(f"{title}: {metric.value:.0f}")
+        lines.extend(self._memory_lines())
+
+        self.text = "\n".join(lines) # pylint: disable=W0201
+
+    @staticmethod
+    def _memory_lines() -> list:
+        """
+        Returns the lines of the resident memory against the budget, the TensorFlow allocator
+        and the footprint of every cached model and buffer.
+        """
+        sizes = METRICS.find("memory_bytes")
+        resident = METRICS.gauge("process_resident_bytes").value / MB
+        budget = METRICS.gauge("memory_budget_bytes").value / MB
+        tensorflow = METRICS.find("tensorflow_allocator_bytes")
+        lines = [
+            f"RSS: {resident:.0f} MB / {f'{budget:.0f} MB' if budget else 'no budget'}",
+            "TF allocator: " + (
+                f"{next(iter(tensorflow.values())).value / MB:.0f} MB" if tensorflow else "n/a"
+                ),
+        ]
+        for labels, gauge in sorted(sizes.items()):
+            if not gauge.value:
+                continue
+            label = dict(labels)
+            lines.append(
+                f"{label['category'].capitalize()} {label['item']}: {gauge.value / MB:.1f} MB"
+                )
+        return lines
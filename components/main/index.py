@@ -1,40 +1,41 @@
 """This module contains the MainUI class, which is responsible for displaying the main UI."""
 
-from collections import deque
 import threading
 
-import cv2
-
 from kivy.clock import Clock
-from kivy.graphics.texture import Texture
 from kivy.factory import Factory
+from kivy.logger import Logger
 from kivy.uix.floatlayout import FloatLayout
 
 # import backend
-from handlers import TelloHandler
+from handlers import FramePacket, TelemetrySnapshot, TelloHandler
 
 # import utilities
-from helpers import load_kv_file_for_class, SettingsHandler
+from helpers import load_kv_file_for_class, ModelsHandler, SettingsHandler, SettingsKeys
+from monitoring import METRICS
+from trackers import AcquisitionState
 
 # import components
 from .connection_dialog import DroneConnectionDialog
 from .connection_error_dialog import DroneConnectionErrorDialog
+from .debug_overlay import DebugOverlay # pylint: disable=W0611
 from .start_tracking_selection import StartTrackingSelectionDialog
 from .tracker_selection import TrackerSelectionDialog
+from .video_preview import VideoPreview
 from .video_selection import VideoSelectionDialog
 
 load_kv_file_for_class("index.kv")
 
 
-
-# pylint: disable=E1101
+# pylint: disable=E1101, R0902
 class MainUI(FloatLayout):
     """MainUI class is a FloatLayout that displays the main UI of the application."""
 
-    def __init__(self, settings: SettingsHandler, **kwargs):
+    def __init__(self, settings: SettingsHandler, models: ModelsHandler, **kwargs):
         super().__init__(**kwargs)
 
         self.settings = settings
+        self.models = models
         self.running = False
         self.drone = None
         self.detector = None
@@ -44,7 +45,11 @@ class MainUI(FloatLayout):
 
         self.start_tracking_dialog = StartTrackingSelectionDialog(self._set_detected)
         self.start_tracking_dialog_opened = False
-        self.detection_history = deque(maxlen=60)
+
+        self.debug_mode = bool(self.settings.get_value(SettingsKeys.DEBUG_MODE))
+        self.preview = VideoPreview(self.settings.get_value(SettingsKeys.PREVIEW_FPS))
+        self._frame_trigger = Clock.create_trigger(self._update_video_feed)
+        self._telemetry_trigger = Clock.create_trigger(self._update_telemetry)
 
     def button_handler(self) -> None:
         """
@@ -60,9 +65,13 @@ class MainUI(FloatLayout):
         Private method that stops the drone and the video feed.
         """
         self._update_running_status()
-        Clock.unschedule(self._update_video_feed)
-        Clock.unschedule(self._update_battery)
-        Clock.unschedule(self._update_temperature)
+        self.drone.get_frame_read().remove_listener(self._on_new_frame)
+        self._frame_trigger.cancel()
+        self.drone.telemetry.remove_listener(self._on_telemetry)
+        self._telemetry_trigger.cancel()
+        Clock.unschedule(self.debug_overlay.refresh)
+        self.debug_overlay.opacity = 0
+        self.preview.reset()
         self.drone.disconnect()
         self.running = False
         self.drone = None
@@ -92,8 +101,9 @@ class MainUI(FloatLayout):
             Clock.schedule_once(lambda dt: self._modify_status("Connected."))
 
             # Start listening to the drone
-            Clock.schedule_interval(self._update_battery, 1)
-            Clock.schedule_interval(self._update_temperature, 1)
+            self.drone.telemetry.add_listener(self._on_telemetry)
+            # The state read before the listener was added is only notified once it changes
+            self._telemetry_trigger()
             Clock.schedule_once(lambda dt: self._show_tracker_selection_dialog())
         except Exception:#pylint: disable=W0703
             Clock.schedule_once(lambda dt: self._modify_status("Connection failed."))
@@ -107,10 +117,13 @@ class MainUI(FloatLayout):
         """
 
         def set_tracker(tracker: str) -> None:
-            settings = None
-            if tracker == 'human_tracker':
-                settings = self.settings.read_data()
+            settings = self.settings.read_data()
             self.drone.set_detector_and_tracker(tracker, settings)
+            if settings.get(SettingsKeys.TARGET_FPS.value):
+                models = self.models.read_data() if tracker == 'human_tracker' else None
+                self.drone.enable_quality_governor(
+                    float(settings[SettingsKeys.TARGET_FPS.value]), models
+                    )
             self._show_video_selection_dialog()
 
         tracker_dialog = TrackerSelectionDialog(set_tracker)
@@ -126,34 +139,84 @@ class MainUI(FloatLayout):
                 self.drone.record_video = True
             else:
                 self.drone.record_video = False
-            self.drone.initiate_video_stream()
-            self._update_running_status()
-            self.drone.takeoff_and_hover()
-            Clock.schedule_interval(self._update_video_feed, 1 / 30)
+            self._modify_status("Loading detector...")
+            threading.Thread(target=self._start_flight, daemon=True).start()
 
         video_dialog = VideoSelectionDialog(set_video_record)
         video_dialog.open()
 
-    # dt argument is required by Clock.schedule_interval
-    def _update_video_feed(self, dt):# pylint: disable=[C0103,W0613]
-        detected, img = self.drone.detect_and_track(self.detected)
+    def _start_flight(self) -> None:
+        """
+        Private method that starts the video stream and takes off once the detector is loaded.
+        Needed as waiting for the detector must not block the UI thread.
+        Whatever was started is stopped again when loading or takeoff fails.
+        """
+        try:
+            self.drone.initiate_video_stream()
+        except Exception as exc:#pylint: disable=W0703
+            Logger.error("Main Component: Detector could not be loaded - %s", exc)
+            self.drone.stop_video_stream()
+            Clock.schedule_once(lambda dt: self._modify_status("Detector loading failed."))
+            return
 
-        self.detection_history.append(detected)
+        Clock.schedule_once(lambda dt: self._modify_status("Taking off..."))
+        try:
+            self.drone.takeoff_and_hover()
+        except Exception as exc:#pylint: disable=W0703
+            Logger.error("Main Component: Takeoff failed - %s", exc)
+            self.drone.command_scheduler.stop()
+            self.drone.stop_video_stream()
+            Clock.schedule_once(lambda dt: self._modify_status("Takeoff failed."))
+            return
 
-        at_least_once_detected = True in self.detection_history
+        Clock.schedule_once(lambda dt: self._update_running_status())
+        Clock.schedule_once(lambda dt: self._start_video_feed())
 
-        if not self.detected and at_least_once_detected and not self.start_tracking_dialog_opened:
+    def _start_video_feed(self) -> None:
+        """
+        Private method that starts updating the video feed on every new frame and,
+        in debug mode, the metrics overlay.
+        """
+        self.drone.get_frame_read().add_listener(self._on_new_frame)
+        if self.debug_mode:
+            self.debug_overlay.opacity = 1
+            Clock.schedule_interval(self.debug_overlay.refresh, 1)
+
+    def _on_new_frame(self, _) -> None:
+        """
+        Private method called from the decoding thread for every new frame. Triggers are
+        coalesced, so frames decoded faster than they are processed only trigger one update.
+        """
+        self._frame_trigger()
+
+    # dt argument is required by Clock triggers
+    def _update_video_feed(self, dt):# pylint: disable=[C0103,W0613]
+        packet = self.drone.get_frame_read().latest()
+        if not self.preview.accept(packet):
+            return
+        with METRICS.timer("ui_frame_seconds"):
+            self._process_video_frame(packet)
+        self.preview.frame_done()
+
+    def _process_video_frame(self, packet: FramePacket) -> None:
+        """
+        Private method that detects and tracks on the given frame and shows the result,
+        at most at the preview frame rate.
+        """
+        _, img = self.drone.detect_and_track(self.detected, packet)
+
+        # Debounced by the acquisition state machine, in seconds rather than frames
+        state = self.drone.acquisition.state
+        confirmed = state is AcquisitionState.CONFIRMED
+        gone = state in (AcquisitionState.SEARCHING, AcquisitionState.LOST)
+        if not self.detected and confirmed and not self.start_tracking_dialog_opened:
             self.start_tracking_dialog_opened = True
             self.start_tracking_dialog.open()
-        elif not self.detected and not at_least_once_detected and self.start_tracking_dialog_opened:
+        elif not self.detected and gone and self.start_tracking_dialog_opened:
             self.start_tracking_dialog.dismiss()
             self.start_tracking_dialog_opened = False
 
-        buf1 = cv2.flip(img, 0)
-        buf = buf1.tostring()
-        texture = Texture.create(size=(img.shape[1], img.shape[0]), colorfmt="bgr")
-        texture.blit_buffer(buf, colorfmt="bgr", bufferfmt="ubyte")
-        self.video.texture = texture
+        self.preview.show(img, self.video)
 
     def _set_detected(self, detected: bool) -> None:
         print(detected)
@@ -161,11 +224,26 @@ class MainUI(FloatLayout):
         self.start_tracking_dialog.dismiss()
         self.start_tracking_dialog_opened = False
 
-    def _update_battery(self, dt: float) -> None:# pylint: disable=[C0103,W0613]
-        self.battery.text = f"Battery: {self.drone.get_battery()}%"
-
-    def _update_temperature(self, dt: float) -> None:# pylint: disable=[C0103,W0613]
-        self.temperature.text = f"Temperature: {self.drone.get_temperature()}"
+    def _on_telemetry(self, _: TelemetrySnapshot) -> None:
+        """
+        Private method called from the telemetry thread when the drone state changes.
+        Triggers are coalesced, so bursts of changes only update the labels once per frame.
+        """
+        self._telemetry_trigger()
+
+    def _update_telemetry(self, dt: float) -> None:# pylint: disable=[C0103,W0613]
+        if self.drone is None or self.drone.telemetry.latest is None:
+            return
+        snapshot = self.drone.telemetry.latest
+        self.battery.text = f"Battery: {snapshot.battery}%"
+        self.temperature.text = f"Temperature: {snapshot.temperature}"
+        flight_data = (
+            f"Height: {snapshot.height} cm   TOF: {snapshot.time_of_flight} cm   "
+            f"Pitch/Roll/Yaw: {snapshot.pitch}/{snapshot.roll}/{snapshot.yaw}°"
+        )
+        if snapshot.wifi_snr is not None:
+            flight_data += f"   Wi-Fi SNR: {snapshot.wifi_snr}"
+        self.flight_data.text = flight_data
 
     def _modify_status(self, new_status: str) -> None:
         """Modifies the status of the application.
@@ -14,7 +14,7 @@ class TrackerSelectionDialog(MDDialog):
     def __init__(self, callback: Callable, **kwargs):
         super().__init__(
             title="Select Tracker Mode",
-            text="Choose between Face Tracker Mode or Human Tracker Mode:",
+            text="Choose between Face Tracker Mode, Human Tracker Mode or Combined Mode:",
             type="custom",
             buttons=[
                 MDFlatButton(
@@ -22,6 +22,10 @@ class TrackerSelectionDialog(MDDialog):
                 ),
                 MDFlatButton(
                     text="Human Tracker", on_release=lambda x: (callback("human_tracker"), self.dismiss())
+                ),
+                MDFlatButton(
+                    text="Combined",
+                    on_release=lambda x: (callback("combined_tracker"), self.dismiss())
                 )
             ],
             **kwargs
@@ -0,0 +1,102 @@
+"""This module contains the VideoPreview class, which is responsible for showing the
+processed frames in the video widget and for the frame metrics of the video feed."""
+
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from kivy.graphics.texture import Texture
+
+from handlers import FramePacket
+from monitoring import METRICS
+
+DEFAULT_PREVIEW_FPS = 15
+# Fraction of the preview interval a frame may arrive early, so the jitter of the decoded
+# frames does not drop the preview to a fraction of its rate
+PREVIEW_TOLERANCE = 0.25
+
+
+class VideoPreview:
+    """VideoPreview class counts the frames of the video feed and shows them in the video
+    widget, downscaled to its pixel size and at most at the preview frame rate."""
+
+    def __init__(self, preview_fps: Optional[float] = None) -> None:
+        """
+        :param preview_fps: The maximum number of frames shown per second.
+        """
+        self.interval = 1 / float(preview_fps or DEFAULT_PREVIEW_FPS)
+        self._last_frame_time = None
+        self._last_sequence = None
+        self._next_preview_time = 0.0
+        self._texture = None
+        self._buffer = None
+
+    def accept(self, packet: FramePacket) -> bool:
+        """
+        Records the metrics of a new frame, unless it was already processed.
+        :param packet: The latest decoded frame.
+        :return: Whether the frame is new.
+        """
+        if packet.sequence == self._last_sequence:
+            METRICS.counter("frames_duplicate_total", "Updates without a new frame").inc()
+            return False
+        if self._last_sequence is not None and packet.sequence > self._last_sequence + 1:
+            METRICS.counter("frames_skipped_total", "Decoded frames never processed").inc(
+                packet.sequence - self._last_sequence - 1
+                )
+        self._last_sequence = packet.sequence
+        METRICS.histogram("frame_age_seconds", "Time from decoding to processing").observe(
+            time.monotonic() - packet.timestamp
+            )
+        return True
+
+    def frame_done(self) -> None:
+        """
+        Records the end of the processing of a frame in the FPS of the video feed.
+        """
+        now = time.perf_counter()
+        if self._last_frame_time is not None:
+            fps = METRICS.gauge("ui_fps", "Frames shown per second")
+            current_fps = 1 / max(now - self._last_frame_time, 1e-6)
+            fps.set(0.9 * fps.value + 0.1 * current_fps if fps.value else current_fps)
+        self._last_frame_time = now
+        METRICS.counter("ui_frames_total", "Frames shown in the video feed").inc()
+
+    def show(self, img: np.ndarray, video) -> None:
+        """
+        Shows the frame in the video widget when the preview is due. The texture and the resize
+        buffer are reused as long as the size does not change.
+        :param img: The BGR frame.
+        :param video: The image widget showing the preview.
+        """
+        now = time.perf_counter()
+        if now < self._next_preview_time:
+            return
+        self._next_preview_time = now + self.interval * (1 - PREVIEW_TOLERANCE)
+
+        with METRICS.timer("ui_preview_seconds"):
+            height, width = img.shape[:2]
+            scale = min(video.width / width, video.height / height, 1)
+            size = (max(int(width * scale), 1), max(int(height * scale), 1))
+            if size != (width, height):
+                if self._buffer is None or self._buffer.shape[:2] != size[::-1]:
+                    self._buffer = np.empty((size[1], size[0], 3), dtype=np.uint8)
+                img = cv2.resize(img, size, dst=self._buffer, interpolation=cv2.INTER_AREA)
+
+            if self._texture is None or tuple(self._texture.size) != size:
+                self._texture = Texture.create(size=size, colorfmt="bgr")
+                # Flipped by the texture coordinates instead of flipping every frame
+                self._texture.flip_vertical()
+                video.texture = self._texture
+            self._texture.blit_buffer(img.tobytes(), colorfmt="bgr", bufferfmt="ubyte")
+            video.canvas.ask_update()
+
+    def reset(self) -> None:
+        """
+        Forgets the frames of the previous flight, the texture is kept for the next one.
+        """
+        self._last_frame_time = None
+        self._last_sequence = None
+        self._next_preview_time = 0.0
@@ -3,12 +3,21 @@ displaying the models download UI."""
 
 from typing import Callable
 
+from kivy.clock import Clock
+from kivy.logger import Logger
 from kivy.properties import ObjectProperty
 from kivy.uix.boxlayout import BoxLayout
 from kivymd.uix.selectioncontrol import MDCheckbox
 from kivymd.uix.list import IRightBodyTouch, TwoLineAvatarIconListItem
 
-from helpers import load_kv_file_for_class, ModelDownloader, ModelsHandler
+from helpers import (
+    benchmark_sort_key,
+    format_benchmark,
+    load_kv_file_for_class,
+    ModelBenchmark,
+    ModelDownloader,
+    ModelsHandler
+)
 
 load_kv_file_for_class("index.kv")
 
@@ -23,8 +32,9 @@ class ModelListItem(TwoLineAvatarIconListItem):
         self.download_link = model["download_link"]
         self.text = model["model_name"]
         self.secondary_text = (
-            f"Size: {model['size']} "
-            f"Speed: {model['speed']} ms "
+            ("Downloaded " if model["downloaded"] else "")
+            + f"Size: {model['size']} "
+            f"{format_benchmark(model)}"
             f"Output: {model['output']} "
             f"CocoMap: {model['coco_map']} "
         )
@@ -79,16 +89,35 @@ class ModelsDownloadUI(BoxLayout):
         downloader = ModelDownloader(self.data_path, self.model_handler, callback=on_complete)
         downloader.download_models_threaded(self.selected_models.values())
 
+    def benchmark_downloaded_models(self):
+        """
+        Benchmarks the downloaded models on this machine and refreshes the list once done.
+        """
+
+        def on_model_complete(model_name):
+            Logger.info("Models Download Component: Benchmarked %s", model_name)
+
+        benchmark = ModelBenchmark(self.model_handler, callback=on_model_complete)
+        benchmark.benchmark_models_threaded(
+            on_complete=lambda: Clock.schedule_once(lambda dt: self._populate_list())
+            )
+
     def _populate_list(self) -> None:
         """
         Private method that populates the list of models to download from the models.json file.
         """
+        self.selection_list.clear_widgets()
+        self.selected_models.clear()
         data = self.model_handler.read_data()
-        for model in data.values():
+        # Downloaded models first, with their benchmark, fastest first
+        models = sorted(
+            data.values(), key=lambda model: (not model["downloaded"], benchmark_sort_key(model))
+            )
+        for model in models:
+            list_item = ModelListItem(model)
             if not model["downloaded"]:
-                list_item = ModelListItem(model)
                 list_item.add_widget(ModelListItemRight(model, self._on_model_check))
-                self.selection_list.add_widget(list_item)
+            self.selection_list.add_widget(list_item)
 
     # TODO: Unify doc-strings
     def _on_model_check(self, model: dict, is_checked: bool) -> None:
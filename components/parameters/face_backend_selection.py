@@ -0,0 +1,44 @@
+"""This module contains the FaceBackendSelectionDialog class, which is responsible for 
+displaying the dialog for selecting the Mediapipe face detection backend."""
+
+from typing import Callable
+
+from kivymd.uix.dialog import MDDialog
+from kivymd.uix.button import MDFlatButton
+
+
+class FaceBackendSelectionDialog(MDDialog):
+    """FaceBackendSelectionDialog class is a MDDialog that displays the face detection
+    backend selection dialog to the application. The live stream backend is only offered
+    when the installed mediapipe provides it."""
+
+    def __init__(self, callback: Callable, live_stream_available: bool, **kwargs):
+        buttons = [
+            MDFlatButton(
+                text="SOLUTIONS",
+                on_release=lambda x: (callback("solutions"), self.dismiss())
+            )
+        ]
+        if live_stream_available:
+            text = (
+                "Solutions processes every frame synchronously. Live stream runs detection "
+                "asynchronously."
+            )
+            buttons.append(
+                MDFlatButton(
+                    text="LIVE STREAM",
+                    on_release=lambda x: (callback("live_stream"), self.dismiss())
+                )
+            )
+        else:
+            text = (
+                "Solutions processes every frame synchronously. The asynchronous live stream "
+                "backend needs mediapipe 0.10 or newer."
+            )
+        super().__init__(
+            title="Face detection backend",
+            text=text,
+            type="custom",
+            buttons=buttons,
+            **kwargs
+        )
@@ -0,0 +1,33 @@
+"""This module contains the FaceRangeInputDialog class, which is responsible for 
+displaying the face area input dialog for switching between face detection models."""
+
+from typing import Callable
+
+from kivymd.uix.dialog import MDDialog
+from kivymd.uix.textfield import MDTextField
+from kivymd.uix.button import MDFlatButton
+
+
+class FaceRangeInputDialog(MDDialog):
+    """FaceRangeInputDialog class is a MDDialog that displays the face area input dialog 
+    to the application."""
+
+    def __init__(self, callback: Callable, **kwargs):
+        face_area_input = MDTextField(
+            hint_text="Face area for short range, 0 to 1 (empty resets, 0 disables)",
+            mode="rectangle"
+            )
+        super().__init__(
+            title="Short Range Face Area",
+            type="custom",
+            content_cls=face_area_input,
+            buttons=[
+                MDFlatButton(text="CANCEL", on_release=lambda x: self.dismiss()),
+                MDFlatButton(text="OK", on_release=lambda x: (
+                                callback(face_area_input.text),
+                                self.dismiss()
+                                )
+                             ),
+            ],
+            **kwargs
+        )
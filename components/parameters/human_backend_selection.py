@@ -0,0 +1,50 @@
+"""This module contains the HumanBackendSelectionDialog class, which is responsible for
+displaying the dialog for selecting the human detection runtime."""
+
+from typing import Callable
+
+from kivymd.uix.dialog import MDDialog
+from kivymd.uix.button import MDFlatButton
+
+
+class HumanBackendSelectionDialog(MDDialog):
+    """HumanBackendSelectionDialog class is a MDDialog that displays the human detection
+    backend selection dialog to the application. The OpenCV backends are only offered
+    when the selected model has an OpenCV export."""
+
+    def __init__(self, callback: Callable, opencv_available: bool, **kwargs):
+        buttons = [
+            MDFlatButton(
+                text="TENSORFLOW",
+                on_release=lambda x: (callback("tensorflow", "cpu"), self.dismiss())
+            )
+        ]
+        if opencv_available:
+            text = (
+                "TensorFlow runs the downloaded saved model. OpenCV runs the model exported "
+                "to the opencv directory next to it without loading TensorFlow, on the CPU "
+                "or through OpenCL."
+            )
+            buttons += [
+                MDFlatButton(
+                    text="OPENCV CPU",
+                    on_release=lambda x: (callback("opencv", "cpu"), self.dismiss())
+                ),
+                MDFlatButton(
+                    text="OPENCV OPENCL",
+                    on_release=lambda x: (callback("opencv", "opencl"), self.dismiss())
+                )
+            ]
+        else:
+            text = (
+                "TensorFlow runs the downloaded saved model. The OpenCV backend needs an "
+                "ONNX export of the selected model, written after the download when tf2onnx "
+                "is installed."
+            )
+        super().__init__(
+            title="Human detection backend",
+            text=text,
+            type="custom",
+            buttons=buttons,
+            **kwargs
+        )
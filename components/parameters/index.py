@@ -4,11 +4,20 @@ displaying the parameters settings page."""
 from kivy.logger import Logger
 from kivy.uix.boxlayout import BoxLayout
 
-from helpers import load_kv_file_for_class, SettingsKeys
+from detectors.live_face_detector import live_stream_available
+from detectors.opencv_dnn import has_opencv_export, opencv_model_dir
+from helpers import benchmark_sort_key, load_kv_file_for_class, SettingsKeys
 
 from .height_input import HeightInputDialog
 from .tracking_input import TrackingInputDialog
 from .model_selection import ModelSelectionDialog, ItemConfirm
+from .target_fps_input import TargetFpsInputDialog
+from .preview_fps_input import PreviewFpsInputDialog
+from .face_range_input import FaceRangeInputDialog
+from .face_backend_selection import FaceBackendSelectionDialog
+from .inference_workers_input import InferenceWorkersInputDialog
+from .human_backend_selection import HumanBackendSelectionDialog
+from .memory_budget_input import MemoryBudgetInputDialog
 
 load_kv_file_for_class("index.kv")
 
@@ -65,13 +74,20 @@ class ParametersUI(BoxLayout):
             SettingsKeys.SELECTED_OBJECT_DETECTION_MODEL
             )
 
+        # Fastest on this machine first, the models not benchmarked yet last
+        downloaded = sorted(
+            (model for model in self.main_app.models_handler.read_data().values()
+             if model["downloaded"]),
+            key=benchmark_sort_key,
+        )
         items = []
-        index = 0
-        for model in self.main_app.models_handler.read_data().values():
-            if model["downloaded"]:
-                active = model == current_settings if current_settings else index == 0
-                items.append(ItemConfirm(model, self, active))
-                index += 1
+        for index, model in enumerate(downloaded):
+            # Compared by name, the stored copy may predate the latest benchmark
+            active = (
+                model["model_name"] == current_settings["model_name"]
+                if current_settings else index == 0
+            )
+            items.append(ItemConfirm(model, self, active))
 
         dialog = ModelSelectionDialog(items, self.save_model_selection)
         dialog.open()
@@ -83,3 +99,126 @@ class ParametersUI(BoxLayout):
             SettingsKeys.SELECTED_OBJECT_DETECTION_MODEL,
             self.selected_model
         )
+
+    def show_target_fps_input(self) -> None:
+        """Show the target FPS input dialog for the adaptive quality governor."""
+        Logger.info("Parameters Component: Showing target FPS input dialog")
+        dialog = TargetFpsInputDialog(self.save_target_fps)
+        dialog.open()
+
+    def save_target_fps(self, target_fps: str) -> None:
+        """
+        Save the entered target FPS, an empty value or 0 disables the quality governor.
+
+        :param target_fps: The target FPS.
+        """
+        Logger.info("Parameters Component: Saving target FPS: %s", target_fps)
+        value = float(target_fps) if target_fps.strip() else 0
+        self.main_app.settings_handler.set_value(SettingsKeys.TARGET_FPS, value or None)
+
+    def show_preview_fps_input(self) -> None:
+        """Show the input dialog for the frame rate of the video preview."""
+        Logger.info("Parameters Component: Showing preview FPS input dialog")
+        dialog = PreviewFpsInputDialog(self.save_preview_fps)
+        dialog.open()
+
+    def save_preview_fps(self, preview_fps: str) -> None:
+        """
+        Save the frame rate of the video preview, an empty value or 0 uses the default.
+        Detection and tracking keep running on every frame.
+
+        :param preview_fps: The preview FPS.
+        """
+        Logger.info("Parameters Component: Saving preview FPS: %s", preview_fps)
+        value = float(preview_fps) if preview_fps.strip() else 0
+        self.main_app.settings_handler.set_value(SettingsKeys.PREVIEW_FPS, value or None)
+
+    def show_face_range_input(self) -> None:
+        """Show the face area input dialog for switching between face detection models."""
+        Logger.info("Parameters Component: Showing face range input dialog")
+        dialog = FaceRangeInputDialog(self.save_face_range)
+        dialog.open()
+
+    def save_face_range(self, area: str) -> None:
+        """
+        Save the relative face area from which the short-range face detection model is used,
+        an empty value resets it to the default and 0 always uses the full-range model.
+
+        :param area: The relative face area.
+        """
+        Logger.info("Parameters Component: Saving face range switch area: %s", area)
+        value = float(area) if area.strip() else None
+        self.main_app.settings_handler.set_value(SettingsKeys.FACE_RANGE_SWITCH_AREA, value)
+
+    def show_face_backend_selection(self) -> None:
+        """Show the dialog for choosing the face detection backend."""
+        Logger.info("Parameters Component: Showing face backend selection dialog")
+        dialog = FaceBackendSelectionDialog(self.save_face_backend, live_stream_available())
+        dialog.open()
+
+    def save_face_backend(self, backend: str) -> None:
+        """
+        Save the selected face detection backend.
+
+        :param backend: The backend, either solutions or live_stream.
+        """
+        Logger.info("Parameters Component: Saving face detection backend: %s", backend)
+        self.main_app.settings_handler.set_value(SettingsKeys.FACE_DETECTOR_BACKEND, backend)
+
+    def show_inference_workers_input(self) -> None:
+        """Show the input dialog for the number of inference worker processes."""
+        Logger.info("Parameters Component: Showing inference workers input dialog")
+        dialog = InferenceWorkersInputDialog(self.save_inference_workers)
+        dialog.open()
+
+    def save_inference_workers(self, workers: str) -> None:
+        """
+        Save the number of inference worker processes, an empty value or 0 runs
+        the detector in the application process.
+
+        :param workers: The number of worker processes.
+        """
+        Logger.info("Parameters Component: Saving inference workers: %s", workers)
+        value = int(workers) if workers.strip() else 0
+        self.main_app.settings_handler.set_value(SettingsKeys.INFERENCE_WORKERS, value or None)
+
+    def show_human_backend_selection(self) -> None:
+        """Show the dialog for choosing the human detection backend."""
+        Logger.info("Parameters Component: Showing human backend selection dialog")
+        selected_model = self.main_app.settings_handler.get_value(
+            SettingsKeys.SELECTED_OBJECT_DETECTION_MODEL
+            )
+        opencv_available = bool(selected_model) and has_opencv_export(
+            opencv_model_dir(selected_model["downloaded_path"])
+            )
+        dialog = HumanBackendSelectionDialog(self.save_human_backend, opencv_available)
+        dialog.open()
+
+    def save_human_backend(self, backend: str, dnn_target: str) -> None:
+        """
+        Save the selected human detection backend.
+
+        :param backend: The backend, either tensorflow or opencv.
+        :param dnn_target: The OpenCV DNN target of the opencv backend.
+        """
+        Logger.info(
+            "Parameters Component: Saving human detection backend: %s (%s)", backend, dnn_target
+            )
+        self.main_app.settings_handler.set_value(SettingsKeys.HUMAN_DETECTOR_BACKEND, backend)
+        self.main_app.settings_handler.set_value(SettingsKeys.DNN_TARGET, dnn_target)
+
+    def show_memory_budget_input(self) -> None:
+        """Show the input dialog for the memory budget of the application."""
+        Logger.info("Parameters Component: Showing memory budget input dialog")
+        dialog = MemoryBudgetInputDialog(self.save_memory_budget)
+        dialog.open()
+
+    def save_memory_budget(self, budget: str) -> None:
+        """
+        Save the memory budget, an empty value or 0 disables the budget.
+
+        :param budget: The resident memory budget in MB.
+        """
+        Logger.info("Parameters Component: Saving memory budget: %s", budget)
+        value = int(budget) if budget.strip() else 0
+        self.main_app.settings_handler.set_value(SettingsKeys.MEMORY_BUDGET_MB, value or None)
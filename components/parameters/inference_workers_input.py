@@ -0,0 +1,33 @@
+"""This module contains the InferenceWorkersInputDialog class, which is responsible for 
+displaying the input dialog for the number of inference worker processes."""
+
+from typing import Callable
+
+from kivymd.uix.dialog import MDDialog
+from kivymd.uix.textfield import MDTextField
+from kivymd.uix.button import MDFlatButton
+
+
+class InferenceWorkersInputDialog(MDDialog):
+    """InferenceWorkersInputDialog class is a MDDialog that displays the inference worker
+    processes input dialog to the application."""
+
+    def __init__(self, callback: Callable, **kwargs):
+        workers_input = MDTextField(
+            hint_text="Enter worker processes (empty or 0 runs inference in the app)",
+            mode="rectangle"
+            )
+        super().__init__(
+            title="Inference Worker Processes",
+            type="custom",
+            content_cls=workers_input,
+            buttons=[
+                MDFlatButton(text="CANCEL", on_release=lambda x: self.dismiss()),
+                MDFlatButton(text="OK", on_release=lambda x: (
+                                callback(workers_input.text),
+                                self.dismiss()
+                                )
+                             ),
+            ],
+            **kwargs
+        )
@@ -0,0 +1,33 @@
+"""This module contains the MemoryBudgetInputDialog class, which is responsible for 
+displaying the input dialog for the memory budget of the application."""
+
+from typing import Callable
+
+from kivymd.uix.dialog import MDDialog
+from kivymd.uix.textfield import MDTextField
+from kivymd.uix.button import MDFlatButton
+
+
+class MemoryBudgetInputDialog(MDDialog):
+    """MemoryBudgetInputDialog class is a MDDialog that displays the memory budget
+    input dialog to the application."""
+
+    def __init__(self, callback: Callable, **kwargs):
+        budget_input = MDTextField(
+            hint_text="Enter memory budget in MB (empty or 0 disables the budget)",
+            mode="rectangle"
+            )
+        super().__init__(
+            title="Memory Budget",
+            type="custom",
+            content_cls=budget_input,
+            buttons=[
+                MDFlatButton(text="CANCEL", on_release=lambda x: self.dismiss()),
+                MDFlatButton(text="OK", on_release=lambda x: (
+                                callback(budget_input.text),
+                                self.dismiss()
+                                )
+                             ),
+            ],
+            **kwargs
+        )
@@ -7,6 +7,8 @@ from kivymd.uix.dialog import MDDialog
 from kivymd.uix.button import MDFlatButton
 from kivymd.uix.list import TwoLineAvatarIconListItem
 
+from helpers import format_benchmark
+
 
 class ItemConfirm(TwoLineAvatarIconListItem):
     """ItemConfirm class is a TwoLineAvatarIconListItem that generates a new list item."""
@@ -25,7 +27,7 @@ class ItemConfirm(TwoLineAvatarIconListItem):
         self.text = model["model_name"]
         self.secondary_text = (
             f"Size: {model['size']} "
-            f"Speed: {model['speed']} ms "
+            f"{format_benchmark(model)}"
             f"Output: {model['output']} "
             f"CocoMap: {model['coco_map']}"
         )
@@ -0,0 +1,33 @@
+"""This module contains the PreviewFpsInputDialog class, which is responsible for 
+displaying the input dialog for the frame rate of the video preview."""
+
+from typing import Callable
+
+from kivymd.uix.dialog import MDDialog
+from kivymd.uix.textfield import MDTextField
+from kivymd.uix.button import MDFlatButton
+
+
+class PreviewFpsInputDialog(MDDialog):
+    """PreviewFpsInputDialog class is a MDDialog that displays the preview FPS input dialog 
+    to the application."""
+
+    def __init__(self, callback: Callable, **kwargs):
+        preview_fps_input = MDTextField(
+            hint_text="Enter preview FPS (empty or 0 uses the default)",
+            mode="rectangle"
+            )
+        super().__init__(
+            title="Preview FPS",
+            type="custom",
+            content_cls=preview_fps_input,
+            buttons=[
+                MDFlatButton(text="CANCEL", on_release=lambda x: self.dismiss()),
+                MDFlatButton(text="OK", on_release=lambda x: (
+                                callback(preview_fps_input.text),
+                                self.dismiss()
+                                )
+                             ),
+            ],
+            **kwargs
+        )
@@ -0,0 +1,33 @@
+"""This module contains the TargetFpsInputDialog class, which is responsible for 
+displaying the target FPS input dialog for the adaptive quality governor."""
+
+from typing import Callable
+
+from kivymd.uix.dialog import MDDialog
+from kivymd.uix.textfield import MDTextField
+from kivymd.uix.button import MDFlatButton
+
+
+class TargetFpsInputDialog(MDDialog):
+    """TargetFpsInputDialog class is a MDDialog that displays the target FPS input dialog 
+    to the application."""
+
+    def __init__(self, callback: Callable, **kwargs):
+        target_fps_input = MDTextField(
+            hint_text="Enter target FPS (empty or 0 disables)",
+            mode="rectangle"
+            )
+        super().__init__(
+            title="Target FPS",
+            type="custom",
+            content_cls=target_fps_input,
+            buttons=[
+                MDFlatButton(text="CANCEL", on_release=lambda x: self.dismiss()),
+                MDFlatButton(text="OK", on_release=lambda x: (
+                                callback(target_fps_input.text),
+                                self.dismiss()
+                                )
+                             ),
+            ],
+            **kwargs
+        )
@@ -1,3 +1,8 @@
 """This module contains the classes for the face and object detectors."""
+from .base_detector import BaseDetector, DetectionResult
+from .combined_detector import CombinedDetector
 from .face_detector import FaceDetector
 from .human_detector import HumanDetector
+from .live_face_detector import LiveStreamFaceDetector
+from .model_registry import MODEL_REGISTRY, ModelRegistry
+from .preprocessing import Preprocessor
@@ -0,0 +1,223 @@
+"""
+Command-line analyzer running a detector over recorded videos in parallel.
+
+Every video is split into frame ranges that are processed across a pool of processes,
+and the per-frame detections are written to a columnar .npz file per video.
+
+Usage: python -m detectors.analyze [videos ...] [--detector face|human] [--workers N]
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import glob
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from pipeline import ThreadConfig, apply_thread_config
+
+DEFAULT_VIDEOS_PATH = "videos"
+DEFAULT_OUTPUT_PATH = "analysis"
+DEFAULT_CHUNK_FRAMES = 300
+
+COLUMNS = {
+    "frame": np.int32,
+    "detected": np.bool_,
+    "center_x": np.int32,
+    "center_y": np.int32,
+    "metric": np.float32, # face area or human bounding box height
+    "latency": np.float32, # in seconds
+}
+
+# Detector of the worker process, created once by _init_worker
+_detector = None # pylint: disable=C0103
+
+
+def _init_worker(
+    detector_name: str, model_path: Optional[str], model_size: Tuple[int, int], threshold: float
+) -> None:
+    """
+    Create the detector of a worker process. Every worker gets a single inference thread,
+    so the processes do not compete for the same cores.
+    :param detector_name: the detector to use, face or human
+    :param model_path: the path to the saved model for the human detector
+    :param model_size: the width and height of the model input for the human detector
+    :param threshold: the minimum confidence score for a detection to be considered valid
+    """
+    global _detector # pylint: disable=W0603
+
+    # pylint: disable=C0415
+    if detector_name == "human":
+        apply_thread_config(ThreadConfig(tf_intra_op=1, tf_inter_op=1, opencv_threads=1))
+        from . import HumanDetector
+        width, height = model_size
+        _detector = HumanDetector(model_path, height, width, threshold)
+    else:
+        apply_thread_config(ThreadConfig(opencv_threads=1))
+        from . import FaceDetector
+        _detector = FaceDetector(threshold)
+
+
+def _open_at(video_path: str, start: int) -> cv2.VideoCapture:
+    """
+    Open the video positioned on the given frame. Seeking is not frame-accurate for every
+    codec, in which case the frames before the start are decoded and skipped.
+    :param video_path: the path to the video
+    :param start: the index of the first frame to read
+    :return: the VideoCapture instance
+    """
+    cap = cv2.VideoCapture(video_path)
+    if start == 0:
+        return cap
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) != start:
+        cap.release()
+        cap = cv2.VideoCapture(video_path)
+        for _ in range(start):
+            cap.grab()
+    return cap
+
+
+def _analyze_range(video_path: str, start: int, end: int) -> Dict[str, np.ndarray]:
+    """
+    Run the detector of the worker over a range of frames.
+    :param video_path: the path to the video
+    :param start: the index of the first frame
+    :param end: the index after the last frame
+    :return: the detection columns of the frames read
+    """
+    columns = {name: np.zeros(end - start, dtype=dtype) for name, dtype in COLUMNS.items()}
+    # The ranges of a worker are not consecutive, the face model selection must not carry over
+    if hasattr(_detector, "reset_range_selection"):
+        _detector.reset_range_selection()
+    cap = _open_at(video_path, start)
+    count = 0
+    while start + count < end:
+        success, img = cap.read()
+        if not success:
+            break
+        inference_start = time.perf_counter()
+        detected, _, center, metric = _detector.predict(img)
+        row = (
+            start + count, detected, center[0], center[1], metric,
+            time.perf_counter() - inference_start,
+        )
+        for name, value in zip(COLUMNS, row):
+            columns[name][count] = value
+        count += 1
+    cap.release()
+    return {name: column[:count] for name, column in columns.items()}
+
+
+def _frame_ranges(frame_count: int, chunk_frames: int) -> List[Tuple[int, int]]:
+    """
+    Split the frames of a video into consecutive ranges.
+    :param frame_count: the number of frames of the video
+    :param chunk_frames: the number of frames per range
+    :return: the start and end index of every range
+    """
+    return [
+        (start, min(start + chunk_frames, frame_count))
+        for start in range(0, frame_count, chunk_frames)
+    ]
+
+
+# pylint: disable=R0914
+def analyze_videos(video_paths: List[str], args: argparse.Namespace) -> None:
+    """
+    Analyze the given videos and write one .npz file of detection columns per video.
+    :param video_paths: the paths to the videos
+    :param args: the parsed command-line arguments
+    """
+    logger = logging.getLogger(__name__)
+    os.makedirs(args.output, exist_ok=True)
+    model_size = tuple(map(int, args.model_size.split("x")))
+
+    ranges = {}
+    for video_path in video_paths:
+        cap = cv2.VideoCapture(video_path)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        if frame_count <= 0:
+            logger.warning("Skipping %s, the frame count cannot be read", video_path)
+            continue
+        ranges[video_path] = _frame_ranges(frame_count, args.chunk_frames)
+
+    start_time = time.perf_counter()
+    total_frames = 0
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(args.detector, args.model_path, model_size, args.threshold),
+    ) as executor:
+        futures = {
+            video_path: [
+                executor.submit(_analyze_range, video_path, start, end)
+                for start, end in video_ranges
+            ]
+            for video_path, video_ranges in ranges.items()
+        }
+        for video_path, video_futures in futures.items():
+            parts = [future.result() for future in video_futures]
+            columns = {name: np.concatenate([part[name] for part in parts]) for name in COLUMNS}
+            name = os.path.splitext(os.path.basename(video_path))[0]
+            output_path = os.path.join(args.output, f"{name}_{args.detector}.npz")
+            np.savez_compressed(output_path, **columns)
+
+            frames = len(columns["frame"])
+            total_frames += frames
+            logger.info(
+                "%s: %d frames, %d detected, mean latency %.1f ms -> %s",
+                video_path, frames, int(columns["detected"].sum()),
+                float(columns["latency"].mean() * 1000) if frames else 0.0, output_path,
+                )
+
+    elapsed = time.perf_counter() - start_time
+    logger.info(
+        "Analyzed %d frames of %d videos in %.1f s with %d workers: %.1f frames/sec",
+        total_frames, len(ranges), elapsed, args.workers, total_frames / max(elapsed, 1e-6),
+        )
+
+
+def _parse_args() -> argparse.Namespace:
+    """
+    Parse the command-line arguments.
+    :return: the parsed arguments
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0].strip())
+    parser.add_argument(
+        "videos", nargs="*",
+        help=f"videos to analyze, all videos in {DEFAULT_VIDEOS_PATH}/ by default",
+        )
+    parser.add_argument("--detector", choices=("face", "human"), default="face")
+    parser.add_argument("--model-path", help="saved model directory for the human detector")
+    parser.add_argument("--model-size", default="320x320", help="model input size as WxH")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-frames", type=int, default=DEFAULT_CHUNK_FRAMES)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_PATH, help="output directory")
+    args = parser.parse_args()
+    if args.detector == "human" and not args.model_path:
+        parser.error("--model-path is required for the human detector")
+    return args
+
+
+def main() -> None:
+    """
+    Entry point of the analyzer.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    args = _parse_args()
+    video_paths = args.videos or sorted(glob.glob(os.path.join(DEFAULT_VIDEOS_PATH, "*")))
+    if not video_paths:
+        logging.getLogger(__name__).error("No videos to analyze")
+        return
+    analyze_videos(video_paths, args)
+
+
+if __name__ == "__main__":
+    main()
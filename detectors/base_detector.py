@@ -1,13 +1,38 @@
 """Module containing the BaseDetector class."""
 
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 import logging
+import queue
+import threading
 import time
-from typing import Any, Tuple, Union
+from typing import Any, Iterator, Optional, Tuple, Union
 
 import cv2
 import numpy as np
 
+from monitoring import MEMORY
+
+from .preprocessing import Preprocessor
+
+# Seconds between checks of the stop event while waiting on the frame queue
+QUEUE_POLL_INTERVAL = 0.1
+
+
+@dataclass(frozen=True)
+# pylint: disable=R0902
+class DetectionResult:
+    """Dataclass for the detection result of one video frame."""
+
+    frame_index: int
+    image: np.ndarray # the frame with the bounding boxes added
+    detected: bool
+    center: Tuple[int, int]
+    metric: float # area or height of the bounding box
+    decode_time: float # in seconds
+    inference_time: float # in seconds
+    timestamp: float # time.perf_counter() when the result was ready
+
 
 class BaseDetector(ABC):
     """Base class for all detection models."""
@@ -64,39 +89,166 @@ class BaseDetector(ABC):
         :return: the object detection results
         """
 
+    # pylint: disable=R0914
+    def stream(self, source: Union[int, str], queue_size: int = 8) -> Iterator[DetectionResult]:
+        """
+        Perform object detection on a video file or camera stream, yielding results lazily.
+        Frames are decoded by a background thread into a bounded queue, so decoding overlaps
+        with inference and stops ahead of a slow consumer. Closing the generator stops the
+        reader thread and releases the video.
+        :param source: the path to the video file or the index of the camera device
+        :param queue_size: the maximum number of decoded frames waiting for inference
+        :return: an iterator over the detection results, in frame order
+        """
+        cap = self._initiate_video_writer(source)
+        frames: queue.Queue = queue.Queue(maxsize=queue_size)
+        stop = threading.Event()
+        reader = threading.Thread(
+            target=self._read_frames, args=(cap, frames, stop), name="frame-reader", daemon=True
+            )
+        reader.start()
+        memory_source = f"stream {id(frames)}"
+        MEMORY.add_source(
+            memory_source, "buffer",
+            lambda: {f"{type(self).__name__} frame queue": self._queued_nbytes(frames)}
+            )
+        try:
+            while True:
+                item = frames.get()
+                if isinstance(item, Exception):
+                    raise item
+                if item is None:
+                    return
+                frame_index, decode_time, img = item
+
+                inference_start = time.perf_counter()
+                detected, img, center, metric = self.predict(img)
+                now = time.perf_counter()
+                yield DetectionResult(
+                    frame_index, img, detected, center, metric,
+                    decode_time, now - inference_start, now,
+                    )
+        finally:
+            MEMORY.remove_source(memory_source)
+            stop.set()
+            # Unblock the reader if it waits for space in the queue
+            while reader.is_alive():
+                try:
+                    frames.get_nowait()
+                except queue.Empty:
+                    reader.join(QUEUE_POLL_INTERVAL)
+            cap.release()
+
     def predict_video(self, video: Union[int, str]) -> None:
         """
         Perform object detection on a video file or camera stream.
         :param video: the path to the video file or the index of the camera device
         """
-        cap = self._initiate_video_writer(video)
         self.logger.info("Video initiated.")
+        results = self.stream(video)
+        previous_timestamp = None
+        try:
+            for result in results:
+                img = result.image
+                if previous_timestamp is not None:
+                    fps = 1 / max(result.timestamp - previous_timestamp, 1e-6)
+                    cv2.putText(
+                        img, f"FPS: {fps:.2f}", (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2
+                        )
+                previous_timestamp = result.timestamp
+                cv2.imshow("Detector", img)
 
-        success, img = cap.read()
-        start_time = 0
-
-        while success:
-            current_time = time.time()
-
+                if cv2.waitKey(1) & 0xFF == ord("q"):
+                    break
+        finally:
+            results.close()
+            # Close all OpenCV windows
+            cv2.destroyAllWindows()
 
-            fps = 1 / (current_time - start_time)
-            start_time = current_time
+    @property
+    def buffer_nbytes(self) -> int:
+        """
+        The number of bytes held by the preprocessing buffers of the detector
+        and of the detectors it is composed of.
+        """
+        return sum(preprocessor.nbytes for preprocessor in self._preprocessors())
 
-            _, img, _, _ = self.predict(img)
+    def release_buffers(self) -> bool:
+        """
+        Release the preprocessing buffers, they are allocated again for the next frame.
+        :return: True if the buffers held any memory
+        """
+        held = False
+        for preprocessor in self._preprocessors():
+            held = held or preprocessor.nbytes > 0
+            preprocessor.clear()
+        return held
 
-            cv2.putText(
-                img, f"FPS: {fps:.2f}", (10, 30),
-                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2
-                )
-            cv2.imshow("Detector", img)
+    def _preprocessors(self) -> Iterator[Preprocessor]:
+        """
+        Yield the preprocessors of the detector and of the detectors it is composed of.
+        """
+        for value in vars(self).values():
+            if isinstance(value, Preprocessor):
+                yield value
+            elif isinstance(value, BaseDetector):
+                yield from value._preprocessors() # pylint: disable=W0212
 
-            if cv2.waitKey(1) & 0xFF == ord("q"):
-                break
+    def _read_frames(
+        self, cap: cv2.VideoCapture, frames: queue.Queue, stop: threading.Event
+    ) -> None:
+        """
+        Decode frames into the queue until the video ends or the stream is stopped.
+        The queue ends with None, or with the exception that stopped the decoding.
+        :param cap: the VideoCapture instance
+        :param frames: the queue receiving the frame index, decode time and frame
+        :param stop: the event set when the consumer stops
+        """
+        end: Optional[Exception] = None
+        try:
+            frame_index = 0
+            while not stop.is_set():
+                decode_start = time.perf_counter()
+                success, img = cap.read()
+                if not success:
+                    break
+                item = (frame_index, time.perf_counter() - decode_start, img)
+                if not self._put(frames, item, stop):
+                    return
+                frame_index += 1
+        except Exception as exc: # pylint: disable=W0703
+            self.logger.error("Reading the video failed: %s", exc)
+            end = exc
+        self._put(frames, end, stop)
 
-            success, img = cap.read()
+    @staticmethod
+    def _queued_nbytes(frames: queue.Queue) -> int:
+        """
+        Return the number of bytes of the decoded frames waiting in the queue.
+        :param frames: the frame queue
+        :return: the size of the queued frames in bytes
+        """
+        with frames.mutex:
+            items = list(frames.queue)
+        return sum(item[2].nbytes for item in items if isinstance(item, tuple))
 
-        # Close all OpenCV windows
-        cv2.destroyAllWindows()
+    @staticmethod
+    def _put(frames: queue.Queue, item: Any, stop: threading.Event) -> bool:
+        """
+        Put an item into the queue, waiting for space unless the stream is stopped.
+        :param frames: the frame queue
+        :param item: the item to put
+        :param stop: the event set when the consumer stops
+        :return: whether the item was put
+        """
+        while not stop.is_set():
+            try:
+                frames.put(item, timeout=QUEUE_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
 
     def _initiate_video_writer(self, video_path: Union[int, str]) -> cv2.VideoCapture:
         """
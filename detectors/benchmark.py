@@ -0,0 +1,171 @@
+"""
+Benchmark of a human detection model on the CPU of this machine.
+
+The model is loaded and run on the frames of a set of clips, measuring the load time,
+the end-to-end latency of predict, the latency of the model alone and the peak resident
+memory of the process. Run it in a fresh process per model for the load time and memory
+to be meaningful. With --compare, every backend is measured in its own process, including
+the startup time until the model is ready.
+
+Usage: python -m detectors.benchmark clips ... --model-path PATH --model-size WxH
+       [--backend tensorflow|opencv] [--dnn-target cpu|opencl|...] [--compare]
+"""
+
+import argparse
+import logging
+import subprocess
+import sys
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from .human_detector import BACKENDS
+from .measurement import WARMUP_FRAMES, format_result, parse_result, read_frames
+
+DEFAULT_FRAMES = 200
+READY_LINE = "READY"
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Return the peak resident memory of the process.
+    :return: the peak resident memory in MB, None where it cannot be measured
+    """
+    try:
+        import resource # pylint: disable=C0415
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes on Linux
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+# pylint: disable=R0913, R0914
+def measure_model(
+    model_path: str,
+    model_size: str,
+    clips: List[str],
+    frames: int = DEFAULT_FRAMES,
+    *,
+    backend: str = "tensorflow",
+    dnn_target: str = "cpu",
+    on_loaded: Optional[Callable[[], None]] = None,
+) -> dict:
+    """
+    Measure a human detection model in the current process.
+    :param model_path: the path to the saved model
+    :param model_size: the model input size as WxH
+    :param clips: the paths to the clips to run the model on
+    :param frames: the maximum number of frames
+    :param backend: the runtime of the model, tensorflow or opencv
+    :param dnn_target: the OpenCV DNN target of the opencv backend
+    :param on_loaded: called once the model is loaded, before the frames are run
+    :return: the load time in seconds, the mean end-to-end and model latency in milliseconds,
+    the peak resident memory in MB, the number of frames measured
+    and whether TensorFlow was imported
+    """
+    from . import HumanDetector # pylint: disable=C0415
+
+    images = read_frames(clips, frames)
+    width, height = map(int, model_size.split("x"))
+    load_start = time.perf_counter()
+    detector = HumanDetector(model_path, height, width, backend=backend, dnn_target=dnn_target)
+    load_time = time.perf_counter() - load_start
+    if on_loaded is not None:
+        on_loaded()
+
+    end_to_end, inference = [], []
+    for index, img in enumerate(images):
+        start = time.perf_counter()
+        detector.predict(img.copy())
+        latency = time.perf_counter() - start
+
+        # pylint: disable=W0212
+        input_image = detector._preprocess_image(img)
+        start = time.perf_counter()
+        detector._model_process(input_image)
+        if index >= WARMUP_FRAMES:
+            end_to_end.append(latency)
+            inference.append(time.perf_counter() - start)
+    if not end_to_end:
+        raise ValueError("Not enough frames to benchmark")
+    rss = peak_rss_mb()
+
+    return {
+        "load_time_s": round(load_time, 3),
+        "cpu_latency_ms": round(float(np.mean(end_to_end)) * 1000, 1),
+        "cpu_inference_ms": round(float(np.mean(inference)) * 1000, 1),
+        "peak_rss_mb": None if rss is None else round(rss),
+        "benchmark_frames": len(end_to_end),
+        "tensorflow_imported": "tensorflow" in sys.modules,
+    }
+
+
+def compare_backends(args: argparse.Namespace) -> None:
+    """
+    Measure every backend in its own process and log the startup time, memory and FPS.
+    The startup time runs from launching the process until the model is loaded.
+    :param args: the parsed command-line arguments
+    """
+    logger = logging.getLogger(__name__)
+    for backend in BACKENDS:
+        command = [
+            sys.executable, "-m", "detectors.benchmark", *args.clips,
+            "--model-path", args.model_path, "--model-size", args.model_size,
+            "--frames", str(args.frames), "--backend", backend, "--dnn-target", args.dnn_target,
+        ]
+        start = time.perf_counter()
+        startup, result = None, None
+        with subprocess.Popen(command, stdout=subprocess.PIPE, text=True) as process:
+            for line in process.stdout:
+                if line.strip() == READY_LINE:
+                    startup = time.perf_counter() - start
+                else:
+                    result = parse_result(line) or result
+        if result is None:
+            logger.error("The %s backend failed, exit code %s", backend, process.returncode)
+            continue
+        logger.info(
+            "%s: startup %.2f s (model load %.2f s), peak RSS %s MB, %.1f ms per frame "
+            "(%.1f FPS), model %.1f ms, TensorFlow imported: %s",
+            backend, startup, result["load_time_s"], result["peak_rss_mb"],
+            result["cpu_latency_ms"], 1000 / result["cpu_latency_ms"],
+            result["cpu_inference_ms"], result["tensorflow_imported"],
+            )
+
+
+def _parse_args() -> argparse.Namespace:
+    """
+    Parse the command-line arguments.
+    :return: the parsed arguments
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0].strip())
+    parser.add_argument("clips", nargs="+", help="clips to run the model on")
+    parser.add_argument("--model-path", required=True, help="saved model directory")
+    parser.add_argument("--model-size", required=True, help="model input size as WxH")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument("--backend", choices=BACKENDS, default="tensorflow")
+    parser.add_argument("--dnn-target", default="cpu", help="OpenCV DNN target of opencv")
+    parser.add_argument("--compare", action="store_true", help="compare all the backends")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """
+    Entry point of the benchmark, prints the measurements as JSON.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    args = _parse_args()
+    if args.compare:
+        compare_backends(args)
+        return
+    result = measure_model(
+        args.model_path, args.model_size, args.clips, args.frames, backend=args.backend,
+        dnn_target=args.dnn_target, on_loaded=lambda: print(READY_LINE, flush=True),
+        )
+    print(format_result(result), flush=True)
+
+
+if __name__ == "__main__":
+    main()
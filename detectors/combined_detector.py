@@ -0,0 +1,264 @@
+"""Module for performing combined human and face detection."""
+
+import time
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from monitoring import METRICS
+
+from .base_detector import BaseDetector
+from .face_detector import FaceDetector
+from .human_detector import HumanDetector
+from .preprocessing import Preprocessor
+
+# Top fraction of the person bounding box searched for the face
+FACE_REGION = 0.4
+# Seconds a face found in the person box keeps the person confirmed
+CONFIRMATION_SECONDS = 2.0
+# Seconds a face position keeps refining the horizontal center of the person
+FACE_POSITION_SECONDS = 0.5
+
+
+class DetectorScheduler:
+    """
+    Class deciding which detectors run on a frame. The human detector runs on every frame
+    and the face detector every few frames; when both do not fit in the frame budget,
+    the face detector runs alone on the frame it is due and reuses the last person box.
+    """
+
+    def __init__(self, frame_budget: float, face_interval: int = 3, smoothing: float = 0.2) -> None:
+        """
+        Initialize the DetectorScheduler object.
+        :param frame_budget: the number of seconds the detectors may take per frame
+        :param face_interval: the number of frames between two face detections
+        :param smoothing: the weight of the newest latency in the moving averages
+        """
+        self.frame_budget = frame_budget
+        self.face_interval = face_interval
+        self.smoothing = smoothing
+        self.costs: Dict[str, float] = {"human": 0.0, "face": 0.0}
+        self.frames_since_face = face_interval
+
+    def plan(self, has_person: bool) -> Tuple[bool, bool]:
+        """
+        Decide which detectors run on the next frame.
+        :param has_person: whether a person box is known to search the face in
+        :return: whether to run the human detector and whether to run the face detector
+        """
+        face_due = has_person and self.frames_since_face >= self.face_interval
+        if not face_due:
+            return True, False
+        if self.costs["human"] + self.costs["face"] <= self.frame_budget:
+            return True, True
+        return False, True
+
+    def record(self, detector: str, latency: float) -> None:
+        """
+        Record the latency of a detector.
+        :param detector: the detector, human or face
+        :param latency: the latency in seconds
+        """
+        cost = self.costs[detector]
+        self.costs[detector] = latency if not cost else (
+            self.smoothing * latency + (1 - self.smoothing) * cost
+            )
+
+    def frame_done(self, ran_face: bool) -> None:
+        """
+        Record the end of a frame.
+        :param ran_face: whether the face detector ran on the frame
+        """
+        self.frames_since_face = 0 if ran_face else self.frames_since_face + 1
+
+
+# pylint: disable=R0902, W0212
+class CombinedDetector(BaseDetector):
+    """
+    Class for performing human detection, with face detection on the person crop at a lower
+    rate to confirm the person and refine the horizontal center. The frame is resized and
+    converted to RGB once, and both detectors work on that image.
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        model_path: str,
+        model_height: int,
+        model_width: int,
+        threshold: float = 0.5,
+        *,
+        input_size: Tuple[int, int] = (640, 480),
+        frame_budget: float = 1 / 15,
+        face_interval: int = 3,
+        backend: str = "tensorflow",
+        dnn_target: str = "cpu",
+    ) -> None:
+        """
+        Initialize the CombinedDetector object.
+        :param model_path: the path to the model to use for human detection
+        :param model_height: the height of the input image for the model
+        :param model_width: the width of the input image for the model
+        :param threshold: the minimum confidence score for a detection to be considered valid
+        :param input_size: the width and height of the shared RGB image both detectors use
+        :param frame_budget: the number of seconds the detectors may take per frame
+        :param face_interval: the number of frames between two face detections
+        :param backend: the runtime of the human detection model, tensorflow or opencv
+        :param dnn_target: the OpenCV DNN target of the opencv backend
+        """
+        self.input_size = input_size
+        self.human = HumanDetector(
+            model_path, model_height, model_width, threshold, backend=backend, dnn_target=dnn_target
+            )
+        self.face = FaceDetector(threshold)
+        self.scheduler = DetectorScheduler(frame_budget, face_interval)
+        self.preprocessor = Preprocessor()
+        self.human_preprocessor = Preprocessor(batch=True, convert=False)
+
+        self._person_box: Optional[Tuple[float, float, float, float]] = None
+        self._person_confidence = 0.0
+        self._face_offset: Optional[float] = None # relative to the person box width
+        self._face_seen_at = -float("inf")
+        super().__init__(threshold)
+
+    def predict(self, img: np.ndarray) -> Tuple[bool, np.ndarray, Tuple[int, int], float]:
+        """
+        Perform the scheduled detections on the input image.
+        :param img: the input image to perform object detection on
+        :return: a boolean value indicating whether a person confirmed by their face was detected,
+        the resulting image with the bounding boxes added,
+        the center of the person, refined by the face, and the height of the bounding box
+        """
+        img.flags.writeable = False # Set the image to read-only mode to improve performance
+
+        with METRICS.timer("detector_preprocess_seconds", detector="combined"):
+            rgb = self._preprocess_image(img)
+        run_human, run_face = self.scheduler.plan(self._person_box is not None)
+        if run_human:
+            self._detect_human(img, rgb)
+        # The person may be lost by the human detection or too small to search the face in
+        ran_face = run_face and self._person_box is not None and self._detect_face(rgb)
+        self.scheduler.frame_done(ran_face)
+
+        img.flags.writeable = True # Set the image back to writeable mode
+
+        with METRICS.timer("detector_postprocess_seconds", detector="combined"):
+            detected, img, center, bbox_height = self._visualize_bounding_box(img, None)
+        METRICS.counter("detections_total", detector="combined").inc(detected)
+        return detected, img, center, bbox_height
+
+    def _load_model(self) -> None:
+        """
+        The human and face detectors load their own models.
+        """
+
+    def _model_process(self, img: np.ndarray) -> None:
+        """
+        The detections are run by _detect_human and _detect_face.
+        :param img: the preprocessed input image
+        """
+
+    def _preprocess_image(self, img: np.ndarray) -> np.ndarray:
+        """
+        Preprocess the input image by resizing it to the shared input size
+        and converting it from BGR to RGB format.
+        :param img: the input image to be preprocessed
+        :return: the preprocessed image
+        """
+        return self.preprocessor(img, self.input_size)
+
+    def _detect_human(self, img: np.ndarray, rgb: np.ndarray) -> None:
+        """
+        Detect the most confident person on the shared RGB image, or on the input image
+        when the model input is larger than the shared image, which would lose detail.
+        :param img: the BGR input image
+        :param rgb: the shared RGB image
+        """
+        start = time.perf_counter()
+        size = (self.human.model_width, self.human.model_height)
+        if size[0] > self.input_size[0] or size[1] > self.input_size[1]:
+            input_batch = self.human.preprocessor(img, size)
+        else:
+            input_batch = self.human_preprocessor(rgb, size)
+        model_input = self.human._to_model_input(input_batch)
+        with METRICS.timer("detector_inference_seconds", detector="human"):
+            results = self.human._model_process(model_input)
+        human_boxes, bboxs = self.human._get_human_boxes(results)
+        self.scheduler.record("human", time.perf_counter() - start)
+
+        if not human_boxes:
+            self._person_box = None
+            self._face_offset = None
+            return
+        box, confidence = max(human_boxes, key=lambda x: x[1])
+        self._person_box = tuple(bboxs[box].tolist())
+        self._person_confidence = float(confidence)
+
+    # pylint: disable=R0914
+    def _detect_face(self, rgb: np.ndarray) -> bool:
+        """
+        Detect the face in the upper part of the person box on the shared RGB image.
+        :param rgb: the shared RGB image
+        :return: whether the face model ran, not when the person box is too small to crop
+        """
+        start = time.perf_counter()
+        height, width, _ = rgb.shape
+        ymin, xmin, ymax, xmax = self._person_box
+        top, left = int(ymin * height), int(xmin * width)
+        bottom = int((ymin + (ymax - ymin) * FACE_REGION) * height)
+        right = int(xmax * width)
+        crop = np.ascontiguousarray(rgb[top:bottom, left:right])
+        if crop.shape[0] < 2 or crop.shape[1] < 2:
+            return False
+
+        results = self.face._timed_model_process(crop)
+        self.scheduler.record("face", time.perf_counter() - start)
+        area = 0.0
+        if results.detections:
+            face_box = max(
+                (detection.location_data.relative_bounding_box for detection in results.detections),
+                key=lambda box: box.width * box.height,
+            )
+            area = face_box.width * face_box.height
+            face_x = (left + (face_box.xmin + face_box.width / 2) * crop.shape[1]) / width
+            self._face_offset = (face_x - xmin) / max(xmax - xmin, 1e-6)
+            self._face_seen_at = time.monotonic()
+        self.face._update_model_selection(area)
+        return True
+
+    def _visualize_bounding_box(
+        self, img: np.ndarray, detections: None
+    ) -> Tuple[bool, np.ndarray, Tuple[int, int], float]:
+        """
+        Visualize the bounding box of the person and the position of their face.
+        :param img: the input image with the detected person
+        :param detections: unused, the last detections are kept by the detector
+        :return: a boolean value indicating whether a person confirmed by their face was detected,
+        the resulting image with the bounding box added,
+        the center of the person, refined by the face, and the height of the bounding box
+        """
+        if self._person_box is None:
+            return False, img, (0, 0), 0
+
+        height, width, _ = img.shape
+        ymin, xmin, ymax, xmax = self._person_box
+        ymin, xmin, ymax, xmax = (
+            int(ymin * height), int(xmin * width), int(ymax * height), int(xmax * width)
+        )
+        center = (int((xmin + xmax) / 2), int((ymin + ymax) / 2))
+
+        since_face = time.monotonic() - self._face_seen_at
+        if self._face_offset is not None and since_face < FACE_POSITION_SECONDS:
+            center = (int(xmin + self._face_offset * (xmax - xmin)), center[1])
+            cv2.circle(img, (center[0], ymin + (ymax - ymin) // 8), 5, (0, 255, 0), -1)
+        confirmed = since_face < CONFIRMATION_SECONDS
+
+        color = (0, 255, 0) if confirmed else (0, 255, 255)
+        label = f"person {self._person_confidence * 100:.2f}%".upper()
+        if confirmed:
+            label += " FACE"
+        cv2.rectangle(img, (xmin, ymin), (xmax, ymax), color, 2)
+        cv2.putText(img, label, (xmin, ymin - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+
+        return confirmed, img, center, ymax - ymin
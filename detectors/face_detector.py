@@ -1,17 +1,56 @@
 """Module for performing face detection using the Mediapipe library."""
 
-from typing import Tuple
+from typing import Dict, Optional, Tuple
 
 import cv2
 import mediapipe as mp
 import numpy as np
 
+from monitoring import METRICS
+
 from .base_detector import BaseDetector
+from .model_registry import MODEL_REGISTRY
+from .preprocessing import Preprocessor
+
+# Mediapipe model_selection values
+SHORT_RANGE = 0 # faces within 2 m, much cheaper
+FULL_RANGE = 1 # faces within 5 m
+MODEL_NAMES = {SHORT_RANGE: "short_range", FULL_RANGE: "full_range"}
+
+# Relative face area above which the short-range model is used, a face of about 2 m away
+DEFAULT_RANGE_SWITCH_AREA = 0.005
+# Fraction of the switch area below which the full-range model is used again
+RANGE_HYSTERESIS = 0.6
+# Frames the full-range model is kept after it found a face the short-range model missed,
+# so both models do not run on every frame while the face stays at that distance
+FALLBACK_HOLD_FRAMES = 30
 
 
+# pylint: disable=R0902
 class FaceDetector(BaseDetector):
     """Class for performing face detection using the Mediapipe library."""
 
+    def __init__(
+        self,
+        threshold: float = 0.5,
+        input_size: Tuple[int, int] = (640, 480),
+        range_switch_area: Optional[float] = DEFAULT_RANGE_SWITCH_AREA,
+    ) -> None:
+        """
+        Initialize the FaceDetector object with the given threshold.
+        :param threshold: the minimum confidence score for a detected face to be considered valid
+        :param input_size: the width and height the image is resized to before detection
+        :param range_switch_area: the relative face area from which the short-range model is used,
+        None or 0 always uses the full-range model
+        """
+        self.input_size = input_size
+        self.range_switch_area = range_switch_area
+        self.model_selection = FULL_RANGE
+        self.full_range_hold = 0
+        self.models: Dict[int, mp.solutions.face_detection.FaceDetection] = {}
+        self.preprocessor = Preprocessor()
+        super().__init__(threshold)
+
     def predict(self, img: np.ndarray) -> Tuple[bool, np.ndarray, Tuple[int, int], float]:
         """
         Perform object detection on the input image and return the resulting
@@ -22,24 +61,90 @@ class FaceDetector(BaseDetector):
         """
         img.flags.writeable = False # Set the image to read-only mode to improve performance
 
-        results = self._model_process(self._preprocess_image(img))
+        with METRICS.timer("detector_preprocess_seconds", detector="face"):
+            input_image = self._preprocess_image(img)
+        results = self._timed_model_process(input_image)
+        if not results.detections and self.model_selection == SHORT_RANGE:
+            # The face may have moved out of the short range, retry with the full-range model
+            self._select_model(FULL_RANGE)
+            results = self._timed_model_process(input_image)
+            self.full_range_hold = FALLBACK_HOLD_FRAMES
 
         img.flags.writeable = True # Set the image back to writeable mode
 
-        detected, img, center, area = self._visualize_bounding_box(img, results)
+        with METRICS.timer("detector_postprocess_seconds", detector="face"):
+            detected, img, center, area = self._visualize_bounding_box(img, results)
+        METRICS.counter("detections_total", detector="face").inc(detected)
+        self._update_model_selection(area)
         return detected, img, center, area
 
+    def reset_range_selection(self) -> None:
+        """
+        Start over with the full-range model, for frames unrelated to the previous ones.
+        """
+        self.full_range_hold = 0
+        if self.model_selection != FULL_RANGE:
+            self._select_model(FULL_RANGE)
+
     def _load_model(self) -> None:
         """
-        Load the face detection model from the Mediapipe library and initialize the drawing utility.
+        Load the face detection models from the Mediapipe library and initialize
+        the drawing utility. The short-range model is only loaded when range switching is enabled.
         """
         self.logger.info("Loading face detection model")
-        self.model = mp.solutions.face_detection.FaceDetection(
-            model_selection=1, min_detection_confidence=self.threshold
-        )
+        selections = [FULL_RANGE, SHORT_RANGE] if self.range_switch_area else [FULL_RANGE]
+        for selection in selections:
+            self.models[selection] = MODEL_REGISTRY.get_or_load(
+                f"face_detection/{MODEL_NAMES[selection]}/{self.threshold}",
+                "mediapipe",
+                lambda selection=selection: mp.solutions.face_detection.FaceDetection(
+                    model_selection=selection, min_detection_confidence=self.threshold
+                ),
+            )
+        self.model = self.models[FULL_RANGE]
         self.mp_drawing = mp.solutions.drawing_utils
         self.logger.info("Face detection model loaded")
 
+    def _select_model(self, selection: int) -> None:
+        """
+        Switch to the short-range or full-range model.
+        :param selection: the Mediapipe model selection to use
+        """
+        self.logger.debug("Switching to the %s face detection model", MODEL_NAMES[selection])
+        self.model_selection = selection
+        self.model = self.models[selection]
+
+    def _update_model_selection(self, area: float) -> None:
+        """
+        Choose the model for the next frame from the area of the closest face,
+        with hysteresis so a face near the switch area does not alternate between models,
+        keeping the full-range model for a while after a fallback to it.
+        :param area: the relative area of the closest face, 0 if no face was detected
+        """
+        if not self.range_switch_area:
+            return
+        if self.full_range_hold > 0:
+            self.full_range_hold -= 1
+            return
+        if self.model_selection == FULL_RANGE and area >= self.range_switch_area:
+            self._select_model(SHORT_RANGE)
+        elif (
+            self.model_selection == SHORT_RANGE
+            and area < self.range_switch_area * RANGE_HYSTERESIS
+        ):
+            self._select_model(FULL_RANGE)
+
+    def _timed_model_process(self, img: np.ndarray) -> mp.solutions.face_detection.FaceDetection:
+        """
+        Perform face detection with the selected model, recording its latency per model.
+        :param img: the preprocessed input image
+        :return: the face detection results
+        """
+        with METRICS.timer(
+            "detector_inference_seconds", detector="face", model=MODEL_NAMES[self.model_selection]
+        ):
+            return self._model_process(img)
+
     def _model_process(self, img: np.ndarray) -> mp.solutions.face_detection.FaceDetection:
         """
         Perform face detection on the input image using the loaded model.
@@ -50,13 +155,12 @@ class FaceDetector(BaseDetector):
 
     def _preprocess_image(self, img: np.ndarray) -> np.ndarray:
         """
-        Preprocess the input image by converting it from BGR to RGB format.
+        Preprocess the input image by resizing it to the input size
+        and converting it from BGR to RGB format.
         :param img: the input image to be preprocessed
         :return: the preprocessed image
         """
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        img = cv2.resize(img, (640, 480))
-        return img
+        return self.preprocessor(img, self.input_size)
 
     def _visualize_bounding_box(
         self, img: np.ndarray, detections: mp.solutions.face_detection.FaceDetection
@@ -0,0 +1,71 @@
+"""Module for loading the optimized frozen graphs exported from the downloaded saved models."""
+
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+OPTIMIZED_DIRECTORY = "optimized"
+GRAPH_FILE = "frozen_graph.pb"
+SIGNATURE_FILE = "signature.json"
+
+
+def optimized_model_dir(saved_model_path: str) -> str:
+    """
+    Return the directory of the optimized artifact of a saved model, next to the saved model.
+    :param saved_model_path: the path to the saved model directory
+    :return: the path to the optimized artifact directory
+    """
+    return os.path.join(os.path.dirname(os.path.normpath(saved_model_path)), OPTIMIZED_DIRECTORY)
+
+
+def read_signature(optimized_dir: str) -> Optional[dict]:
+    """
+    Read the signature of an optimized artifact.
+    :param optimized_dir: the path to the optimized artifact directory
+    :return: the input size, input tensor name and output names of the frozen graph,
+    None if there is no complete artifact
+    """
+    signature_path = os.path.join(optimized_dir, SIGNATURE_FILE)
+    if not os.path.isfile(signature_path) or not os.path.isfile(
+        os.path.join(optimized_dir, GRAPH_FILE)
+    ):
+        return None
+    with open(signature_path, "rt", encoding="utf-8") as file:
+        return json.load(file)
+
+
+class FrozenGraphModel:
+    """
+    Callable running a frozen graph with a fixed 1xHxW input,
+    returning the same dictionary of outputs as the serving signature it was exported from.
+    """
+
+    def __init__(self, optimized_dir: str, signature: dict) -> None:
+        """
+        Load the frozen graph of an optimized artifact.
+        :param optimized_dir: the path to the optimized artifact directory
+        :param signature: the signature of the artifact, see read_signature
+        """
+        import tensorflow as tf # pylint: disable=C0415
+
+        graph_def = tf.compat.v1.GraphDef()
+        with open(os.path.join(optimized_dir, GRAPH_FILE), "rb") as file:
+            graph_def.ParseFromString(file.read())
+
+        self.input_size: Tuple[int, int] = tuple(signature["input_size"])
+        self.output_keys: List[str] = signature["output_keys"]
+        wrapped = tf.compat.v1.wrap_function(
+            lambda: tf.compat.v1.import_graph_def(graph_def, name=""), []
+            )
+        self._function = wrapped.prune(
+            wrapped.graph.get_tensor_by_name(signature["input"]),
+            [wrapped.graph.get_tensor_by_name(name) for name in signature["outputs"]],
+            )
+
+    def __call__(self, input_tensor) -> Dict[str, object]:
+        """
+        Run the frozen graph.
+        :param input_tensor: the uint8 input batch of shape (1, height, width, 3)
+        :return: the outputs by name
+        """
+        return dict(zip(self.output_keys, self._function(input_tensor)))
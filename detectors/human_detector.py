@@ -1,34 +1,61 @@
-"""Module for performing human detection."""
+"""Module for performing human detection.
 
-from typing import Dict, Tuple
+TensorFlow is imported only when the tensorflow backend is used, so the opencv backend
+runs without loading it.
+"""
+
+from typing import Tuple
 
 import cv2
 import numpy as np
-import tensorflow as tf
+
+from monitoring import METRICS
+from pipeline import import_tensorflow
 
 from .base_detector import BaseDetector
+from .frozen_graph import FrozenGraphModel, optimized_model_dir, read_signature
+from .model_registry import MODEL_REGISTRY
+from .opencv_dnn import OpenCVDnnModel, has_opencv_export, opencv_model_dir
+from .postprocessing import non_max_suppression
+from .preprocessing import Preprocessor
 
+BACKENDS = ("tensorflow", "opencv")
 
+
+# pylint: disable=R0902
 class HumanDetector(BaseDetector):
     """Class for performing object detection on videos."""
 
+    # pylint: disable=R0913
     def __init__(
         self,
         model_path: str,
         model_height: int,
         model_width: int,
-        threshold: float = 0.5) -> None:
+        threshold: float = 0.5,
+        *,
+        backend: str = "tensorflow",
+        dnn_target: str = "cpu") -> None:
         """
         Initialize the HumanDetector object with the given threshold.
         :param model_path: the path to the model to use for object detection
         :param model_height: the height of the input image for the model
         :param model_width: the width of the input image for the model
         :param threshold: the minimum confidence score for a detected object to be considered valid
+        :param backend: the runtime of the model, tensorflow or opencv, the opencv backend
+        runs the export found next to the saved model with the OpenCV DNN module and falls back
+        to tensorflow when there is none
+        :param dnn_target: the OpenCV DNN target of the opencv backend, see DNN_TARGETS
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend}, expected one of {BACKENDS}")
         self.model_path = model_path
+        self.backend = backend
+        self.dnn_target = dnn_target
         self.classes_list = self._read_classes()
         self.model_height = model_height
         self.model_width = model_width
+        self.preprocessor = Preprocessor(batch=True)
         super().__init__(threshold)
 
     def predict(self, img: np.ndarray) -> Tuple[bool, np.ndarray, Tuple[int, int], float]:
@@ -41,11 +68,16 @@ class HumanDetector(BaseDetector):
         """
         img.flags.writeable = False # Set the image to read-only mode to improve performance
 
-        results = self._model_process(self._preprocess_image(img))
+        with METRICS.timer("detector_preprocess_seconds", detector="human"):
+            input_image = self._preprocess_image(img)
+        with METRICS.timer("detector_inference_seconds", detector="human"):
+            results = self._model_process(input_image)
 
         img.flags.writeable = True # Set the image back to writeable mode
 
-        detected, img, center, bbox_height = self._visualize_bounding_box(img, results)
+        with METRICS.timer("detector_postprocess_seconds", detector="human"):
+            detected, img, center, bbox_height = self._visualize_bounding_box(img, results)
+        METRICS.counter("detections_total", detector="human").inc(detected)
         return detected, img, center, bbox_height
 
     def _read_classes(self) -> list[str]:
@@ -61,11 +93,43 @@ class HumanDetector(BaseDetector):
 
     def _load_model(self) -> None:
         """
-        Load the object detection model from the checkpoint directory.
+        Load the object detection model from the checkpoint directory,
+        reusing it from the model registry if it is still resident.
+        The optimized frozen graph exported after the download is preferred
+        when its input size matches the model input size.
         """
         self.logger.info("Loading model")
-        tf.keras.backend.clear_session()
-        self.model = tf.saved_model.load(self.model_path)
+        if self.backend == "opencv" and not has_opencv_export(opencv_model_dir(self.model_path)):
+            self.logger.warning(
+                "No OpenCV export in %s, falling back to the TensorFlow backend",
+                opencv_model_dir(self.model_path)
+                )
+            self.backend = "tensorflow"
+        if self.backend == "opencv":
+            model_dir = opencv_model_dir(self.model_path)
+            self.model = MODEL_REGISTRY.get_or_load(
+                model_dir, f"opencv-{self.dnn_target}",
+                lambda: OpenCVDnnModel(model_dir, self.dnn_target),
+                )
+            self.logger.info("OpenCV DNN model loaded")
+            return
+
+        tf = import_tensorflow()
+
+        optimized_dir = optimized_model_dir(self.model_path)
+        signature = read_signature(optimized_dir)
+        if signature is not None and tuple(signature["input_size"]) == (
+            self.model_width, self.model_height
+        ):
+            self.model = MODEL_REGISTRY.get_or_load(
+                optimized_dir, "tensorflow-frozen",
+                lambda: FrozenGraphModel(optimized_dir, signature),
+                )
+            self.logger.info("Optimized model loaded")
+            return
+        self.model = MODEL_REGISTRY.get_or_load(
+            self.model_path, "tensorflow", lambda: tf.saved_model.load(self.model_path)
+            )
         self.logger.info("Model loaded")
 
     def _model_process(self, img: np.ndarray):
@@ -76,23 +140,29 @@ class HumanDetector(BaseDetector):
         """
         return self.model(img)
 
-    def _preprocess_image(self, img: np.ndarray) -> tf.Tensor:
+    def _preprocess_image(self, img: np.ndarray):
         """
-        Preprocess the input image by converting it
-        to a tensor in the correct format for the model.
+        Preprocess the input image by resizing it to the model input size, converting it
+        to RGB and wrapping it in a batch tensor.
         :param img: the input image to be preprocessed
-        :return: the preprocessed image tensor
+        :return: the preprocessed image batch, see _to_model_input
         """
-        input_tensor = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        return self._to_model_input(self.preprocessor(img, (self.model_width, self.model_height)))
 
-        input_tensor = cv2.resize(input_tensor, (self.model_height, self.model_width))
-
-        input_tensor = tf.convert_to_tensor(input_tensor, dtype=tf.uint8)
-        input_tensor = input_tensor[tf.newaxis, ...]
-        return input_tensor
+    def _to_model_input(self, input_batch: np.ndarray):
+        """
+        Wrap a preprocessed RGB batch for the backend. The preprocessed buffer is aligned,
+        so TensorFlow uses its memory without copying it.
+        :param input_batch: the uint8 RGB batch of shape (1, height, width, 3)
+        :return: the batch as a tensor for the tensorflow backend, unchanged for opencv
+        """
+        if self.backend == "opencv":
+            return input_batch
+        import tensorflow as tf # pylint: disable=C0415
+        return tf.convert_to_tensor(input_batch, dtype=tf.uint8)
 
     def _visualize_bounding_box(
-        self, img: np.ndarray, detections: Dict[str, tf.Tensor]
+        self, img: np.ndarray, detections: dict
         ) -> np.ndarray:
         """
         Visualize the bounding boxes around the detected objects.
@@ -100,19 +170,10 @@ class HumanDetector(BaseDetector):
         :param detections: the object detection results
         :return: the image with the bounding boxes added
         """
-        bbox_idx, bboxs, class_indexes, class_scores = self._get_bounding_boxes(detections)
+        human_boxes, bboxs = self._get_human_boxes(detections)
 
         height, width, _ = img.shape
 
-        person_index = self.classes_list.index("person")
-        human_boxes = False
-        if tf.size(bbox_idx) > 0:
-            human_boxes = [
-                (box, class_scores[box])
-                for box in bbox_idx
-                if class_indexes[box] == person_index
-                ]
-
         human_found = bool(human_boxes)
 
         img, center, bbox_height = self._draw_bounding_boxes(
@@ -121,22 +182,42 @@ class HumanDetector(BaseDetector):
 
         return human_found, img, center, bbox_height
 
+    def _get_human_boxes(self, detections: dict) -> Tuple[list, np.ndarray]:
+        """
+        Select the bounding boxes of the detected humans.
+        :param detections: the object detection results
+        :return: the human bounding box indices and their confidence scores,
+                 and the bounding boxes themselves
+        """
+        bbox_idx, bboxs, class_indexes, class_scores = self._get_bounding_boxes(detections)
+
+        person_index = self.classes_list.index("person")
+        human_boxes = []
+        if len(bbox_idx) > 0:
+            human_boxes = [
+                (box, class_scores[box])
+                for box in bbox_idx
+                if class_indexes[box] == person_index
+                ]
+
+        return human_boxes, bboxs
+
     def _get_bounding_boxes(
         self, detections: dict
         ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """
         Extract the bounding boxes, class indexes,
-        and class scores from the object detection results.
+        and class scores from the object detection results of either backend.
         :param detections: the object detection results
         :return: a tuple with the indices of the selected bounding boxes,
                  the bounding boxes themselves,
                  the class indexes, and the class scores
         """
-        bboxs = detections["detection_boxes"][0].numpy()
-        class_indexes = detections["detection_classes"][0].numpy().astype(np.int32)
-        class_scores = detections["detection_scores"][0].numpy()
+        bboxs = np.asarray(detections["detection_boxes"][0])
+        class_indexes = np.asarray(detections["detection_classes"][0]).astype(np.int32)
+        class_scores = np.asarray(detections["detection_scores"][0])
 
-        bbox_idx = tf.image.non_max_suppression(
+        bbox_idx = non_max_suppression(
             bboxs,
             class_scores,
             max_output_size=30,
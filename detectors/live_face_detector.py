@@ -0,0 +1,221 @@
+"""Module for performing asynchronous face detection using the Mediapipe Tasks API."""
+
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+import urllib.request
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from monitoring import METRICS
+
+from .base_detector import BaseDetector
+from .preprocessing import Preprocessor
+
+try:
+    from mediapipe.tasks.python import BaseOptions, vision
+except ImportError: # The Tasks face detector needs mediapipe 0.10 or newer
+    BaseOptions = None
+    vision = None
+
+MODEL_ASSET_PATH = "models/face_detection/blaze_face_short_range.tflite"
+MODEL_ASSET_URL = (
+    "https://storage.googleapis.com/mediapipe-models/face_detector/"
+    "blaze_face_short_range/float16/latest/blaze_face_short_range.tflite"
+)
+
+
+def live_stream_available() -> bool:
+    """Returns whether the installed mediapipe provides the Tasks face detector.
+    mediapipe 0.9 already has the tasks vision module, but not its FaceDetector."""
+    return vision is not None and hasattr(vision, "FaceDetector")
+
+
+# pylint: disable=R0902
+class LiveStreamFaceDetector(BaseDetector):
+    """
+    Class for performing face detection with the Mediapipe Tasks FaceDetector in live stream mode.
+    Frames are submitted without waiting for the result, and every frame is annotated with
+    the newest completed result, so inference overlaps with capture and display.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.5,
+        input_size: Tuple[int, int] = (640, 480),
+        model_asset_path: str = MODEL_ASSET_PATH,
+    ) -> None:
+        """
+        Initialize the LiveStreamFaceDetector object with the given threshold.
+        :param threshold: the minimum confidence score for a detected face to be considered valid
+        :param input_size: the width and height the image is resized to before detection
+        :param model_asset_path: the path to the .tflite face detection model,
+        downloaded on first use if missing
+        """
+        self.input_size = input_size
+        self.model_asset_path = model_asset_path
+        self.preprocessor = Preprocessor()
+
+        self._lock = threading.Lock()
+        self._latest_result = None
+        self._latest_input_size = input_size
+        self._submitted: Dict[int, Tuple[float, Tuple[int, int]]] = {}
+        self._last_timestamp_ms = -1
+        super().__init__(threshold)
+
+    def predict(self, img: np.ndarray) -> Tuple[bool, np.ndarray, Tuple[int, int], float]:
+        """
+        Submit the input image for face detection and annotate it with the newest completed
+        result, which belongs to an earlier frame while the submitted one is still processed.
+        :param img: the input image to perform object detection on
+        :return: a boolean value indicating whether a face was detected,
+        the resulting image with the bounding boxes added,
+        the center of the bounding box, and the area of the bounding box
+        """
+        img.flags.writeable = False # Set the image to read-only mode to improve performance
+
+        with METRICS.timer("detector_preprocess_seconds", detector="face"):
+            input_image = self._preprocess_image(img)
+        with METRICS.timer("detector_submit_seconds", detector="face"):
+            self._model_process(input_image)
+
+        img.flags.writeable = True # Set the image back to writeable mode
+
+        with self._lock:
+            results, input_size = self._latest_result, self._latest_input_size
+        with METRICS.timer("detector_postprocess_seconds", detector="face"):
+            detected, img, center, area = self._visualize_bounding_box(img, (results, input_size))
+        METRICS.counter("detections_total", detector="face").inc(detected)
+        return detected, img, center, area
+
+    def close(self) -> None:
+        """
+        Stop the Mediapipe task, results of frames still in flight are discarded.
+        """
+        if self.model is not None:
+            self.model.close()
+            self.model = None
+
+    def _load_model(self) -> None:
+        """
+        Create the Mediapipe Tasks face detector in live stream mode, downloading the model first
+        if needed. The task calls back into this object, so it is not shared in the registry.
+        """
+        if not live_stream_available():
+            raise ImportError("The live stream face detector requires mediapipe 0.10 or newer")
+
+        if not os.path.exists(self.model_asset_path):
+            self.logger.info("Downloading face detection model to %s", self.model_asset_path)
+            os.makedirs(os.path.dirname(self.model_asset_path), exist_ok=True)
+            urllib.request.urlretrieve(MODEL_ASSET_URL, self.model_asset_path)
+
+        self.logger.info("Loading live stream face detection model")
+        options = vision.FaceDetectorOptions(
+            base_options=BaseOptions(model_asset_path=self.model_asset_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            min_detection_confidence=self.threshold,
+            result_callback=self._on_result,
+        )
+        self.model = vision.FaceDetector.create_from_options(options)
+        self.logger.info("Live stream face detection model loaded")
+
+    def _model_process(self, img: np.ndarray) -> None:
+        """
+        Submit the preprocessed image to the face detector without waiting for the result.
+        mp.Image copies the pixels, so the preprocessing buffer can be reused right away.
+        :param img: the preprocessed input image
+        """
+        # Live stream timestamps must increase strictly
+        timestamp_ms = max(int(time.monotonic() * 1000), self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        with self._lock:
+            self._submitted[timestamp_ms] = (time.perf_counter(), self.input_size)
+        self.model.detect_async(mp.Image(image_format=mp.ImageFormat.SRGB, data=img), timestamp_ms)
+
+    def _on_result(self, result, _: mp.Image, timestamp_ms: int) -> None:
+        """
+        Store a completed result, called from the Mediapipe thread.
+        :param result: the face detection result
+        :param timestamp_ms: the timestamp the frame was submitted with
+        """
+        now = time.perf_counter()
+        with self._lock:
+            submitted, input_size = self._submitted.pop(timestamp_ms, (now, self.input_size))
+            # Frames dropped by the task never get a result, forget them
+            for stale in [stamp for stamp in self._submitted if stamp < timestamp_ms]:
+                del self._submitted[stale]
+            self._latest_result = result
+            self._latest_input_size = input_size
+        METRICS.histogram(
+            "detector_inference_seconds", detector="face", model="live_stream"
+            ).observe(now - submitted)
+
+    def _preprocess_image(self, img: np.ndarray) -> np.ndarray:
+        """
+        Preprocess the input image by resizing it to the input size
+        and converting it from BGR to RGB format.
+        :param img: the input image to be preprocessed
+        :return: the preprocessed image
+        """
+        return self.preprocessor(img, self.input_size)
+
+    # pylint: disable=R0914
+    def _visualize_bounding_box(
+        self, img: np.ndarray, detections: Tuple[Optional[object], Tuple[int, int]]
+    ) -> Tuple[bool, np.ndarray, Tuple[int, int], float]:
+        """
+        Visualize the bounding boxes around the detected faces.
+        :param img: the input image with the detected faces
+        :param detections: the newest face detection result and the input size it was made at
+        :return: a boolean value indicating whether a face was detected,
+        the resulting image with the bounding boxes added,
+        the center of the bounding box, and the area of the bounding box
+        """
+        results, (input_width, input_height) = detections
+        if results is None or not results.detections:
+            return False, img, (0, 0), 0.0
+
+        height, width, _ = img.shape
+        closest = (0, 0), 0.0
+        for detection in results.detections:
+            # Tasks boxes are in pixels of the model input, convert them to relative coordinates
+            box = detection.bounding_box
+            xmin, ymin = box.origin_x / input_width, box.origin_y / input_height
+            box_width, box_height = box.width / input_width, box.height / input_height
+            middle = (int((xmin + box_width / 2) * width), int((ymin + box_height / 2) * height))
+            area = box_width * box_height
+            if area > closest[1]:
+                closest = middle, area
+            self._draw_bounding_boxes(
+                img, detection.categories[0].score, (xmin, ymin, box_width, box_height), middle
+                )
+        return True, img, closest[0], closest[1]
+
+    def _draw_bounding_boxes(
+        self,
+        img: np.ndarray,
+        score: float,
+        box: Tuple[float, float, float, float],
+        middle: Tuple[int, int],
+    ) -> None:
+        """
+        Draw the bounding box and confidence score on the input image for a detected face.
+        :param img: the input image with the detected face
+        :param score: the confidence score of the detection
+        :param box: the relative xmin, ymin, width and height of the bounding box
+        :param middle: the middle of the bounding box in pixels
+        """
+        height, width, _ = img.shape
+        xmin, ymin = int(box[0] * width), int(box[1] * height)
+        xmax, ymax = int((box[0] + box[2]) * width), int((box[1] + box[3]) * height)
+        cv2.rectangle(img, (xmin, ymin), (xmax, ymax), (255, 0, 0), 2)
+
+        # Draw a small circle at the middle of the bounding box
+        cv2.circle(img, middle, 5, (0, 255, 0), -1)
+
+        # Draw the confidence score as text above the bounding box
+        text = f"{round(score * 100, 2)}%"
+        cv2.putText(img, text, (xmin, ymin - 10), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
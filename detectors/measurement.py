@@ -0,0 +1,54 @@
+"""
+Helpers shared by the benchmarks measuring the detectors in child processes.
+
+The frames are decoded before the measurement, and the child process reports its
+measurements on a single line of its output, which the parent process parses.
+"""
+
+import json
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+WARMUP_FRAMES = 10
+RESULT_PREFIX = "RESULT "
+
+
+def read_frames(video_paths: List[str], frames: int) -> List[np.ndarray]:
+    """
+    Decode the frames to benchmark on, so decoding is not part of the measured latency.
+    :param video_paths: the paths to the videos
+    :param frames: the maximum number of frames
+    :return: the decoded frames
+    """
+    images = []
+    for video_path in video_paths:
+        cap = cv2.VideoCapture(video_path)
+        while len(images) < frames:
+            success, img = cap.read()
+            if not success:
+                break
+            images.append(img)
+        cap.release()
+    return images
+
+
+def format_result(result: dict) -> str:
+    """
+    Format the measurements as the output line of a child process.
+    :param result: the measurements, serializable to JSON
+    :return: the line, without line break
+    """
+    return RESULT_PREFIX + json.dumps(result)
+
+
+def parse_result(line: str) -> Optional[dict]:
+    """
+    Parse a line of the output of a child process.
+    :param line: the line
+    :return: the measurements, None if the line does not hold them
+    """
+    if not line.startswith(RESULT_PREFIX):
+        return None
+    return json.loads(line[len(RESULT_PREFIX):])
@@ -0,0 +1,186 @@
+"""Module containing the ModelRegistry class, a process-wide cache of loaded detection models."""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from monitoring import process_rss
+
+DEFAULT_MEMORY_BUDGET_MB = 2048
+
+
+@dataclass
+class CachedModel:
+    """Dataclass for storing a loaded model together with its bookkeeping values."""
+
+    model: Any
+    footprint: int # in bytes
+    load_time: float # in seconds
+
+
+class ModelRegistry:
+    """
+    Keeps recently used models resident across detector instances under an LRU policy,
+    so that reconnecting to the drone does not reload the models from disk.
+    """
+
+    def __init__(self, memory_budget_mb: int = DEFAULT_MEMORY_BUDGET_MB) -> None:
+        """
+        Initialize the ModelRegistry object with the given memory budget.
+        :param memory_budget_mb: the maximum estimated size of all cached models in megabytes
+        """
+        self._models: "OrderedDict[Tuple[str, str], CachedModel]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._memory_budget = memory_budget_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.last_load_time = 0.0
+
+        self.logger = logging.getLogger(__name__)
+
+    def set_memory_budget(self, memory_budget_mb: int) -> None:
+        """
+        Change the memory budget and evict models that no longer fit into it.
+        :param memory_budget_mb: the maximum estimated size of all cached models in megabytes
+        """
+        with self._lock:
+            self._memory_budget = memory_budget_mb * 1024 * 1024
+            self._enforce_budget()
+
+    def get_or_load(
+        self,
+        model_path: str,
+        backend: str,
+        loader: Callable[[], Any],
+        footprint: Optional[int] = None,
+    ) -> Any:
+        """
+        Return the cached model for the given path and backend, loading it on a miss.
+        The lock is held while loading, so concurrent requests never load a model twice.
+        :param model_path: the path (or other unique name) of the model
+        :param backend: the backend used to run the model, e.g. "tensorflow"
+        :param loader: a callable returning the loaded model
+        :param footprint: the size of the model in bytes, measured as the growth of the resident
+        memory while loading if not given, or estimated from the files where it cannot be read
+        :return: the loaded model
+        """
+        key = (model_path, backend)
+        with self._lock:
+            cached = self._models.get(key)
+            if cached is not None:
+                self._models.move_to_end(key)
+                self.hits += 1
+                self.logger.info(
+                    "Model registry hit for %s (%s), saved %.2f s of loading",
+                    model_path, backend, cached.load_time
+                    )
+                return cached.model
+
+            self.misses += 1
+            rss_before = process_rss()
+            start_time = time.perf_counter()
+            model = loader()
+            load_time = time.perf_counter() - start_time
+            self.last_load_time = load_time
+
+            if footprint is None:
+                rss_after = process_rss()
+                # Other threads allocate meanwhile, so the growth is an approximation
+                if rss_before is not None and rss_after is not None and rss_after > rss_before:
+                    footprint = rss_after - rss_before
+                else:
+                    footprint = self._estimate_footprint(model_path)
+            self._models[key] = CachedModel(model, footprint, load_time)
+            self.logger.info(
+                "Model registry miss for %s (%s), loaded in %.2f s, %.0f MB",
+                model_path, backend, load_time, footprint / (1024 * 1024)
+                )
+            self._enforce_budget()
+            return model
+
+    def evict_least_recently_used(self, keep: int = 0) -> bool:
+        """
+        Evict the least recently used model.
+        :param keep: the number of most recently used models never evicted
+        :return: True if a model was evicted, False if no more than keep models are cached
+        """
+        with self._lock:
+            if len(self._models) <= keep:
+                return False
+            (model_path, backend), _ = self._models.popitem(last=False)
+            self.logger.info("Model registry evicted %s (%s)", model_path, backend)
+            return True
+
+    def clear(self) -> None:
+        """
+        Evict all cached models.
+        """
+        with self._lock:
+            self._models.clear()
+
+    def used_memory(self) -> int:
+        """
+        Return the estimated size of all cached models in bytes.
+        """
+        with self._lock:
+            return sum(cached.footprint for cached in self._models.values())
+
+    def footprints(self) -> Dict[str, int]:
+        """
+        Return the footprint of every cached model.
+        :return: a dictionary of the footprints in bytes keyed by the last two components
+        of the model path and the backend
+        """
+        with self._lock:
+            return {
+                f"{'/'.join(os.path.normpath(model_path).split(os.sep)[-2:])} ({backend})":
+                cached.footprint
+                for (model_path, backend), cached in self._models.items()
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the cache statistics.
+        :return: a dictionary with the hit and miss counts, the number of cached models,
+        the used memory and budget in megabytes, and the last load time in seconds
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "models": len(self._models),
+                "used_mb": self.used_memory() / (1024 * 1024),
+                "budget_mb": self._memory_budget / (1024 * 1024),
+                "last_load_time": self.last_load_time,
+            }
+
+    def _enforce_budget(self) -> None:
+        """
+        Evict least recently used models until the cache fits into the memory budget.
+        The most recently used model is always kept.
+        """
+        while len(self._models) > 1 and self.used_memory() > self._memory_budget:
+            self.evict_least_recently_used()
+
+    @staticmethod
+    def _estimate_footprint(model_path: str) -> int:
+        """
+        Estimate the memory footprint of a model from the size of its files.
+        :param model_path: the path to the model file or directory
+        :return: the estimated footprint in bytes, 0 if the path does not exist
+        """
+        if os.path.isfile(model_path):
+            return os.path.getsize(model_path)
+
+        footprint = 0
+        for directory, _, files in os.walk(model_path):
+            for file in files:
+                footprint += os.path.getsize(os.path.join(directory, file))
+        return footprint
+
+
+MODEL_REGISTRY = ModelRegistry()
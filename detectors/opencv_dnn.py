@@ -0,0 +1,107 @@
+"""Module for running exported SSD models with the OpenCV DNN module instead of TensorFlow."""
+
+import os
+from typing import Dict, Tuple
+
+import cv2
+import numpy as np
+
+OPENCV_DIRECTORY = "opencv"
+ONNX_FILE = "model.onnx"
+TENSORFLOW_GRAPH_FILE = "frozen_inference_graph.pb"
+TENSORFLOW_TEXT_GRAPH_FILE = "graph.pbtxt"
+
+# Backend and target of every supported DNN target setting
+DNN_TARGETS: Dict[str, Tuple[int, int]] = {
+    "cpu": (cv2.dnn.DNN_BACKEND_OPENCV, cv2.dnn.DNN_TARGET_CPU),
+    "opencl": (cv2.dnn.DNN_BACKEND_OPENCV, cv2.dnn.DNN_TARGET_OPENCL),
+    "opencl_fp16": (cv2.dnn.DNN_BACKEND_OPENCV, cv2.dnn.DNN_TARGET_OPENCL_FP16),
+    # Only available in OpenCV builds with the OpenVINO inference engine
+    "openvino": (cv2.dnn.DNN_BACKEND_INFERENCE_ENGINE, cv2.dnn.DNN_TARGET_CPU),
+}
+OUTPUT_NAMES = ("detection_boxes", "detection_classes", "detection_scores")
+
+
+def opencv_model_dir(saved_model_path: str) -> str:
+    """
+    Return the directory of the OpenCV export of a saved model, next to the saved model.
+    :param saved_model_path: the path to the saved model directory
+    :return: the path to the OpenCV export directory
+    """
+    return os.path.join(os.path.dirname(os.path.normpath(saved_model_path)), OPENCV_DIRECTORY)
+
+
+def has_opencv_export(model_dir: str) -> bool:
+    """
+    Check whether a directory holds one of the OpenCV exports supported by OpenCVDnnModel.
+    :param model_dir: the path to the OpenCV export directory
+    :return: True if model.onnx or the TensorFlow graph together with its text graph exists
+    """
+    return os.path.isfile(os.path.join(model_dir, ONNX_FILE)) or (
+        os.path.isfile(os.path.join(model_dir, TENSORFLOW_GRAPH_FILE))
+        and os.path.isfile(os.path.join(model_dir, TENSORFLOW_TEXT_GRAPH_FILE))
+    )
+
+
+class OpenCVDnnModel:
+    """
+    Callable running an exported SSD model with the OpenCV DNN module, returning the same
+    dictionary of outputs as the TensorFlow object detection models.
+    Two exports are supported in the model directory: model.onnx, converted from the saved
+    model with its uint8 NHWC input kept, or a TensorFlow 1 style frozen_inference_graph.pb
+    together with the graph.pbtxt text graph generated for OpenCV. The model optimizer writes
+    model.onnx after the download when tf2onnx is installed.
+    """
+
+    def __init__(self, model_dir: str, target: str = "cpu") -> None:
+        """
+        Load the exported model.
+        :param model_dir: the path to the OpenCV export directory
+        :param target: the DNN target, one of DNN_TARGETS
+        """
+        onnx_path = os.path.join(model_dir, ONNX_FILE)
+        graph_path = os.path.join(model_dir, TENSORFLOW_GRAPH_FILE)
+        text_graph_path = os.path.join(model_dir, TENSORFLOW_TEXT_GRAPH_FILE)
+        if os.path.isfile(onnx_path):
+            self.net = cv2.dnn.readNetFromONNX(onnx_path)
+            self.nhwc_input = True
+        elif os.path.isfile(graph_path) and os.path.isfile(text_graph_path):
+            self.net = cv2.dnn.readNetFromTensorflow(graph_path, text_graph_path)
+            self.nhwc_input = False
+        else:
+            raise FileNotFoundError(
+                f"No {ONNX_FILE} or {TENSORFLOW_GRAPH_FILE} with {TENSORFLOW_TEXT_GRAPH_FILE} "
+                f"found in {model_dir}"
+                )
+
+        backend, dnn_target = DNN_TARGETS[target]
+        self.net.setPreferableBackend(backend)
+        self.net.setPreferableTarget(dnn_target)
+        self.output_names = self.net.getUnconnectedOutLayersNames()
+
+    def __call__(self, input_batch: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Run the model.
+        :param input_batch: the uint8 RGB input batch of shape (1, height, width, 3)
+        :return: the detection boxes as (ymin, xmin, ymax, xmax), classes and scores,
+        each with a leading batch dimension of 1
+        """
+        if self.nhwc_input:
+            self.net.setInput(input_batch)
+        else:
+            self.net.setInput(cv2.dnn.blobFromImage(input_batch[0]))
+        outputs = {
+            name.split(":")[0]: output
+            for name, output in zip(self.output_names, self.net.forward(self.output_names))
+        }
+
+        if all(name in outputs for name in OUTPUT_NAMES):
+            return {name: outputs[name] for name in OUTPUT_NAMES}
+
+        # DetectionOutput layer: rows of (image, class, score, xmin, ymin, xmax, ymax)
+        detections = next(iter(outputs.values())).reshape(-1, 7)
+        return {
+            "detection_boxes": detections[np.newaxis, :, [4, 3, 6, 5]],
+            "detection_classes": detections[np.newaxis, :, 1],
+            "detection_scores": detections[np.newaxis, :, 2],
+        }
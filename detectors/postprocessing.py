@@ -0,0 +1,47 @@
+"""Module for the post-processing of the detection results shared by the detector backends."""
+
+import numpy as np
+
+
+# pylint: disable=R0914
+def non_max_suppression(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    max_output_size: int,
+    iou_threshold: float,
+    score_threshold: float,
+) -> np.ndarray:
+    """
+    Greedily select the boxes with the highest scores, pruning the boxes overlapping
+    a selected box by more than the IoU threshold, as tf.image.non_max_suppression does.
+    :param boxes: the boxes as (ymin, xmin, ymax, xmax) rows
+    :param scores: the score of every box
+    :param max_output_size: the maximum number of boxes to select
+    :param iou_threshold: the IoU above which a box is pruned
+    :param score_threshold: the minimum score of a selected box
+    :return: the indices of the selected boxes, by decreasing score
+    """
+    candidates = np.flatnonzero(scores > score_threshold)
+    candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+    ymin = np.minimum(boxes[:, 0], boxes[:, 2])
+    xmin = np.minimum(boxes[:, 1], boxes[:, 3])
+    ymax = np.maximum(boxes[:, 0], boxes[:, 2])
+    xmax = np.maximum(boxes[:, 1], boxes[:, 3])
+    areas = (ymax - ymin) * (xmax - xmin)
+
+    selected = []
+    while candidates.size and len(selected) < max_output_size:
+        best, candidates = candidates[0], candidates[1:]
+        selected.append(best)
+        overlap_height = np.minimum(ymax[best], ymax[candidates]) - np.maximum(
+            ymin[best], ymin[candidates]
+            )
+        overlap_width = np.minimum(xmax[best], xmax[candidates]) - np.maximum(
+            xmin[best], xmin[candidates]
+            )
+        intersection = np.clip(overlap_height, 0, None) * np.clip(overlap_width, 0, None)
+        union = areas[best] + areas[candidates] - intersection
+        iou = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+        candidates = candidates[iou <= iou_threshold]
+    return np.asarray(selected, dtype=np.int32)
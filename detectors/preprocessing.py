@@ -0,0 +1,89 @@
+"""Module for the shared image preprocessing stage of the detectors."""
+
+from typing import Dict, Tuple
+
+import cv2
+import numpy as np
+
+# TensorFlow shares the memory of numpy arrays aligned to this many bytes instead of copying them
+TENSOR_ALIGNMENT = 64
+
+
+class Preprocessor:
+    """
+    Class resizing BGR frames to the model input size and converting them to RGB.
+    The frame is resized first, so the color conversion only runs on the small image,
+    and both steps write into buffers allocated once per input size.
+    """
+
+    def __init__(
+        self, batch: bool = False, interpolation: int = cv2.INTER_LINEAR, convert: bool = True
+    ) -> None:
+        """
+        Initialize the Preprocessor object.
+        :param batch: whether to return the image with a leading batch dimension of 1
+        :param interpolation: the OpenCV interpolation used for resizing
+        :param convert: whether to convert from BGR to RGB, False for images already in RGB
+        """
+        self.batch = batch
+        self.interpolation = interpolation
+        self.convert = convert
+        self._buffers: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __call__(self, img: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+        """
+        Resize the BGR image to the given size and convert it to RGB, or only resize it
+        when conversion is disabled.
+        The returned array is reused by the next call with the same size.
+        :param img: the BGR input image
+        :param size: the width and height of the output image
+        :return: the RGB image, of shape (1, height, width, 3) in batch mode
+        """
+        resized, output = self._get_buffers(size)
+        target = output[0] if self.batch else output
+        if not self.convert:
+            cv2.resize(img, size, dst=target, interpolation=self.interpolation)
+            return output
+        cv2.resize(img, size, dst=resized, interpolation=self.interpolation)
+        cv2.cvtColor(resized, cv2.COLOR_BGR2RGB, dst=target)
+        return output
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The number of bytes held by the preallocated buffers.
+        """
+        return sum(resized.nbytes + output.nbytes for resized, output in self._buffers.values())
+
+    def clear(self) -> None:
+        """
+        Release the preallocated buffers, they are allocated again on the next call.
+        """
+        self._buffers.clear()
+
+    def _get_buffers(self, size: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the resize and output buffers for the given size, allocating them on first use.
+        :param size: the width and height of the output image
+        :return: the resize buffer and the output buffer
+        """
+        # Looked up once, the buffers may be cleared from another thread meanwhile
+        buffers = self._buffers.get(size)
+        if buffers is None:
+            width, height = size
+            shape = (1, height, width, 3) if self.batch else (height, width, 3)
+            buffers = (np.empty((height, width, 3), dtype=np.uint8), _aligned_empty(shape))
+            self._buffers[size] = buffers
+        return buffers
+
+
+def _aligned_empty(shape: Tuple[int, ...]) -> np.ndarray:
+    """
+    Allocate an uninitialized uint8 array whose data starts on a TENSOR_ALIGNMENT boundary.
+    :param shape: the shape of the array
+    :return: the array
+    """
+    size = int(np.prod(shape))
+    raw = np.empty(size + TENSOR_ALIGNMENT, dtype=np.uint8)
+    offset = -raw.ctypes.data % TENSOR_ALIGNMENT
+    return raw[offset:offset + size].reshape(shape)
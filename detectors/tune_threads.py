@@ -0,0 +1,201 @@
+"""
+Benchmark sweeping the thread pool sizes of TensorFlow and OpenCV on recorded videos.
+
+Every configuration is measured in a fresh process, as the TensorFlow thread pools cannot
+be resized once created, and the configuration with the lowest 99th percentile latency
+is stored in the settings, where the application applies it at startup.
+
+Usage: python -m detectors.tune_threads [videos ...] [--detector face|human] [--frames N]
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from pipeline import ThreadConfig, apply_thread_config, pin_current_thread
+
+from .analyze import DEFAULT_VIDEOS_PATH
+from .measurement import WARMUP_FRAMES, format_result, parse_result, read_frames
+
+DEFAULT_FRAMES = 300
+
+
+def candidate_configs(
+    detector_name: str, cpu_count: int, affinity: Optional[dict] = None
+) -> List[ThreadConfig]:
+    """
+    Build the configurations to sweep. Mediapipe has no thread settings, so only the OpenCV
+    threads are swept for the face detector.
+    :param detector_name: the detector to tune, face or human
+    :param cpu_count: the number of CPUs available
+    :param affinity: the CPUs of every stage, kept in all the configurations
+    :return: the configurations
+    """
+    affinity = affinity or {}
+    counts = sorted({count for count in (1, 2, 4, cpu_count // 2, cpu_count) if count >= 1})
+    if detector_name != "human":
+        return [ThreadConfig(opencv_threads=count, affinity=affinity) for count in counts]
+    return [
+        ThreadConfig(intra_op, inter_op, opencv_threads, affinity)
+        for intra_op in counts
+        for inter_op in (1, 2)
+        for opencv_threads in (1, 2)
+    ]
+
+
+def measure(config: ThreadConfig, args: argparse.Namespace) -> dict:
+    """
+    Measure the detector latency with the given configuration in the current process.
+    :param config: the configuration to apply before the detector is created
+    :param args: the parsed command-line arguments
+    :return: the load time, mean, 50th and 99th percentile latency in seconds and the FPS
+    """
+    apply_thread_config(config)
+    pin_current_thread("inference")
+    images = read_frames(args.videos, args.frames)
+
+    # pylint: disable=C0415
+    load_start = time.perf_counter()
+    if args.detector == "human":
+        from . import HumanDetector
+        width, height = map(int, args.model_size.split("x"))
+        detector = HumanDetector(args.model_path, height, width, args.threshold)
+    else:
+        from . import FaceDetector
+        detector = FaceDetector(args.threshold)
+    load_time = time.perf_counter() - load_start
+
+    latencies = []
+    for index, img in enumerate(images):
+        start = time.perf_counter()
+        detector.predict(img.copy())
+        if index >= WARMUP_FRAMES:
+            latencies.append(time.perf_counter() - start)
+    if not latencies:
+        raise ValueError("Not enough frames to benchmark")
+
+    latencies = np.asarray(latencies)
+    return {
+        "load_time": load_time,
+        "mean": float(latencies.mean()),
+        "p50": float(np.percentile(latencies, 50)),
+        "p99": float(np.percentile(latencies, 99)),
+        "fps": float(1 / latencies.mean()),
+    }
+
+
+def _measure_in_subprocess(config: ThreadConfig, args: argparse.Namespace) -> Optional[dict]:
+    """
+    Measure a configuration in a fresh process.
+    :param config: the configuration to measure
+    :param args: the parsed command-line arguments
+    :return: the measurements, None if the process failed
+    """
+    command = [
+        sys.executable, "-m", "detectors.tune_threads", *args.videos,
+        "--detector", args.detector, "--model-size", args.model_size,
+        "--threshold", str(args.threshold), "--frames", str(args.frames),
+        "--measure", json.dumps(config.to_dict()),
+    ]
+    if args.model_path:
+        command += ["--model-path", args.model_path]
+    process = subprocess.run(command, capture_output=True, text=True, check=False)
+    for line in reversed(process.stdout.splitlines()):
+        result = parse_result(line)
+        if result is not None:
+            return result
+    logging.getLogger(__name__).error(
+        "Measuring %s failed:\n%s", config.to_dict(), process.stderr[-2000:]
+        )
+    return None
+
+
+def tune(args: argparse.Namespace) -> Optional[ThreadConfig]:
+    """
+    Sweep the configurations and store the one with the lowest 99th percentile latency.
+    :param args: the parsed command-line arguments
+    :return: the fastest configuration, None if no configuration could be measured
+    """
+    logger = logging.getLogger(__name__)
+    settings = None
+    affinity = None
+    if not args.no_save:
+        # pylint: disable=C0415
+        from helpers.file_handlers import SettingsHandler, SettingsKeys
+        settings = SettingsHandler(args.data)
+        affinity = ThreadConfig.from_dict(settings.get_value(SettingsKeys.THREAD_CONFIG)).affinity
+
+    best_config, best_rank = None, None
+    for config in candidate_configs(args.detector, os.cpu_count() or 1, affinity):
+        result = _measure_in_subprocess(config, args)
+        if result is None:
+            continue
+        logger.info(
+            "TF intra %s, inter %s, OpenCV %s: p50 %.1f ms, p99 %.1f ms, %.1f FPS, load %.2f s",
+            config.tf_intra_op, config.tf_inter_op, config.opencv_threads,
+            result["p50"] * 1000, result["p99"] * 1000, result["fps"], result["load_time"],
+            )
+        rank = (result["p99"], result["mean"])
+        if best_rank is None or rank < best_rank:
+            best_config, best_rank = config, rank
+
+    if best_config is None:
+        logger.error("No configuration could be measured")
+        return None
+    logger.info("Fastest configuration: %s", best_config.to_dict())
+    if settings is not None:
+        settings.set_value(SettingsKeys.THREAD_CONFIG, best_config.to_dict())
+        logger.info("Stored the configuration in %s", settings.file_path)
+    return best_config
+
+
+def _parse_args() -> argparse.Namespace:
+    """
+    Parse the command-line arguments.
+    :return: the parsed arguments
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0].strip())
+    parser.add_argument(
+        "videos", nargs="*",
+        help=f"videos to benchmark on, all videos in {DEFAULT_VIDEOS_PATH}/ by default",
+        )
+    parser.add_argument("--detector", choices=("face", "human"), default="face")
+    parser.add_argument("--model-path", help="saved model directory for the human detector")
+    parser.add_argument("--model-size", default="320x320", help="model input size as WxH")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument("--data", default="data", help="directory of the settings file")
+    parser.add_argument("--no-save", action="store_true", help="do not store the result")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.detector == "human" and not args.model_path:
+        parser.error("--model-path is required for the human detector")
+    args.videos = args.videos or sorted(glob.glob(os.path.join(DEFAULT_VIDEOS_PATH, "*")))
+    if not args.videos:
+        parser.error("No videos to benchmark on")
+    return args
+
+
+def main() -> None:
+    """
+    Entry point of the benchmark.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    args = _parse_args()
+    if args.measure is not None:
+        result = measure(ThreadConfig.from_dict(json.loads(args.measure)), args)
+        print(format_result(result), flush=True)
+        return
+    tune(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,6 @@
 """Module for handlers."""
+from .command_scheduler import RcCommandScheduler, SentCommand
+from .frame_reader import FramePacket, SequencedFrameRead
+from .quality_governor import QualityGovernor, QualityLevel
+from .telemetry import TelemetryListener, TelemetrySnapshot
 from .tello_handler import TelloHandler
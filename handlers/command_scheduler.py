@@ -0,0 +1,148 @@
+"""Module for the RcCommandScheduler class."""
+from collections import deque
+from dataclasses import dataclass
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from monitoring import METRICS
+
+RcCommands = Tuple[int, int, int, int]
+HOVER: RcCommands = (0, 0, 0, 0)
+
+
+@dataclass(frozen=True)
+class SentCommand:
+    """Dataclass for an RC command together with the times it was submitted and sent."""
+
+    commands: RcCommands
+    submitted: float # time.monotonic() when the command was submitted
+    sent: float # time.monotonic() when the command was sent
+
+
+# pylint: disable=R0902
+class RcCommandScheduler:
+    """RcCommandScheduler class sends RC commands from a background thread. Only the latest
+    submitted command is kept, unchanged commands are not resent except as a keep-alive,
+    and commands are never sent faster than the drone accepts them. When nothing is submitted
+    for a while, e.g. because the control loop is stuck, the keep-alive makes the drone hover
+    instead of repeating the last velocities."""
+
+    def __init__(
+        self,
+        send: Callable[[int, int, int, int], None],
+        max_rate: float = 20.0,
+        keep_alive: float = 0.5,
+        stale_timeout: float = 1.0,
+        history_size: int = 600,
+    ) -> None:
+        """Initializes the scheduler.
+        :param send: The function sending an RC command, e.g. Tello.send_rc_control.
+        :param max_rate: The maximum number of commands sent per second.
+        :param keep_alive: The number of seconds after which an unchanged command is resent.
+        :param stale_timeout: The number of seconds without submit after which the keep-alive
+        sends the hover command instead of the last command.
+        :param history_size: The number of sent commands kept for latency analysis.
+        """
+        self._send = send
+        self.min_interval = 1 / max_rate
+        self.keep_alive = keep_alive
+        self.stale_timeout = stale_timeout
+
+        self._condition = threading.Condition()
+        self._pending: Optional[Tuple[RcCommands, float]] = None
+        self._last_sent: Optional[SentCommand] = None
+        self._last_submit: Optional[float] = None
+        self._history = deque(maxlen=history_size)
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self) -> None:
+        """Starts the sending thread."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="rc-commands", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the sending thread, commands not sent yet are discarded."""
+        with self._condition:
+            self._running = False
+            self._pending = None
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, commands: RcCommands) -> None:
+        """Submits a command without blocking, replacing any command not sent yet.
+        :param commands: The left/right, forward/backward, up/down and yaw velocities.
+        """
+        commands = tuple(commands)
+        with self._condition:
+            # Unchanged commands are coalesced, but still show the control loop is alive
+            self._last_submit = time.monotonic()
+            if self._pending is not None:
+                METRICS.counter("rc_commands_coalesced_total", "RC commands never sent").inc()
+            elif self._last_sent is not None and self._last_sent.commands == commands:
+                METRICS.counter("rc_commands_coalesced_total").inc()
+                return
+            self._pending = (commands, time.monotonic())
+            self._condition.notify_all()
+
+    def history(self) -> List[SentCommand]:
+        """Returns the recently sent commands with their timestamps, oldest first."""
+        with self._condition:
+            return list(self._history)
+
+    def _run(self) -> None:
+        """Sends the due commands until stopped."""
+        while True:
+            with self._condition:
+                command = self._pop_due_command()
+                while self._running and command is None:
+                    self._condition.wait(self._time_until_due())
+                    command = self._pop_due_command()
+                if not self._running:
+                    return
+
+            commands, submitted = command
+            self._send(*commands)
+            sent = SentCommand(commands, submitted, time.monotonic())
+            with self._condition:
+                self._last_sent = sent
+                self._history.append(sent)
+            METRICS.counter("rc_commands_total", "RC commands sent to the drone").inc()
+            METRICS.histogram("rc_command_delay_seconds", "Time from submit to send").observe(
+                sent.sent - submitted
+                )
+
+    def _pop_due_command(self) -> Optional[Tuple[RcCommands, float]]:
+        """Returns the command to send now, if any. Must be called holding the condition."""
+        now = time.monotonic()
+        if self._last_sent is not None and now < self._last_sent.sent + self.min_interval:
+            return None
+        if self._pending is not None:
+            command, self._pending = self._pending, None
+            return command
+        if self._last_sent is not None and now >= self._last_sent.sent + self.keep_alive:
+            if (
+                self._last_sent.commands != HOVER
+                and self._last_submit is not None
+                and now - self._last_submit >= self.stale_timeout
+            ):
+                METRICS.counter("rc_commands_stale_total", "Hover sent on stale commands").inc()
+                return HOVER, now
+            return self._last_sent.commands, now
+        return None
+
+    def _time_until_due(self) -> Optional[float]:
+        """Returns the seconds until a command is due, None if nothing was ever submitted.
+        Must be called holding the condition."""
+        if self._last_sent is None:
+            return None if self._pending is None else 0
+        now = time.monotonic()
+        if self._pending is not None:
+            return max(self._last_sent.sent + self.min_interval - now, 0)
+        return max(self._last_sent.sent + self.keep_alive - now, 0)
@@ -0,0 +1,126 @@
+"""Module for the SequencedFrameRead class."""
+from dataclasses import dataclass
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+
+from djitellopy.tello import BackgroundFrameRead
+import numpy as np
+
+from pipeline import FrameRingBuffer, pin_current_thread
+
+
+@dataclass(frozen=True)
+class FramePacket:
+    """Dataclass for a decoded frame together with its sequence number and decode time."""
+
+    sequence: int
+    timestamp: float # time.monotonic() when the frame was decoded
+    image: np.ndarray
+
+
+class SequencedFrameRead(BackgroundFrameRead):
+    """SequencedFrameRead class numbers every frame decoded by djitellopy and signals
+    new-frame events, so consumers can process each frame exactly once.
+    Decoded frames are written once into a shared memory ring buffer and every packet
+    holds a view of its slot, so readers in threads or worker processes never copy them."""
+
+    def __init__(self, tello, address: str, ring_slots: int = 8) -> None:
+        self._condition = threading.Condition()
+        self._packet: Optional[FramePacket] = None
+        self._listeners: List[Callable[[FramePacket], None]] = []
+        self.ring_slots = ring_slots
+        self.ring: Optional[FrameRingBuffer] = None
+        self.logger = logging.getLogger(__name__)
+        super().__init__(tello, address)
+
+    @property
+    def frame(self) -> np.ndarray:
+        """Returns the latest decoded frame, None before the first one."""
+        return None if self._packet is None else self._packet.image
+
+    @frame.setter
+    def frame(self, image: np.ndarray) -> None:
+        """Stores a decoded frame, called by the decoding thread of djitellopy.
+        The first frame grabbed before decoding starts gets the sequence number 0.
+        Frames decoded after stop are dropped, the decoder may still be blocked reading one.
+        djitellopy sets None when a read fails, the previous frame is kept instead.
+        """
+        if image is None:
+            return
+        with self._condition:
+            # stopped is only defined by BackgroundFrameRead after the first frame
+            if getattr(self, "stopped", False):
+                return
+            sequence = 0 if self._packet is None else self._packet.sequence + 1
+            image = self._write_to_ring(image, sequence)
+            packet = FramePacket(sequence, time.monotonic(), image)
+            self._packet = packet
+            self._condition.notify_all()
+        for listener in list(self._listeners):
+            listener(packet)
+
+    def update_frame(self) -> None:
+        """Decodes frames until stopped, on the CPUs configured for the decode stage."""
+        pin_current_thread("decode")
+        super().update_frame()
+
+    def stop(self) -> None:
+        """Stops decoding and releases the ring buffer, views held by readers stay valid."""
+        with self._condition:
+            self.stopped = True # pylint: disable=W0201
+            if self.ring is not None:
+                self.ring.close()
+                self.ring = None
+        # Joins the decoding thread, so it must not hold the condition the frame setter takes
+        super().stop()
+
+    def _write_to_ring(self, image: np.ndarray, sequence: int) -> np.ndarray:
+        """Copies a decoded frame into the ring buffer, created with the shape of the first frame.
+        :param image: The decoded frame.
+        :param sequence: The sequence number of the frame.
+        :return: The view of the ring slot, or the frame itself if it does not fit the ring.
+        """
+        if self.ring is None:
+            self.ring = FrameRingBuffer(image.shape, self.ring_slots, image.dtype.str)
+            self.logger.info(
+                "Frame ring buffer of %d x %s frames in %s", self.ring_slots, image.shape,
+                self.ring.name
+                )
+        if image.shape != self.ring.shape or image.dtype != self.ring.dtype:
+            self.logger.warning("Frame of shape %s does not fit the ring buffer", image.shape)
+            return image
+        return self.ring.write(image, sequence)
+
+    def latest(self) -> FramePacket:
+        """Returns the latest decoded frame with its sequence number and timestamp."""
+        return self._packet
+
+    def wait_for_frame(
+        self, after_sequence: int, timeout: Optional[float] = None
+    ) -> Optional[FramePacket]:
+        """Blocks until a frame newer than the given sequence number is decoded.
+        :param after_sequence: The sequence number of the last frame already processed.
+        :param timeout: Maximum number of seconds to wait, None waits indefinitely.
+        :return: The latest frame, or None if the timeout expired.
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._packet.sequence > after_sequence, timeout
+            ):
+                return None
+            return self._packet
+
+    def add_listener(self, listener: Callable[[FramePacket], None]) -> None:
+        """Registers a callable invoked from the decoding thread for every new frame.
+        :param listener: The callable, it must return quickly.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[FramePacket], None]) -> None:
+        """Unregisters a listener added with add_listener.
+        :param listener: The callable to remove.
+        """
+        if listener in self._listeners:
+            self._listeners.remove(listener)
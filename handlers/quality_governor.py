@@ -0,0 +1,144 @@
+"""Module for the QualityGovernor class."""
+from collections import deque
+from dataclasses import dataclass
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from monitoring import METRICS
+
+FACE_INPUT_SIZES = ((640, 480), (480, 360), (320, 240))
+
+
+@dataclass
+class QualityLevel:
+    """Dataclass describing one quality level the governor can switch to."""
+
+    name: str
+    input_size: Tuple[int, int] # width, height
+    model: Optional[dict] = None # models.json record, None when only the input size changes
+
+
+# pylint: disable=R0902
+class QualityGovernor:
+    """QualityGovernor class watches the per-frame inference latency and steps between quality
+    levels, ordered from the best (slowest) to the fastest one, to hold a target FPS."""
+
+    def __init__(
+        self,
+        levels: List[QualityLevel],
+        target_fps: float,
+        initial_index: int = 0,
+        window: int = 30,
+        cooldown: float = 5.0,
+    ) -> None:
+        """Initializes the governor.
+        :param levels: The quality levels, from the best to the fastest.
+        :param target_fps: The number of frames per second to hold.
+        :param initial_index: The index of the level in use.
+        :param window: The number of frames averaged before deciding.
+        :param cooldown: The number of seconds to wait after a switch before deciding again.
+        """
+        self.levels = levels
+        self.target_fps = target_fps
+        self.index = initial_index
+        self.cooldown = cooldown
+        # Switch down above the budget, but only back up well below it (hysteresis)
+        self.downgrade_ratio = 1.0
+        self.upgrade_ratio = 0.6
+
+        self._latencies = deque(maxlen=window)
+        self._cooldown_until = time.monotonic() + cooldown
+        self._downgraded_at: Dict[int, float] = {}
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def level(self) -> QualityLevel:
+        """Returns the quality level in use."""
+        return self.levels[self.index]
+
+    def observe(self, latency: float) -> Optional[QualityLevel]:
+        """Records the inference latency of a frame.
+        :param latency: The inference latency in seconds.
+        :return: The level to switch to, or None to keep the current one.
+        """
+        now = time.monotonic()
+        if now < self._cooldown_until:
+            return None
+
+        self._latencies.append(latency)
+        if len(self._latencies) < self._latencies.maxlen:
+            return None
+
+        average = sum(self._latencies) / len(self._latencies)
+        budget = 1 / self.target_fps
+        if average > budget * self.downgrade_ratio and self.index < len(self.levels) - 1:
+            new_index = self.index + 1
+            self._downgraded_at[self.index] = now
+        elif average < budget * self.upgrade_ratio and self.index > 0:
+            new_index = self.index - 1
+            # Back off from levels that recently proved too slow to avoid flapping
+            if now - self._downgraded_at.get(new_index, -float("inf")) < self.cooldown * 6:
+                return None
+        else:
+            return None
+
+        self.logger.info(
+            "Quality governor: %.1f ms average latency for a %.1f ms budget, switching %s -> %s",
+            average * 1000, budget * 1000, self.level.name, self.levels[new_index].name
+            )
+        self.index = new_index
+        self._latencies.clear()
+        self._cooldown_until = now + self.cooldown
+        METRICS.counter("quality_switches_total", "Quality governor switches").inc()
+        METRICS.gauge("quality_level", "Index of the quality level, 0 is the best").set(new_index)
+        return self.level
+
+
+def build_quality_levels(
+    tracker: str, selected_model: Optional[dict], models: Optional[dict]
+) -> Tuple[List[QualityLevel], int]:
+    """Builds the quality levels for the given tracker.
+    The face and combined trackers step through reduced preprocessing resolutions, the human tracker
+    through the downloaded models, sorted by input size and speed.
+    :param tracker: The tracker in use.
+    :param selected_model: The models.json record of the selected model for the human tracker.
+    :param models: The models.json data.
+    :return: The levels, from the best to the fastest, and the index of the level in use.
+    """
+    if tracker != "human_tracker":
+        levels = [
+            QualityLevel(f"{width}x{height}", (width, height))
+            for width, height in FACE_INPUT_SIZES
+        ]
+        return levels, 0
+
+    downloaded = [
+        model for model in (models or {}).values()
+        if model.get("downloaded") and model.get("downloaded_path")
+    ]
+    if selected_model is not None:
+        # The stored selection may predate the latest benchmark, match it by name
+        selected_model = next(
+            (model for model in downloaded if model["model_name"] == selected_model["model_name"]),
+            selected_model,
+        )
+        if selected_model not in downloaded:
+            downloaded.append(selected_model)
+
+    def input_area(model: dict) -> int:
+        width, height = map(int, model["size"].split("x"))
+        return width * height
+
+    def speed(model: dict) -> float:
+        # Measured on this machine if benchmarked, reported by the model zoo otherwise
+        latency = model.get("cpu_latency_ms")
+        return latency if latency is not None else model["speed"]
+
+    downloaded.sort(key=lambda model: (input_area(model), speed(model)), reverse=True)
+    levels = [
+        QualityLevel(model["model_name"], tuple(map(int, model["size"].split("x"))), model)
+        for model in downloaded
+    ]
+    initial_index = downloaded.index(selected_model) if selected_model in downloaded else 0
+    return levels, initial_index
@@ -0,0 +1,143 @@
+"""Module for the TelemetryListener class."""
+from collections import deque
+from dataclasses import dataclass, fields
+import logging
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from djitellopy import Tello
+
+
+@dataclass(frozen=True)
+# pylint: disable=R0902
+class TelemetrySnapshot:
+    """Dataclass for the state of the drone at one point in time."""
+
+    timestamp: float # time.monotonic() when the state was read
+    battery: int # in %
+    temperature: float # in °C
+    height: int # in cm, relative to the takeoff point
+    time_of_flight: int # distance to the ground in cm
+    pitch: int # in degrees
+    roll: int # in degrees
+    yaw: int # in degrees
+    wifi_snr: Optional[int] = None
+
+
+# pylint: disable=R0902
+class TelemetryListener:
+    """TelemetryListener class reads the Tello state stream in the background.
+    The latest snapshot is replaced atomically, so readers never take a lock or touch
+    the drone link, and listeners are only notified when a value changes."""
+
+    def __init__(
+        self,
+        tello: Tello,
+        interval: float = 0.1,
+        history_size: int = 600,
+        wifi_interval: Optional[float] = None,
+    ) -> None:
+        """Initializes the listener.
+        :param tello: The connected drone.
+        :param interval: The number of seconds between two state reads.
+        :param history_size: The number of snapshots kept in the history.
+        :param wifi_interval: The number of seconds between two Wi-Fi SNR queries, None disables
+        them. The query is a command awaiting a response, so it shares the command link.
+        """
+        self.tello = tello
+        self.interval = interval
+        self.wifi_interval = wifi_interval
+
+        self.latest: Optional[TelemetrySnapshot] = None
+        self._history = deque(maxlen=history_size)
+        self._listeners: List[Callable[[TelemetrySnapshot], None]] = []
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.logger = logging.getLogger(__name__)
+
+    def start(self) -> None:
+        """Starts reading the state in the background."""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops reading the state."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def history(self) -> List[TelemetrySnapshot]:
+        """Returns the recent snapshots, oldest first."""
+        return list(self._history)
+
+    def add_listener(self, listener: Callable[[TelemetrySnapshot], None]) -> None:
+        """Registers a callable invoked from the telemetry thread whenever the state changes.
+        :param listener: The callable, it must return quickly.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[TelemetrySnapshot], None]) -> None:
+        """Unregisters a listener added with add_listener.
+        :param listener: The callable to remove.
+        """
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _run(self) -> None:
+        """Reads the state until stopped."""
+        wifi_snr = None
+        next_wifi_query = time.monotonic()
+        while not self._stop_event.is_set():
+            if self.wifi_interval is not None and time.monotonic() >= next_wifi_query:
+                wifi_snr = self._query_wifi_snr()
+                next_wifi_query = time.monotonic() + self.wifi_interval
+
+            snapshot = self._read_snapshot(wifi_snr)
+            if snapshot is not None:
+                previous, self.latest = self.latest, snapshot
+                self._history.append(snapshot)
+                if previous is None or self._values(previous) != self._values(snapshot):
+                    for listener in list(self._listeners):
+                        listener(snapshot)
+
+            self._stop_event.wait(self.interval)
+
+    def _read_snapshot(self, wifi_snr: Optional[int]) -> Optional[TelemetrySnapshot]:
+        """Builds a snapshot from the last state packet received by djitellopy.
+        :param wifi_snr: The last queried Wi-Fi SNR.
+        :return: The snapshot, or None if no state was received yet.
+        """
+        state = self.tello.get_current_state()
+        if not state:
+            return None
+        return TelemetrySnapshot(
+            timestamp=time.monotonic(),
+            battery=int(state.get("bat", 0)),
+            temperature=(float(state.get("templ", 0)) + float(state.get("temph", 0))) / 2,
+            height=int(state.get("h", 0)),
+            time_of_flight=int(state.get("tof", 0)),
+            pitch=int(state.get("pitch", 0)),
+            roll=int(state.get("roll", 0)),
+            yaw=int(state.get("yaw", 0)),
+            wifi_snr=wifi_snr,
+        )
+
+    def _query_wifi_snr(self) -> Optional[int]:
+        """Queries the Wi-Fi signal to noise ratio.
+        :return: The ratio, or None if the query failed.
+        """
+        try:
+            return int(self.tello.query_wifi_signal_noise_ratio())
+        except Exception as exc: # pylint: disable=W0703
+            self.logger.warning("Wi-Fi SNR query failed: %s", exc)
+            return None
+
+    @staticmethod
+    def _values(snapshot: TelemetrySnapshot) -> Tuple:
+        """Returns the values of the snapshot without its timestamp."""
+        return tuple(
+            getattr(snapshot, field.name) for field in fields(snapshot) if field.name != "timestamp"
+        )
@@ -1,20 +1,39 @@
 """Module for the TelloHandler class."""
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+import logging
 import os
 import time
 from threading import Thread
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 import cv2
 from djitellopy import Tello
 import numpy as np
 
-from detectors import FaceDetector, HumanDetector
-from trackers import FaceTracker, HumanTracker
+from detectors import (
+    BaseDetector, CombinedDetector, FaceDetector, HumanDetector, LiveStreamFaceDetector
+)
+from detectors.face_detector import DEFAULT_RANGE_SWITCH_AREA
+from detectors.live_face_detector import live_stream_available
+from monitoring import MEMORY, METRICS
+from pipeline import InferenceServer, pin_current_thread
+from trackers import AcquisitionState, FaceTracker, HumanTracker, TargetAcquisition
+
+from .command_scheduler import RcCommandScheduler
+from .frame_reader import FramePacket, SequencedFrameRead
+from .quality_governor import QualityGovernor, QualityLevel, build_quality_levels
+from .telemetry import TelemetryListener
 
 VIDEOS_PATH = "videos"
+# Seconds after which a result of the inference server is too old to steer by
+STALE_RESULT_SECONDS = 0.5
+# The detector runs on every n-th frame while no target is in sight, and on every frame
+# once a target is a candidate, confirmed or lost
+SEARCH_DETECTION_INTERVAL = 3
 
 
+# pylint: disable=R0902
 class TelloHandler(Tello):
     """TelloHandler class is a wrapper class for the Tello class from the djitellopy library."""
 
@@ -30,30 +49,92 @@ class TelloHandler(Tello):
 
         # Backend attributes
         self.detector = None
+        self.detector_future: Optional[Future] = None
         self.tracker = None
+        self.tracker_mode = None
+        self.selected_model = None
         self.previous_errors = None
+        self.quality_governor = None
+        self.inference_spec: Optional[Tuple[str, dict, int]] = None
+        self.inference_server: Optional[InferenceServer] = None
+        self._last_inference_result = None
+        self.command_scheduler = RcCommandScheduler(self.send_rc_control)
+        self._pending_detector: Optional[Future] = None
+        self.acquisition = TargetAcquisition()
+        self.acquisition.add_listener(self._on_acquisition)
+        self.detection_interval = SEARCH_DETECTION_INTERVAL
+        self._frame_count = 0
+        self._work_frame: Optional[np.ndarray] = None
+        # The thread pools the detectors create while loading inherit the CPUs of the loader
+        self._detector_loader = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="detector-loader",
+            initializer=pin_current_thread, initargs=("inference",),
+            )
+
+        self.logger = logging.getLogger(__name__)
+
+        # State stream, read in the background so callers never block on the drone link
+        self.telemetry = TelemetryListener(self)
+        self.telemetry.start()
 
         if not os.path.exists(VIDEOS_PATH):
             os.mkdir(VIDEOS_PATH)
 
     def set_detector_and_tracker(self, tracker: str, settings: Optional[dict]) -> None:
         """Sets the detector and tracker to use.
+        The detector is loaded in a background worker, or in the inference worker processes
+        once the video stream is initiated, use wait_for_detector to wait for it.
         :param tracker: The tracker to use.
         :param settings: A dictionary containing the settings for the application.
         """
+        if self.detector_future is not None:
+            self.detector_future.cancel()
+        self.detector = None
+        self.detector_future = None
+        self.tracker_mode = tracker
+        self.selected_model = None
+        self.quality_governor = None
+        self.inference_spec = None
+        self.acquisition.reset()
+        self.detection_interval = SEARCH_DETECTION_INTERVAL
+
         if tracker == "face_tracker":
-            self.detector = FaceDetector()
+            settings = settings or {}
+            live_stream = settings.get("face_detector_backend") == "live_stream"
+            if live_stream and not live_stream_available():
+                self.logger.warning(
+                    "The live stream face detector needs mediapipe 0.10 or newer, "
+                    "falling back to the solutions backend"
+                    )
+                live_stream = False
+            if live_stream:
+                self._load_detector(LiveStreamFaceDetector, {}, settings)
+            else:
+                range_switch_area = settings.get("face_range_switch_area")
+                if range_switch_area is None:
+                    range_switch_area = DEFAULT_RANGE_SWITCH_AREA
+                self._load_detector(
+                    FaceDetector, {"range_switch_area": range_switch_area}, settings
+                    )
             self.tracker = FaceTracker()
             self.previous_errors = (0, 0)
-        elif tracker == "human_tracker":
+        elif tracker in ("human_tracker", "combined_tracker"):
             if settings is None:
                 raise ValueError(
                     "A settings dictionary must be provided when using the human tracker."
                     )
             selected_model_information = settings["selected_object_detection_model"]
+            self.selected_model = selected_model_information
             model_path = selected_model_information["downloaded_path"]
             model_width, model_height = map(int, selected_model_information["size"].split("x"))
-            self.detector = HumanDetector(model_path, model_height, model_width)
+            detector_kwargs = {
+                "model_path": model_path, "model_height": model_height, "model_width": model_width,
+                "backend": settings.get("human_detector_backend") or "tensorflow",
+                "dnn_target": settings.get("dnn_target") or "cpu",
+            }
+            # The combined mode confirms the person and refines the yaw with their face
+            detector_class = CombinedDetector if tracker == "combined_tracker" else HumanDetector
+            self._load_detector(detector_class, detector_kwargs, settings)
 
             target_distance = settings["tracking_distance"]
             target_height = settings["tracking_height"]
@@ -63,37 +144,275 @@ class TelloHandler(Tello):
         else:
             raise NotImplementedError("Tracker not implemented yet.")
 
+    def _load_detector(self, detector_class: type, detector_kwargs: dict, settings: dict) -> None:
+        """Starts loading the detector in the background, or records it for the inference
+        worker processes when the inference server mode is enabled.
+        :param detector_class: The detector class.
+        :param detector_kwargs: The keyword arguments of the detector.
+        :param settings: A dictionary containing the settings for the application.
+        """
+        workers = settings.get("inference_workers")
+        if workers:
+            self.inference_spec = (
+                f"detectors:{detector_class.__name__}", detector_kwargs, int(workers)
+                )
+        else:
+            self.detector_future = self._detector_loader.submit(detector_class, **detector_kwargs)
+
+    def enable_quality_governor(self, target_fps: float, models: Optional[dict] = None) -> None:
+        """Enables switching between quality levels to hold the target FPS.
+        :param target_fps: The number of frames per second to hold.
+        :param models: The models.json data, the human tracker switches between the downloaded
+        models.
+        """
+        if self.inference_spec is not None:
+            self.logger.info("Quality governor is not available in the inference server mode")
+            return
+        levels, initial_index = build_quality_levels(self.tracker_mode, self.selected_model, models)
+        if len(levels) < 2:
+            self.logger.info("Quality governor disabled, there is only one quality level")
+            return
+        self.quality_governor = QualityGovernor(levels, target_fps, initial_index)
+        self.logger.info(
+            "Quality governor targeting %s FPS over levels %s",
+            target_fps, [level.name for level in levels]
+            )
+
+    def wait_for_detector(self, timeout: Optional[float] = None) -> Optional[BaseDetector]:
+        """Blocks until the detector loaded in the background is ready.
+        :param timeout: Maximum number of seconds to wait, None waits indefinitely.
+        :return: The loaded detector, None if it runs in the inference worker processes.
+        """
+        if self.inference_server is not None:
+            self.inference_server.wait_until_ready(timeout)
+            return None
+        if self.detector is None:
+            if self.detector_future is None:
+                raise RuntimeError("No detector has been selected.")
+            self.detector = self.detector_future.result(timeout)
+        return self.detector
+
     def initiate_video_stream(self) -> None:
-        """Initiates the video stream and video recording if enabled."""
+        """Initiates the video stream and video recording if enabled.
+        Waits for the detector as the stream is useless without it.
+        """
         self.streamon()
+        frame_read = self.get_frame_read()
         if self.record_video:
             self._start_recording()
+        if self.inference_spec is not None and self.inference_server is None:
+            detector_path, detector_kwargs, workers = self.inference_spec
+            self.inference_server = InferenceServer(
+                detector_path, detector_kwargs, frame_read.ring, workers
+                )
+            self.inference_server.start()
+        MEMORY.add_source("tello", "buffer", self._buffer_sizes)
+        MEMORY.add_reclaimer("preprocessing buffers", self._release_buffers)
+        self.wait_for_detector()
 
-    def detect_and_track(self, track: bool) -> Tuple[bool, np.ndarray]:
+    def _buffer_sizes(self) -> Dict[str, int]:
+        """Returns the sizes of the frame, recorder and preprocessing buffers in bytes,
+        reported to the memory monitor."""
+        sizes = {}
+        frame_read = self.background_frame_read
+        ring = None if frame_read is None else frame_read.ring
+        if ring is not None:
+            sizes["frame ring"] = ring.nbytes
+            if self.recording:
+                # The recorder keeps no queue, it encodes from the ring slot it holds
+                sizes["recorder frame"] = ring.nbytes // ring.slots
+        if self._work_frame is not None:
+            sizes["work frame"] = self._work_frame.nbytes
+        if self.inference_server is not None:
+            sizes["inference rings"] = self.inference_server.output_nbytes
+        if isinstance(self.detector, BaseDetector):
+            sizes["preprocessing"] = self.detector.buffer_nbytes
+        return sizes
+
+    def _release_buffers(self) -> bool:
+        """Releases the preprocessing buffers of the detector when over the memory budget.
+        The shared frame ring buffers cannot be resized while the workers map them.
+        :return: Whether any memory was released.
+        """
+        if not isinstance(self.detector, BaseDetector):
+            return False
+        return self.detector.release_buffers()
+
+    def get_frame_read(self) -> SequencedFrameRead:
+        """Returns the frame reader, which numbers every decoded frame and signals new frames."""
+        if self.background_frame_read is None:
+            address = self.get_udp_video_address()
+            self.background_frame_read = SequencedFrameRead(self, address) # pylint: disable=W0201
+            self.background_frame_read.start()
+        return self.background_frame_read
+
+    def detect_and_track(
+        self, track: bool, packet: Optional[FramePacket] = None
+    ) -> Tuple[bool, np.ndarray]:
         """Detects and tracks the object.
         :param track: Whether to track the object or not.
+        :param packet: The frame to process, the latest decoded frame if not given.
         """
-        img = self.get_frame_read().frame
-        detected, img, center, metric = self.detector.predict(img)
-        self.previous_errors, commands = self.tracker.track(
-            center, self.previous_errors, metric, track
-            )
-        self.send_rc_control(*commands)
+        if self.inference_server is not None:
+            return self._detect_and_track_remote(
+                track, self.get_frame_read().latest() if packet is None else packet
+                )
+        self._swap_pending_detector()
+        with METRICS.timer("frame_processing_seconds"):
+            img = self.get_frame_read().frame if packet is None else packet.image
+            if self._skip_detection():
+                return False, img
+            img = self._to_work_frame(img)
+            inference_start = time.perf_counter()
+            detected, img, center, metric = self.detector.predict(img)
+            self._govern_quality(time.perf_counter() - inference_start)
+            self.acquisition.update(detected)
+            with METRICS.timer("tracker_seconds"):
+                self.previous_errors, commands = self.tracker.track(
+                    center, self.previous_errors, metric, track
+                    )
+            self.command_scheduler.submit(commands)
         return detected, img
 
+    def _detect_and_track_remote(self, track: bool, packet: FramePacket) -> Tuple[bool, np.ndarray]:
+        """Hands the frame to the inference server and tracks on its newest result.
+        Without a recent result, e.g. while a crashed worker restarts, the drone hovers.
+        :param track: Whether to track the object or not.
+        :param packet: The frame to process.
+        """
+        with METRICS.timer("frame_processing_seconds"):
+            if not self._skip_detection():
+                self.inference_server.submit(packet.sequence)
+            result = self.inference_server.latest
+            if (
+                result is None
+                or not self.inference_server.healthy
+                or time.monotonic() - result.received > STALE_RESULT_SECONDS
+            ):
+                self.command_scheduler.submit((0, 0, 0, 0))
+                self.acquisition.update(False)
+                return False, packet.image
+
+            if result is not self._last_inference_result:
+                self._last_inference_result = result
+                self.acquisition.update(result.detected)
+                with METRICS.timer("tracker_seconds"):
+                    self.previous_errors, commands = self.tracker.track(
+                        result.center, self.previous_errors, result.metric, track
+                        )
+                self.command_scheduler.submit(commands)
+            annotated = self.inference_server.annotated_frame(result)
+        return result.detected, packet.image if annotated is None else annotated.image
+
+    def _to_work_frame(self, image: np.ndarray) -> np.ndarray:
+        """Copies a frame out of its ring buffer slot into the reused work buffer, as the
+        decoder overwrites the slot while a slow detector still reads and draws on it.
+        :param image: The frame, usually a view of a ring buffer slot.
+        :return: The work buffer holding the frame.
+        """
+        if (
+            self._work_frame is None
+            or self._work_frame.shape != image.shape
+            or self._work_frame.dtype != image.dtype
+        ):
+            self._work_frame = np.empty_like(image)
+        np.copyto(self._work_frame, image)
+        return self._work_frame
+
+    def _skip_detection(self) -> bool:
+        """Returns whether the detector skips the frame at the current detection interval."""
+        skip = self._frame_count % self.detection_interval != 0
+        self._frame_count += 1
+        if skip:
+            METRICS.counter("detections_skipped_total", "Frames the detector skipped").inc()
+        return skip
+
+    def _on_acquisition(self, state: AcquisitionState) -> None:
+        """Adapts the detector rate to the acquisition state and stops the drone when the
+        target is lost, so the controller does not act on the errors measured before the loss
+        once the target is reacquired.
+        :param state: The new acquisition state.
+        """
+        if state is AcquisitionState.SEARCHING:
+            self.detection_interval = SEARCH_DETECTION_INTERVAL
+        else:
+            self.detection_interval = 1
+        if state is AcquisitionState.LOST:
+            if self.previous_errors is not None:
+                self.previous_errors = tuple(0 for _ in self.previous_errors)
+            self.command_scheduler.submit((0, 0, 0, 0))
+        self.logger.info(
+            "Target %s, detector runs on every %d. frame", state.value, self.detection_interval
+            )
+
+    def _govern_quality(self, inference_latency: float) -> None:
+        """Feeds the inference latency to the quality governor and applies its decision.
+        :param inference_latency: The inference latency of the frame in seconds.
+        """
+        if self.quality_governor is None or self._pending_detector is not None:
+            return
+        level = self.quality_governor.observe(inference_latency)
+        if level is not None:
+            self._apply_quality_level(level)
+
+    def _apply_quality_level(self, level: QualityLevel) -> None:
+        """Switches the detector to the given quality level.
+        Models are loaded in the background and swapped in once ready.
+        :param level: The quality level to switch to.
+        """
+        width, height = level.input_size
+        if level.model is None:
+            self.detector.input_size = (width, height)
+            return
+        self._pending_detector = self._detector_loader.submit(
+            HumanDetector, level.model["downloaded_path"], height, width,
+            backend=self.detector.backend, dnn_target=self.detector.dnn_target,
+            )
+
+    def _swap_pending_detector(self) -> None:
+        """Replaces the detector with the one loaded for a quality switch once it is ready."""
+        if self._pending_detector is None or not self._pending_detector.done():
+            return
+        pending, self._pending_detector = self._pending_detector, None
+        try:
+            self.detector = pending.result()
+        except Exception as exc: # pylint: disable=W0703
+            self.logger.error("Quality governor could not load the model: %s", exc)
+
     def takeoff_and_hover(self) -> None:
-        """Takes off and hover"""
+        """Takes off and hover, never before the detector is ready."""
+        self.wait_for_detector()
         self.takeoff()
-        self.send_rc_control(0, 0, 35, 0)
+        self.command_scheduler.start()
+        self.command_scheduler.submit((0, 0, 35, 0))
         time.sleep(1)
 
+    def stop_video_stream(self) -> None:
+        """Stops the recording, the inference workers, the frame reader and the video stream,
+        e.g. when starting the flight failed. Does nothing for the parts not running."""
+        if self.recording:
+            self._stop_recording()
+        if self.stream_on:
+            self.streamoff()
+        MEMORY.remove_source("tello")
+        MEMORY.remove_reclaimer("preprocessing buffers")
+        if self.inference_server is not None:
+            self.inference_server.stop()
+            self.inference_server = None
+        if self.background_frame_read is not None:
+            self.background_frame_read.stop()
+            self.background_frame_read = None # pylint: disable=W0201
+
     def disconnect(self) -> None:
         """Disconnects from the drone and lands it."""
+        self.command_scheduler.stop()
         self.send_rc_control(0, 0, 0, 0)
-        if self.record_video:
-            self._stop_recording()
-        self.streamoff()
+        self.stop_video_stream()
         self.land()
+        self.telemetry.stop()
+        if isinstance(self.detector, LiveStreamFaceDetector):
+            self.detector.close()
+        self._detector_loader.shutdown(wait=False, cancel_futures=True)
 
     def _start_recording(self):
         """Starts recording the video feed from the drone."""
@@ -106,13 +425,20 @@ class TelloHandler(Tello):
             (width, height)
             )
         self.recording = True
-        self.recorder_thread = Thread(target=self._keep_recording)
+        self.recorder_thread = Thread(target=self._keep_recording, name="recorder")
         self.recorder_thread.start()
 
     def _keep_recording(self) -> None:
+        """Writes every newly decoded frame exactly once until the recording is stopped."""
+        pin_current_thread("recorder")
+        frame_read = self.get_frame_read()
+        last_sequence = -1
         while self.recording:
-            self.video.write(self.get_frame_read().frame)
-            time.sleep(1 / 30)
+            packet = frame_read.wait_for_frame(last_sequence, timeout=0.5)
+            if packet is None:
+                continue
+            last_sequence = packet.sequence
+            self.video.write(packet.image)
         self.video.release()
 
     def _stop_recording(self) -> None:
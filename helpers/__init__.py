@@ -1,5 +1,8 @@
 """Module containing helper functions and classes for application. """
 from .model_scraper import ModelScraper, ModelScraperError
 from .model_downloader import ModelDownloader
+from .model_benchmark import ModelBenchmark, benchmark_sort_key, format_benchmark
 from .file_handlers import ModelsHandler, SettingsHandler, SettingsKeys
 from .kv_file_loader import load_kv_file_for_class
+from .log_queue import setup_queue_logging, DroppingQueueHandler, RateLimitFilter
+from .log_reader import LogReader, LOG_FORMAT
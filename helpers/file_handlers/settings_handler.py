@@ -20,6 +20,17 @@ class SettingsKeys(enum.Enum):
     TRACKING_DISTANCE = "tracking_distance"
     DEBUG_MODE = "debug_mode"
     SELECTED_OBJECT_DETECTION_MODEL = "selected_object_detection_model"
+    MODEL_CACHE_BUDGET_MB = "model_cache_budget_mb"
+    METRICS_PORT = "metrics_port"
+    TARGET_FPS = "target_fps"
+    FACE_RANGE_SWITCH_AREA = "face_range_switch_area"
+    FACE_DETECTOR_BACKEND = "face_detector_backend"
+    INFERENCE_WORKERS = "inference_workers"
+    THREAD_CONFIG = "thread_config"
+    HUMAN_DETECTOR_BACKEND = "human_detector_backend"
+    DNN_TARGET = "dnn_target"
+    MEMORY_BUDGET_MB = "memory_budget_mb"
+    PREVIEW_FPS = "preview_fps"
 
 
 class SettingsHandler(BaseHandler):
@@ -34,7 +45,18 @@ class SettingsHandler(BaseHandler):
             "tracking_height": None,
             "tracking_distance": None,
             "debug_mode": False,
-            "selected_object_detection_model": None
+            "selected_object_detection_model": None,
+            "model_cache_budget_mb": 2048,
+            "metrics_port": None,
+            "target_fps": None,
+            "face_range_switch_area": None,
+            "face_detector_backend": "solutions",
+            "inference_workers": None,
+            "thread_config": None,
+            "human_detector_backend": "tensorflow",
+            "dnn_target": "cpu",
+            "memory_budget_mb": None,
+            "preview_fps": None
         }
         super().__init__(data_directory, "settings.json")
 
@@ -0,0 +1,140 @@
+"""This module defines the non-blocking, queue-based logging setup of the application."""
+
+from collections import OrderedDict
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
+import threading
+import time
+from typing import Tuple
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    The DroppingQueueHandler class enqueues records for a background listener and never blocks,
+    counting the records it drops while the queue is full.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        """
+        Initialize the DroppingQueueHandler object with the given bounded queue.
+
+        :param log_queue: The queue shared with the QueueListener.
+        """
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """
+        Put the record into the queue, dropping it if the queue is full.
+
+        :param record: The prepared log record.
+        """
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Copy the record for the queue, reporting the similar records suppressed before it
+        in the copy only, so other handlers of the record are not affected.
+
+        :param record: The log record.
+        :return: The copy to enqueue.
+        """
+        record = super().prepare(record)
+        suppressed = getattr(record, "suppressed_similar", 0)
+        if suppressed:
+            record.msg = f"{record.msg} (suppressed {suppressed} similar messages)"
+        return record
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    The RateLimitFilter class limits how often records with the same logger and message
+    template pass, so per-frame messages cannot flood the log. Each template gets a token
+    bucket, only the most recently used ones are kept, and the first record passing after
+    a suppression carries how many were skipped in its suppressed_similar attribute.
+    """
+
+    def __init__(self, max_rate: float = 5.0, burst: int = 20, max_templates: int = 500) -> None:
+        """
+        Initialize the RateLimitFilter object.
+
+        :param max_rate: The sustained number of records per second allowed per template.
+        :param burst: The number of records per template allowed in a burst.
+        :param max_templates: The number of templates whose buckets are kept.
+        """
+        super().__init__()
+        self.max_rate = max_rate
+        self.burst = burst
+        self.max_templates = max_templates
+        self.suppressed = 0
+        self._buckets: OrderedDict[Tuple[str, str], list] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Decide if the record may be logged.
+
+        :param record: The log record.
+        :return: True if the record passes the rate limit.
+        """
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            # bucket = [tokens, last update time, suppressed since last passed record]
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+                if len(self._buckets) > self.max_templates:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.max_rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                self.suppressed += 1
+                return False
+            bucket[0] -= 1
+            skipped, bucket[2] = bucket[2], 0
+
+        if skipped:
+            record.suppressed_similar = skipped
+        return True
+
+
+def setup_queue_logging(
+    logger: logging.Logger,
+    handler: logging.Handler,
+    queue_size: int = 10000,
+    max_rate: float = 5.0,
+    burst: int = 20,
+) -> Tuple[DroppingQueueHandler, QueueListener]:
+    """
+    Attach the given handler to the logger through a bounded queue, so the handler
+    (e.g. a FileHandler) runs on a background thread instead of the calling thread.
+
+    :param logger: The logger to attach to.
+    :param handler: The handler doing the actual, possibly blocking, output.
+    :param queue_size: The maximum number of records waiting to be written.
+    :param max_rate: The sustained number of records per second allowed per message template.
+    :param burst: The number of records per message template allowed in a burst.
+    :return: The queue handler, whose dropped attribute counts dropped records,
+        and the already started listener, which must be stopped on exit.
+    """
+    log_queue = queue.Queue(maxsize=queue_size)
+
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.setLevel(handler.level)
+    queue_handler.addFilter(RateLimitFilter(max_rate, burst))
+
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+
+    logger.addHandler(queue_handler)
+    return queue_handler, listener
@@ -0,0 +1,213 @@
+"""This module defines the LogReader class for incrementally reading and paging the session log."""
+
+from array import array
+import os
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] [%(name)s] %(message)s"
+
+
+# pylint: disable=R0902
+class LogReader:
+    """
+    The LogReader class tails the session log from a remembered offset and keeps a line
+    index, so pages of the log can be read and filtered without loading the whole file.
+    """
+
+    LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+    CHUNK_SIZE = 1024 * 1024
+
+    _LINE_PATTERN = re.compile(
+        rb"\S+ \S+ \[(?P<level>[A-Z]+)\] \[(?P<name>[^\]]+)\] (?:(?P<prefix>[\w ]+): )?"
+    )
+
+    def __init__(self, file_path: str) -> None:
+        """
+        Initialize the LogReader object for the given log file.
+
+        :param file_path: The path to the log file.
+        """
+        self.file_path = file_path
+        self._offset = 0
+        self._line_offsets = array("q")
+        self._line_levels = array("b")
+        self._line_sources = array("H")
+        self._sources: List[str] = []
+        self._source_ids: Dict[str, int] = {}
+        self._filter_cache: Dict[Tuple[int, Optional[str]], Tuple[int, array]] = {}
+
+    @property
+    def line_count(self) -> int:
+        """
+        Return the number of complete lines indexed so far.
+        """
+        return len(self._line_offsets)
+
+    @property
+    def sources(self) -> List[str]:
+        """
+        Return the names of all log sources seen so far.
+        """
+        return list(self._sources)
+
+    def refresh(self) -> int:
+        """
+        Index the lines appended to the log file since the last refresh.
+
+        :return: The number of new lines.
+        """
+        if not os.path.exists(self.file_path):
+            return 0
+
+        new_lines = 0
+        with open(self.file_path, "rb") as file:
+            file.seek(self._offset)
+            while True:
+                chunk = file.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                last_newline = chunk.rfind(b"\n")
+                if last_newline == -1:
+                    if len(chunk) < self.CHUNK_SIZE:
+                        break
+                    # A single line longer than the chunk is indexed in pieces
+                    last_newline = len(chunk) - 1
+                complete = chunk[: last_newline + 1]
+                new_lines += self._index_chunk(complete)
+                self._offset += len(complete)
+                file.seek(self._offset)
+        return new_lines
+
+    def filter(self, min_level: Optional[str] = None, source: Optional[str] = None) -> array:
+        """
+        Return the numbers of the lines matching the given filters.
+        Only the in-memory index is used, the file is not read.
+
+        :param min_level: The minimum level of the lines, None for all levels.
+        :param source: The prefix of the source (logger name and component) of the lines.
+        :return: An array with the matching line numbers.
+        """
+        level = self._level_number(min_level)
+        key = (level, source)
+        indexed_upto, line_numbers = self._filter_cache.get(key, (0, array("q")))
+
+        matching_sources = {
+            source_id
+            for source_id, source_name in enumerate(self._sources)
+            if source is None or source_name.startswith(source)
+        }
+        for line_number in range(indexed_upto, self.line_count):
+            if (
+                self._line_levels[line_number] >= level
+                and self._line_sources[line_number] in matching_sources
+            ):
+                line_numbers.append(line_number)
+
+        self._filter_cache[key] = (self.line_count, line_numbers)
+        return line_numbers
+
+    def read_lines(self, line_numbers: Sequence[int]) -> List[str]:
+        """
+        Read the given lines from the log file.
+
+        :param line_numbers: The numbers of the lines to read.
+        :return: The text of the lines without the trailing newline.
+        """
+        lines = []
+        with open(self.file_path, "rb") as file:
+            for start, end in self._contiguous_ranges(line_numbers):
+                file.seek(self._line_offsets[start])
+                data = file.read(self._line_end(end) - self._line_offsets[start])
+                lines.extend(data.decode("utf-8", errors="replace").splitlines())
+        return lines
+
+    def read_page(
+        self,
+        page: int,
+        page_size: int,
+        min_level: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> Tuple[List[str], int]:
+        """
+        Read a page of the (optionally filtered) log.
+
+        :param page: The index of the page, negative values count from the end.
+        :param page_size: The number of lines per page.
+        :param min_level: The minimum level of the lines, None for all levels.
+        :param source: The prefix of the source of the lines, None for all sources.
+        :return: The lines of the page and the total number of pages.
+        """
+        line_numbers = self.filter(min_level, source)
+        total_pages = max(1, -(-len(line_numbers) // page_size))
+        page = min(max(page if page >= 0 else total_pages + page, 0), total_pages - 1)
+        page_lines = line_numbers[page * page_size : (page + 1) * page_size]
+        return self.read_lines(page_lines), total_pages
+
+    def _index_chunk(self, chunk: bytes) -> int:
+        """
+        Index the complete lines of the given chunk, which starts at the current offset.
+
+        :param chunk: The bytes of one or more complete lines.
+        :return: The number of indexed lines.
+        """
+        position = 0
+        count = 0
+        previous_level = self._line_levels[-1] if self._line_levels else 0
+        previous_source = self._line_sources[-1] if self._line_sources else self._source_id("")
+        while position < len(chunk):
+            end = chunk.find(b"\n", position)
+            end = len(chunk) - 1 if end == -1 else end
+            match = self._LINE_PATTERN.match(chunk, position, end)
+            if match:
+                previous_level = self._level_number(match.group("level").decode())
+                name = match.group("name").decode()
+                prefix = match.group("prefix")
+                previous_source = self._source_id(
+                    f"{name}.{prefix.decode()}" if prefix else name
+                    )
+            # Lines without a header (e.g. tracebacks) belong to the previous record
+            self._line_offsets.append(self._offset + position)
+            self._line_levels.append(previous_level)
+            self._line_sources.append(previous_source)
+            position = end + 1
+            count += 1
+        return count
+
+    def _source_id(self, source: str) -> int:
+        """
+        Return the id of the given source, registering it if it is new.
+        """
+        if source not in self._source_ids:
+            self._source_ids[source] = len(self._sources)
+            self._sources.append(source)
+        return self._source_ids[source]
+
+    def _level_number(self, level: Optional[str]) -> int:
+        """
+        Return the index of the given level name, 0 for None or unknown levels.
+        """
+        if level in self.LEVELS:
+            return self.LEVELS.index(level)
+        return 0
+
+    def _line_end(self, line_number: int) -> int:
+        """
+        Return the offset just after the given line.
+        """
+        if line_number + 1 < self.line_count:
+            return self._line_offsets[line_number + 1]
+        return self._offset
+
+    @staticmethod
+    def _contiguous_ranges(line_numbers: Sequence[int]) -> List[Tuple[int, int]]:
+        """
+        Group the sorted line numbers into inclusive ranges of consecutive lines.
+        """
+        ranges = []
+        for line_number in line_numbers:
+            if ranges and ranges[-1][1] + 1 == line_number:
+                ranges[-1] = (ranges[-1][0], line_number)
+            else:
+                ranges.append((line_number, line_number))
+        return ranges
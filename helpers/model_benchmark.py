@@ -0,0 +1,147 @@
+"""
+Module for benchmarking the downloaded models on this machine.
+"""
+
+import glob
+import json
+import os
+import subprocess
+import sys
+import threading
+from typing import Callable, List, Optional
+
+from kivy.logger import Logger
+
+from .file_handlers import ModelsHandler
+
+BENCHMARK_CLIPS_PATH = os.path.join("videos", "benchmark")
+RESULT_PREFIX = "RESULT "
+
+
+class ModelBenchmark:
+    """
+    A class for measuring the CPU latency, peak memory and load time of the downloaded models
+    on a standard set of clips, and storing them in models.json.
+    """
+
+    def __init__(
+        self,
+        models_handler: ModelsHandler,
+        clips_path: str = BENCHMARK_CLIPS_PATH,
+        callback: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        """
+        Initialize the ModelBenchmark object.
+
+        :param models_handler: The ModelsHandler object.
+        :param clips_path: The directory of the clips to run the models on.
+                           The recorded videos are used if it does not exist.
+        :param callback: Optional; a function to be called with the name of each measured model.
+        """
+        self._models_handler = models_handler
+        self._clips_path = clips_path
+        self._callback = callback
+
+    def benchmark_models_threaded(self, on_complete: Optional[Callable[[], None]] = None) -> None:
+        """
+        Benchmark every downloaded model on a separate thread.
+
+        :param on_complete: Optional; a function to be called once all models are measured.
+        """
+        def run() -> None:
+            self.benchmark_models()
+            if on_complete is not None:
+                on_complete()
+
+        Logger.info("Model Benchmark: Creating thread...")
+        threading.Thread(target=run, name="model-benchmark", daemon=True).start()
+
+    def benchmark_models(self) -> None:
+        """
+        Benchmark every downloaded model, one process per model so the load time and
+        the peak memory are measured from a cold start.
+        """
+        clips = self._get_clips()
+        if not clips:
+            Logger.error("Model Benchmark: No clips found in %s", self._clips_path)
+            return
+
+        for model_name, model in self._models_handler.read_data().items():
+            if not model.get("downloaded") or not model.get("downloaded_path"):
+                continue
+            Logger.info("Model Benchmark: Benchmarking %s...", model_name)
+            result = self._benchmark_model(model, clips)
+            if result is None:
+                continue
+            Logger.info("Model Benchmark: %s - %s", model_name, result)
+
+            # Read again, the models file may have been modified meanwhile
+            models = self._models_handler.read_data()
+            models[model_name].update(result)
+            self._models_handler.write_data(models)
+            if self._callback is not None:
+                self._callback(model_name)
+
+    def _get_clips(self) -> List[str]:
+        """
+        Get the clips to run the models on.
+
+        :return: The paths to the clips.
+        """
+        clips_path = self._clips_path if os.path.isdir(self._clips_path) else "videos"
+        return sorted(
+            path for path in glob.glob(os.path.join(clips_path, "*")) if os.path.isfile(path)
+        )
+
+    @staticmethod
+    def _benchmark_model(model: dict, clips: List[str]) -> Optional[dict]:
+        """
+        Benchmark a model in a separate process.
+
+        :param model: The model information.
+        :param clips: The paths to the clips.
+        :return: The measurements, None if the benchmark failed.
+        """
+        command = [
+            sys.executable, "-m", "detectors.benchmark", *clips,
+            "--model-path", model["downloaded_path"], "--model-size", model["size"],
+        ]
+        process = subprocess.run(command, capture_output=True, text=True, check=False)
+        for line in reversed(process.stdout.splitlines()):
+            if line.startswith(RESULT_PREFIX):
+                return json.loads(line[len(RESULT_PREFIX):])
+        Logger.error(
+            "Model Benchmark: Benchmarking %s failed - %s",
+            model["model_name"], process.stderr[-2000:]
+            )
+        return None
+
+
+def benchmark_sort_key(model: dict) -> tuple:
+    """
+    Sort key ordering the measured models by their CPU latency, followed by the models
+    not measured yet by the speed reported by the model zoo.
+
+    :param model: The model information.
+    :return: The sort key.
+    """
+    latency = model.get("cpu_latency_ms")
+    return (0, latency) if latency is not None else (1, model["speed"])
+
+
+def format_benchmark(model: dict) -> str:
+    """
+    Format the measurements of a model for the model lists.
+
+    :param model: The model information.
+    :return: The measurements, or the speed reported by the model zoo if not measured yet.
+    """
+    if model.get("cpu_latency_ms") is None:
+        return f"Zoo GPU speed: {model['speed']} ms "
+    rss = model.get("peak_rss_mb")
+    return (
+        f"CPU: {model['cpu_latency_ms']} ms "
+        f"(model {model['cpu_inference_ms']} ms) "
+        f"Load: {model['load_time_s']} s "
+        + (f"RSS: {rss} MB " if rss is not None else "")
+    )
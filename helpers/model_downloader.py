@@ -10,8 +10,6 @@ from typing import Callable, Optional
 import aiohttp
 from kivy.logger import Logger
 
-from tensorflow.python.keras.utils.data_utils import get_file
-
 from .file_handlers import ModelsHandler
 
 
@@ -67,6 +65,7 @@ class ModelDownloader:
 
         self._remove_archive_files()
         self._save_path_to_models()
+        self._optimize_downloaded_models()
 
     async def download_models(self, model: dict) -> list:
         """
@@ -80,6 +79,10 @@ class ModelDownloader:
             return await asyncio.gather(*tasks)
 
     def _get_file_wrapper(self, file_name, download_link, cache_dir) -> None:
+        # Imported here, so the application starts without TensorFlow
+        # pylint: disable=C0415
+        from tensorflow.python.keras.utils.data_utils import get_file
+
         return get_file(
             fname=file_name,
             origin=download_link,
@@ -152,3 +155,25 @@ class ModelDownloader:
             model["downloaded"] = True
         self._models_handler.write_data(existing_models)
         Logger.info("Model Downloader: Models modified successfully")
+
+    def _optimize_downloaded_models(self) -> None:
+        """
+        Export the optimized frozen graph of every downloaded model and save the comparison
+        with the saved model to models.json. The detector falls back to the saved model
+        when the optimization fails.
+        """
+        # pylint: disable=C0415
+        from pipeline import import_tensorflow
+        import_tensorflow() # sizes the thread pools before the optimizer imports TensorFlow
+        from .model_optimizer import ModelOptimizer
+        optimizer = ModelOptimizer()
+        for model_name, saved_model_path in self._downloaded_models:
+            existing_models = self._models_handler.read_data()
+            model = existing_models[model_name]
+            width, height = map(int, model["size"].split("x"))
+            try:
+                model["optimization"] = optimizer.optimize(saved_model_path, width, height)
+            except Exception as exc: # pylint: disable=W0703
+                Logger.error("Model Downloader: Could not optimize %s - %s", model_name, exc)
+                continue
+            self._models_handler.write_data(existing_models)
@@ -0,0 +1,224 @@
+"""
+Module for exporting the downloaded saved models as graph-optimized frozen graphs.
+"""
+
+import json
+import os
+import shutil
+import time
+from typing import Callable
+
+from kivy.logger import Logger
+import numpy as np
+import tensorflow as tf
+from tensorflow.core.protobuf import config_pb2, meta_graph_pb2
+from tensorflow.python.framework.convert_to_constants import convert_variables_to_constants_v2
+from tensorflow.python.grappler import tf_optimizer
+
+from detectors.frozen_graph import (
+    GRAPH_FILE,
+    SIGNATURE_FILE,
+    FrozenGraphModel,
+    optimized_model_dir,
+    read_signature
+)
+from detectors.opencv_dnn import ONNX_FILE, OUTPUT_NAMES, OpenCVDnnModel, opencv_model_dir
+
+GRAPPLER_OPTIMIZERS = ["pruning", "constfold", "arithmetic", "layout", "dependency"]
+BENCHMARK_RUNS = 20
+WARMUP_RUNS = 3
+# The optimized graph must reproduce the strongest detections of the saved model
+VALIDATED_DETECTIONS = 10
+VALIDATION_TOLERANCE = 1e-2
+ONNX_OPSET = 13
+
+
+class ModelOptimizer:
+    """
+    A class for freezing the serving signature of a saved model with a fixed 1xHxW input
+    and optimizing the frozen graph with Grappler for single-image CPU inference.
+    When tf2onnx is installed, the frozen graph is also exported to ONNX for the OpenCV
+    DNN backend.
+    """
+
+    # pylint: disable=R0914
+    def optimize(self, saved_model_path: str, width: int, height: int) -> dict:
+        """
+        Export the optimized frozen graph next to the saved model and compare both.
+
+        :param saved_model_path: The path to the saved model directory.
+        :param width: The width of the model input.
+        :param height: The height of the model input.
+        :return: The load time in seconds and the mean latency in milliseconds
+                 of the saved model and of the optimized graph, and whether the OpenCV
+                 export was written.
+        """
+        Logger.info("Model Optimizer: Optimizing %s for %sx%s...", saved_model_path, width, height)
+        start_time = time.perf_counter()
+        model = tf.saved_model.load(saved_model_path)
+        saved_model_load_time = time.perf_counter() - start_time
+
+        frozen = self._freeze(model, width, height)
+        graph_def = self._run_grappler(frozen)
+        signature = {
+            "input_size": [width, height],
+            "input": frozen.inputs[0].name,
+            "outputs": [tensor.name for tensor in frozen.outputs],
+            # Dictionary outputs are flattened in the order of their sorted keys
+            "output_keys": sorted(frozen.structured_outputs),
+        }
+
+        optimized_dir = optimized_model_dir(saved_model_path)
+        os.makedirs(optimized_dir, exist_ok=True)
+        with open(os.path.join(optimized_dir, GRAPH_FILE), "wb") as file:
+            file.write(graph_def.SerializeToString())
+        with open(os.path.join(optimized_dir, SIGNATURE_FILE), "wt", encoding="utf-8") as file:
+            json.dump(signature, file, indent=4)
+
+        sample = tf.convert_to_tensor(
+            np.random.randint(0, 256, (1, height, width, 3), dtype=np.uint8)
+            )
+        start_time = time.perf_counter()
+        try:
+            optimized = FrozenGraphModel(optimized_dir, read_signature(optimized_dir))
+            optimized_load_time = time.perf_counter() - start_time
+            self._validate(model, optimized, sample)
+            optimized_latency = self._measure_latency(optimized, sample)
+        except Exception:
+            # The detector would prefer the broken artifact over the saved model
+            shutil.rmtree(optimized_dir, ignore_errors=True)
+            raise
+
+        report = {
+            "saved_model_load_s": round(saved_model_load_time, 3),
+            "optimized_load_s": round(optimized_load_time, 3),
+            "saved_model_latency_ms": round(self._measure_latency(model, sample), 1),
+            "optimized_latency_ms": round(optimized_latency, 1),
+            "opencv_export": self._export_opencv(frozen, saved_model_path, model, sample),
+        }
+        Logger.info(
+            "Model Optimizer: %s latency %.1f ms -> %.1f ms, load time %.2f s -> %.2f s",
+            saved_model_path, report["saved_model_latency_ms"], report["optimized_latency_ms"],
+            report["saved_model_load_s"], report["optimized_load_s"]
+            )
+        return report
+
+    @staticmethod
+    def _freeze(model, width: int, height: int):
+        """
+        Freeze the serving signature of the model with a fixed input shape.
+
+        :param model: The loaded saved model.
+        :param width: The width of the model input.
+        :param height: The height of the model input.
+        :return: The concrete function with its variables converted to constants.
+        """
+        serving = model.signatures["serving_default"]
+        input_name = next(iter(serving.structured_input_signature[1]))
+        function = tf.function(
+            lambda input_tensor: {
+                # Named after their keys, so the ONNX export exposes the same output names
+                key: tf.identity(value, name=key)
+                for key, value in serving(**{input_name: input_tensor}).items()
+            }
+        )
+        concrete = function.get_concrete_function(
+            tf.TensorSpec((1, height, width, 3), tf.uint8)
+            )
+        return convert_variables_to_constants_v2(concrete)
+
+    @staticmethod
+    def _run_grappler(frozen) -> tf.compat.v1.GraphDef:
+        """
+        Run the Grappler constant folding, layout and cleanup optimizers on the frozen graph.
+
+        :param frozen: The frozen concrete function.
+        :return: The optimized graph.
+        """
+        meta_graph = tf.compat.v1.train.export_meta_graph(
+            graph_def=frozen.graph.as_graph_def(), graph=frozen.graph
+            )
+        # Grappler keeps the nodes needed to compute the fetches of the train_op collection
+        fetches = meta_graph_pb2.CollectionDef()
+        for tensor in frozen.inputs + frozen.outputs:
+            fetches.node_list.value.append(tensor.name)
+        meta_graph.collection_def["train_op"].CopyFrom(fetches)
+
+        config = config_pb2.ConfigProto()
+        config.graph_options.rewrite_options.optimizers.extend(GRAPPLER_OPTIMIZERS)
+        return tf_optimizer.OptimizeGraph(config, meta_graph)
+
+    def _export_opencv(self, frozen, saved_model_path: str, model, sample: tf.Tensor) -> bool:
+        """
+        Export the frozen graph to ONNX next to the saved model for the OpenCV DNN backend,
+        keeping the export only if OpenCV runs it and reproduces the saved model detections.
+
+        :param frozen: The frozen concrete function.
+        :param saved_model_path: The path to the saved model directory.
+        :param model: The saved model.
+        :param sample: The input batch.
+        :return: Whether the export was written.
+        """
+        try:
+            import tf2onnx # pylint: disable=C0415
+        except ImportError:
+            Logger.info("Model Optimizer: tf2onnx is not installed, skipping the OpenCV export")
+            return False
+
+        opencv_dir = opencv_model_dir(saved_model_path)
+        os.makedirs(opencv_dir, exist_ok=True)
+        try:
+            tf2onnx.convert.from_graph_def(
+                frozen.graph.as_graph_def(),
+                input_names=[frozen.inputs[0].name],
+                output_names=[f"{name}:0" for name in OUTPUT_NAMES],
+                opset=ONNX_OPSET,
+                output_path=os.path.join(opencv_dir, ONNX_FILE),
+                )
+            opencv_model = OpenCVDnnModel(opencv_dir)
+            self._validate(model, lambda batch: opencv_model(batch.numpy()), sample)
+        except Exception as exc: # pylint: disable=W0703
+            # The OpenCV backend falls back to TensorFlow without an export
+            shutil.rmtree(opencv_dir, ignore_errors=True)
+            Logger.warning(
+                "Model Optimizer: OpenCV cannot run the export of %s - %s", saved_model_path, exc
+                )
+            return False
+        Logger.info("Model Optimizer: OpenCV export written to %s", opencv_dir)
+        return True
+
+    @staticmethod
+    def _validate(model: Callable, optimized: Callable, sample: tf.Tensor) -> None:
+        """
+        Check that the optimized graph runs and returns the detections of the saved model.
+
+        :param model: The saved model.
+        :param optimized: The optimized graph.
+        :param sample: The input batch.
+        :raises ValueError: If the boxes or scores of the strongest detections differ.
+        """
+        expected = model(sample)
+        actual = optimized(sample)
+        for key in ("detection_boxes", "detection_scores"):
+            expected_values = np.asarray(expected[key])[0, :VALIDATED_DETECTIONS]
+            actual_values = np.asarray(actual[key])[0, :VALIDATED_DETECTIONS]
+            if expected_values.shape != actual_values.shape or not np.allclose(
+                expected_values, actual_values, atol=VALIDATION_TOLERANCE
+            ):
+                raise ValueError(f"The optimized graph returns different {key}")
+
+    @staticmethod
+    def _measure_latency(model: Callable, sample: tf.Tensor) -> float:
+        """
+        Measure the mean latency of a model on a sample input.
+
+        :param model: The model to run.
+        :param sample: The input batch.
+        :return: The mean latency in milliseconds.
+        """
+        for _ in range(WARMUP_RUNS):
+            model(sample)
+        start_time = time.perf_counter()
+        for _ in range(BENCHMARK_RUNS):
+            model(sample)
+        return (time.perf_counter() - start_time) / BENCHMARK_RUNS * 1000
@@ -7,7 +7,19 @@ import os
 from kivy.logger import Logger
 from kivymd.app import MDApp
 
-from helpers import SettingsHandler, ModelsHandler, ModelScraper, ModelScraperError
+from detectors import MODEL_REGISTRY
+from monitoring import MEMORY, METRICS, MetricsServer, SamplingProfiler
+from pipeline import ThreadConfig, apply_thread_config, pin_current_thread
+from helpers import (
+    LOG_FORMAT,
+    LogReader,
+    setup_queue_logging,
+    ModelsHandler,
+    ModelScraper,
+    ModelScraperError,
+    SettingsHandler,
+    SettingsKeys
+)
 
 from components import (
     DebugUI,
@@ -25,13 +37,17 @@ if not os.path.exists('logs'):
 log_file_name = datetime.datetime.now().strftime("session_%Y-%m-%d_%H-%M-%S.log")
 log_file_path = os.path.join('logs', log_file_name)
 
-formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
+formatter = logging.Formatter(LOG_FORMAT)
 
 file_handler = logging.FileHandler(log_file_path)
 file_handler.setLevel(logging.INFO)
 file_handler.setFormatter(formatter)
 
-Logger.addHandler(file_handler)
+# The file is written by a background listener so logging never blocks the UI thread
+log_queue_handler, log_listener = setup_queue_logging(Logger, file_handler)
+METRICS.register_collector(
+    lambda: METRICS.gauge("log_records_dropped").set(log_queue_handler.dropped)
+    )
 
 DATA_PATH = "data"
 
@@ -44,8 +60,15 @@ class MainApp(MDApp):
         super().__init__(**kwargs)
         self.current_layout = None
         self.data_path = DATA_PATH
+        self.log_reader = LogReader(log_file_path)
         self.settings_handler = SettingsHandler(DATA_PATH)
         self.models_handler = ModelsHandler(DATA_PATH)
+        self.metrics_server = None
+        self.profiler = SamplingProfiler("logs")
+        self._configure_threads()
+        self._configure_model_registry()
+        self._start_memory_monitor()
+        self._start_metrics_server()
         self._scrape_models()
 
     def build(self) -> LandingUI:
@@ -63,7 +86,7 @@ class MainApp(MDApp):
         Switch the layout to the main layout.
         """
         Logger.info("Switching UI: MainUI")
-        new_layout = MainUI(self.settings_handler)
+        new_layout = MainUI(self.settings_handler, self.models_handler)
         self.root.clear_widgets()
         self.root.add_widget(new_layout)
         self.current_layout = new_layout
@@ -103,7 +126,7 @@ class MainApp(MDApp):
         Switch the layout to the debug layout.
         """
         Logger.info("Switching UI: DebugUI")
-        new_layout = DebugUI(self.settings_handler)
+        new_layout = DebugUI(self.settings_handler, self.profiler)
         self.root.clear_widgets()
         self.root.add_widget(new_layout)
         self.current_layout = new_layout
@@ -113,18 +136,64 @@ class MainApp(MDApp):
         Switch the layout to the logs layout.
         """
         Logger.info("Switching UI: LogsUI")
-        new_layout = LogsUI()
+        new_layout = LogsUI(self.log_reader)
         self.root.clear_widgets()
         self.root.add_widget(new_layout)
         self.current_layout = new_layout
 
-    def get_logs_text(self) -> str:
+    def on_stop(self):
+        """
+        Flush the queued log records when the application stops.
+        """
+        if log_queue_handler.dropped:
+            Logger.warning("Logging: %s log records dropped", log_queue_handler.dropped)
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        MEMORY.stop()
+        log_listener.stop()
+
+    def _configure_threads(self):
+        """
+        Size the thread pools of the libraries and pin the UI thread to its configured CPUs.
+        """
+        thread_config = self.settings_handler.get_value(SettingsKeys.THREAD_CONFIG)
+        apply_thread_config(ThreadConfig.from_dict(thread_config))
+        pin_current_thread("ui")
+
+    def _configure_model_registry(self):
+        """
+        Apply the configured memory budget to the process-wide model registry.
+        """
+        memory_budget = self.settings_handler.get_value(SettingsKeys.MODEL_CACHE_BUDGET_MB)
+        if memory_budget is not None:
+            MODEL_REGISTRY.set_memory_budget(int(memory_budget))
+
+    def _start_memory_monitor(self):
+        """
+        Report the footprint of the cached models and enforce the configured memory budget
+        of the process, evicting all but the most recently used cached model first.
+        """
+        memory_budget = self.settings_handler.get_value(SettingsKeys.MEMORY_BUDGET_MB)
+        MEMORY.set_budget(int(memory_budget) if memory_budget is not None else None)
+        MEMORY.add_source("models", "model", MODEL_REGISTRY.footprints)
+        MEMORY.add_reclaimer(
+            "model cache", lambda: MODEL_REGISTRY.evict_least_recently_used(keep=1)
+            )
+        MEMORY.start()
+
+    def _start_metrics_server(self):
         """
-        Return the logs text.
+        Serve the metrics on the local /metrics endpoint if a port is configured.
         """
-        with open(log_file_path, 'r', encoding="utf-8") as log_file:
-            log_data = log_file.read()
-        return log_data
+        metrics_port = self.settings_handler.get_value(SettingsKeys.METRICS_PORT)
+        if metrics_port is None:
+            return
+        try:
+            self.metrics_server = MetricsServer(METRICS, int(metrics_port))
+            self.metrics_server.start()
+        except OSError as exc:
+            Logger.error("Metrics: Could not serve metrics on port %s - %s", metrics_port, exc)
+            self.metrics_server = None
 
     def _scrape_models(self):
         """
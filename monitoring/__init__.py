@@ -0,0 +1,4 @@
+"""Module for monitoring the application at runtime."""
+from .metrics import METRICS, Counter, Gauge, Histogram, MetricsRegistry, MetricsServer
+from .memory import MEMORY, MemoryMonitor, process_rss, tensorflow_allocator_bytes
+from .profiler import SamplingProfiler
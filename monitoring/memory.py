@@ -0,0 +1,208 @@
+"""Module for accounting the memory of the process and enforcing a memory budget."""
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from .metrics import METRICS
+
+MB = 1024 * 1024
+# Maximum number of seconds between two reclaim attempts while nothing brings the resident
+# memory under the budget
+MAX_RECLAIM_BACKOFF = 300.0
+
+
+def process_rss() -> Optional[int]:
+    """Returns the resident memory of the process in bytes, None where it cannot be read."""
+    try:
+        with open("/proc/self/statm", "rt", encoding="utf-8") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil # pylint: disable=C0415
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def tensorflow_allocator_bytes() -> Optional[int]:
+    """Returns the memory held by the TensorFlow allocator in bytes, None if TensorFlow is not
+    loaded or its allocator does not track the memory of the device."""
+    tf = sys.modules.get("tensorflow")
+    if tf is None:
+        return None
+    for device in ("GPU:0", "CPU:0"):
+        try:
+            return tf.config.experimental.get_memory_info(device)["current"]
+        except (ValueError, AttributeError, RuntimeError):
+            continue
+    return None
+
+
+# pylint: disable=R0902
+class MemoryMonitor:
+    """MemoryMonitor class reports the resident memory, the TensorFlow allocator and the sizes
+    reported by registered sources, e.g. cached models and frame buffers, as gauges.
+    A background thread keeps the process under the memory budget by running the registered
+    reclaimers in order until the resident memory fits again. When they do not bring it under
+    the budget, the attempts are retried with an exponential backoff."""
+
+    def __init__(self, budget_mb: Optional[int] = None, interval: float = 5.0) -> None:
+        """Initializes the monitor, start must be called to enforce the budget.
+        :param budget_mb: The resident memory budget in MB, None disables the budget.
+        :param interval: The number of seconds between two budget checks.
+        """
+        self.budget = budget_mb * MB if budget_mb else None
+        self.interval = interval
+        self._sources: Dict[str, Tuple[str, Callable[[], Dict[str, int]]]] = {}
+        self._reclaimers: Dict[str, Callable[[], bool]] = {}
+        self._reported: Dict[str, set] = {}
+        self._exhausted = False # the last attempt could not bring the memory under the budget
+        self._backoff = interval
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.logger = logging.getLogger(__name__)
+
+    def set_budget(self, budget_mb: Optional[int]) -> None:
+        """Changes the memory budget.
+        :param budget_mb: The resident memory budget in MB, None disables the budget.
+        """
+        self.budget = budget_mb * MB if budget_mb else None
+
+    def add_source(self, name: str, category: str, sizes: Callable[[], Dict[str, int]]) -> None:
+        """Registers a source of memory sizes, reported as memory_bytes{category, item}.
+        :param name: The unique name of the source.
+        :param category: The category of the sizes, e.g. model or buffer.
+        :param sizes: Callable returning the size in bytes of every item of the source.
+        """
+        with self._lock:
+            self._sources[name] = (category, sizes)
+
+    def remove_source(self, name: str) -> None:
+        """Unregisters a source of memory sizes.
+        :param name: The name of the source.
+        """
+        with self._lock:
+            self._sources.pop(name, None)
+
+    def add_reclaimer(self, name: str, reclaim: Callable[[], bool]) -> None:
+        """Registers a way to free memory, reclaimers run in the order they were added.
+        :param name: The unique name of the reclaimer.
+        :param reclaim: Callable freeing memory, returning whether it freed anything.
+        """
+        with self._lock:
+            self._reclaimers[name] = reclaim
+
+    def remove_reclaimer(self, name: str) -> None:
+        """Unregisters a reclaimer.
+        :param name: The name of the reclaimer.
+        """
+        with self._lock:
+            self._reclaimers.pop(name, None)
+
+    def collect(self) -> None:
+        """Updates the memory gauges, registered as a collector of the metrics registry."""
+        METRICS.gauge("process_resident_bytes", "Resident memory").set(process_rss() or 0)
+        METRICS.gauge("memory_budget_bytes", "Resident memory budget").set(self.budget or 0)
+        tensorflow = tensorflow_allocator_bytes()
+        if tensorflow is not None:
+            METRICS.gauge("tensorflow_allocator_bytes", "TensorFlow allocator").set(tensorflow)
+
+        with self._lock:
+            sources = list(self._sources.values())
+        reported: Dict[str, set] = {}
+        for category, sizes in sources:
+            for name, size in sizes().items():
+                METRICS.gauge("memory_bytes", category=category, item=name).set(size)
+                reported.setdefault(category, set()).add(name)
+        # Zero the items that are gone, e.g. evicted models
+        for category, names in self._reported.items():
+            for name in names - reported.get(category, set()):
+                METRICS.gauge("memory_bytes", category=category, item=name).set(0)
+        self._reported = reported
+
+    def check_budget(self) -> bool:
+        """Runs the reclaimers in order until the resident memory fits into the budget.
+        A reclaimer only counts when the resident memory actually drops.
+        :return: Whether the resident memory fits into the budget.
+        """
+        rss = process_rss()
+        if self.budget is None or rss is None or rss <= self.budget:
+            if self._exhausted:
+                self.logger.info("Resident memory back under the budget")
+            self._exhausted = False
+            self._backoff = self.interval
+            self._retry_at = 0.0
+            return True
+        now = time.monotonic()
+        if now < self._retry_at:
+            return False
+
+        if not self._exhausted:
+            self.logger.warning(
+                "Resident memory %.0f MB over the %.0f MB budget, reclaiming",
+                rss / MB, self.budget / MB
+                )
+        with self._lock:
+            reclaimers = list(self._reclaimers.items())
+        for name, reclaim in reclaimers:
+            try:
+                if not reclaim():
+                    continue
+            except Exception as exc: # pylint: disable=W0703
+                self.logger.error("Memory reclaimer %s failed: %s", name, exc)
+                continue
+            gc.collect()
+            reclaimed_rss = process_rss() or rss
+            if reclaimed_rss >= rss:
+                continue
+            METRICS.counter("memory_reclaims_total", reclaimer=name).inc()
+            self.logger.info(
+                "Memory reclaimer %s freed %.0f MB, resident memory %.0f MB",
+                name, (rss - reclaimed_rss) / MB, reclaimed_rss / MB
+                )
+            rss = reclaimed_rss
+            if rss <= self.budget:
+                self._exhausted = False
+                self._backoff = self.interval
+                return True
+
+        if not self._exhausted:
+            self.logger.warning(
+                "Resident memory %.0f MB stays over the %.0f MB budget, nothing left to "
+                "reclaim, retrying with backoff", rss / MB, self.budget / MB
+                )
+        self._exhausted = True
+        self._retry_at = now + self._backoff
+        self._backoff = min(self._backoff * 2, MAX_RECLAIM_BACKOFF)
+        return False
+
+    def start(self) -> None:
+        """Starts checking the budget in the background."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="memory-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops checking the budget."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        """Checks the budget every interval until stopped."""
+        while not self._stop_event.wait(self.interval):
+            self.check_budget()
+
+
+MEMORY = MemoryMonitor()
+METRICS.register_collector(MEMORY.collect)
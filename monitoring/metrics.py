@@ -0,0 +1,372 @@
+"""Module containing the in-process metrics registry with counters, gauges and histograms."""
+
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+LabelsKey = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+    """Monotonically increasing counter."""
+
+    def __init__(self) -> None:
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        """
+        Increase the counter.
+        :param amount: the amount to increase the counter by
+        """
+        with self._lock:
+            self.value += amount
+
+
+class Gauge:
+    """Value that can go up and down."""
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        """
+        Set the gauge to the given value.
+        :param value: the new value
+        """
+        self.value = value
+
+
+class Histogram:
+    """
+    HDR-style latency histogram. Values are recorded in microseconds into log-linear buckets,
+    each power of two being split into 2 ** SUB_BUCKET_BITS linear buckets, which keeps
+    the relative error of the quantiles below 1 % with a small, sparse set of buckets.
+    The buckets accumulate every value, the recent quantiles only cover the values of the
+    current and the previous window, so live views follow changes in the latencies.
+    """
+
+    SUB_BUCKET_BITS = 7
+    WINDOW_SECONDS = 10.0
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._buckets: Dict[int, int] = {}
+        # Buckets and maximum of the previous and the current window
+        self._windows: List[Tuple[Dict[int, int], float]] = [({}, 0.0), ({}, 0.0)]
+        self._window_start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """
+        Record a value.
+        :param seconds: the value in seconds
+        """
+        index = self._bucket_index(max(int(seconds * 1_000_000), 0))
+        now = time.monotonic()
+        with self._lock:
+            self._buckets[index] = self._buckets.get(index, 0) + 1
+            self.count += 1
+            self.sum += seconds
+            self.max = max(self.max, seconds)
+            self._rotate(now)
+            window, window_max = self._windows[1]
+            window[index] = window.get(index, 0) + 1
+            self._windows[1] = (window, max(window_max, seconds))
+
+    def quantile(self, quantile: float) -> float:
+        """
+        Return the value below which the given fraction of the recorded values lies.
+        :param quantile: the quantile between 0 and 1
+        :return: the value in seconds, 0 if nothing was recorded
+        """
+        with self._lock:
+            return self._quantile(self._buckets, self.max, quantile)
+
+    @property
+    def recent_count(self) -> int:
+        """
+        The number of values recorded in the current and the previous window.
+        """
+        with self._lock:
+            self._rotate(time.monotonic())
+            return sum(sum(window.values()) for window, _ in self._windows)
+
+    def recent_quantile(self, quantile: float) -> float:
+        """
+        Return the value below which the given fraction of the values recorded in the current
+        and the previous window lies.
+        :param quantile: the quantile between 0 and 1
+        :return: the value in seconds, 0 if nothing was recorded recently
+        """
+        with self._lock:
+            self._rotate(time.monotonic())
+            (previous, previous_max), (current, current_max) = self._windows
+            buckets = dict(previous)
+            for index, count in current.items():
+                buckets[index] = buckets.get(index, 0) + count
+            return self._quantile(buckets, max(previous_max, current_max), quantile)
+
+    def reset(self) -> None:
+        """
+        Forget all recorded values.
+        """
+        with self._lock:
+            self._buckets.clear()
+            self.count = 0
+            self.sum = 0.0
+            self.max = 0.0
+            self._windows = [({}, 0.0), ({}, 0.0)]
+            self._window_start = time.monotonic()
+
+    def _rotate(self, now: float) -> None:
+        """
+        Start a new window once the current one is over, must be called holding the lock.
+        :param now: the current time.monotonic()
+        """
+        elapsed = now - self._window_start
+        if elapsed < self.WINDOW_SECONDS:
+            return
+        # The current window becomes the previous one, unless nothing was recorded for a window
+        previous = self._windows[1] if elapsed < 2 * self.WINDOW_SECONDS else ({}, 0.0)
+        self._windows = [previous, ({}, 0.0)]
+        self._window_start = now
+
+    @classmethod
+    def _quantile(cls, buckets: Dict[int, int], maximum: float, quantile: float) -> float:
+        """
+        Return the quantile of the values counted in the given buckets.
+        :param buckets: the number of values by bucket index
+        :param maximum: the largest value in seconds
+        :param quantile: the quantile between 0 and 1
+        :return: the value in seconds, 0 if the buckets are empty
+        """
+        count = sum(buckets.values())
+        if not count:
+            return 0.0
+        rank = quantile * count
+        seen = 0
+        for index in sorted(buckets):
+            seen += buckets[index]
+            if seen >= rank:
+                return min(cls._bucket_value(index) / 1_000_000, maximum)
+        return maximum
+
+    @classmethod
+    def _bucket_index(cls, value: int) -> int:
+        """
+        Return the index of the bucket the given value in microseconds falls into.
+        """
+        if value < 1 << cls.SUB_BUCKET_BITS:
+            return value
+        shift = value.bit_length() - cls.SUB_BUCKET_BITS
+        return (shift << cls.SUB_BUCKET_BITS) + (value >> shift)
+
+    @classmethod
+    def _bucket_value(cls, index: int) -> float:
+        """
+        Return the middle of the bucket with the given index in microseconds.
+        """
+        shift = index >> cls.SUB_BUCKET_BITS
+        mantissa = index - (shift << cls.SUB_BUCKET_BITS)
+        if shift == 0:
+            return float(mantissa)
+        return float((mantissa << shift) + (1 << (shift - 1)))
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+
+class MetricsRegistry:
+    """Process-wide registry of named metrics, optionally distinguished by labels."""
+
+    QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Dict[LabelsKey, Metric]] = {}
+        self._types: Dict[str, type] = {}
+        self._help: Dict[str, str] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str = "", **labels: str) -> Counter:
+        """
+        Return the counter with the given name and labels, creating it if needed.
+        """
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name: str, help_text: str = "", **labels: str) -> Gauge:
+        """
+        Return the gauge with the given name and labels, creating it if needed.
+        """
+        return self._get(Gauge, name, help_text, labels)
+
+    def histogram(self, name: str, help_text: str = "", **labels: str) -> Histogram:
+        """
+        Return the histogram with the given name and labels, creating it if needed.
+        """
+        return self._get(Histogram, name, help_text, labels)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """
+        Context manager recording the duration of its block into the given histogram.
+        """
+        histogram = self.histogram(name, **labels)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - start_time)
+
+    def register_collector(self, collector: Callable[[], None]) -> None:
+        """
+        Register a callable that updates metrics right before they are read,
+        for values that are cheaper to sample than to track continuously.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def find(self, name: str) -> Dict[LabelsKey, Metric]:
+        """
+        Return all metrics with the given name keyed by their labels.
+        """
+        self._collect()
+        with self._lock:
+            return dict(self._metrics.get(name, {}))
+
+    def render_prometheus(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+        Histograms are exposed as summaries with precomputed quantiles.
+        """
+        self._collect()
+        with self._lock:
+            metrics = {name: dict(series) for name, series in self._metrics.items()}
+
+        lines = []
+        for name in sorted(metrics):
+            metric_type = self._types[name]
+            if self._help[name]:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            if metric_type is Histogram:
+                lines.append(f"# TYPE {name} summary")
+            elif metric_type is Counter:
+                lines.append(f"# TYPE {name} counter")
+            else:
+                lines.append(f"# TYPE {name} gauge")
+
+            for labels, metric in sorted(metrics[name].items()):
+                if isinstance(metric, Histogram):
+                    for quantile in self.QUANTILES:
+                        quantile_labels = labels + (("quantile", str(quantile)),)
+                        lines.append(
+                            f"{name}{self._format_labels(quantile_labels)} "
+                            f"{metric.quantile(quantile)}"
+                            )
+                    lines.append(f"{name}_sum{self._format_labels(labels)} {metric.sum}")
+                    lines.append(f"{name}_count{self._format_labels(labels)} {metric.count}")
+                else:
+                    lines.append(f"{name}{self._format_labels(labels)} {metric.value}")
+        return "\n".join(lines) + "\n"
+
+    def _get(self, metric_type: type, name: str, help_text: str, labels: Dict[str, str]):
+        """
+        Return the metric of the given type, name and labels, creating it if needed.
+        """
+        key = tuple(sorted((label, str(value)) for label, value in labels.items()))
+        series = self._metrics.get(name)
+        if series is not None and key in series:
+            return series[key]
+
+        with self._lock:
+            registered_type = self._types.setdefault(name, metric_type)
+            if registered_type is not metric_type:
+                raise ValueError(f"Metric {name} is already registered as a different type")
+            if help_text or name not in self._help:
+                self._help[name] = help_text
+            return self._metrics.setdefault(name, {}).setdefault(key, metric_type())
+
+    def _collect(self) -> None:
+        """
+        Run the registered collectors.
+        """
+        for collector in list(self._collectors):
+            collector()
+
+    @staticmethod
+    def _format_labels(labels: LabelsKey) -> str:
+        """
+        Format the labels for the Prometheus text format.
+        """
+        if not labels:
+            return ""
+        escaped = (
+            label + '="' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+            for label, value in labels
+        )
+        return "{" + ",".join(escaped) + "}"
+
+
+class MetricsServer:
+    """Serves the metrics of a registry on a local HTTP /metrics endpoint."""
+
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = "127.0.0.1") -> None:
+        """
+        Initialize the MetricsServer object.
+        :param registry: the registry to expose
+        :param port: the port to listen on
+        :param host: the interface to listen on, local only by default
+        """
+        self.registry = registry
+        self.address = (host, port)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.logger = logging.getLogger(__name__)
+
+    def start(self) -> None:
+        """
+        Start serving on a background thread.
+        """
+        registry = self.registry
+
+        class MetricsRequestHandler(BaseHTTPRequestHandler):
+            """Request handler answering GET /metrics."""
+
+            def do_GET(self) -> None: # pylint: disable=C0103
+                """Answer the request with the rendered metrics."""
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None: # pylint: disable=W0221
+                """Do not log every scrape."""
+
+        self._server = ThreadingHTTPServer(self.address, MetricsRequestHandler)
+        self._server.daemon_threads = True
+        threading.Thread(
+            target=self._server.serve_forever, name="metrics-server", daemon=True
+            ).start()
+        self.logger.info("Serving metrics on http://%s:%s/metrics", *self.address)
+
+    def stop(self) -> None:
+        """
+        Stop serving.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+METRICS = MetricsRegistry()
@@ -0,0 +1,179 @@
+"""Module containing the SamplingProfiler class for profiling the running application."""
+
+from collections import Counter as StackCounter
+from datetime import datetime
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+Stack = Tuple[str, ...]
+
+DEFAULT_THREAD_NAMES = ("MainThread", "recorder", "detector-loader", "inference")
+
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler. A background thread periodically samples the Python
+    stacks of the selected threads, so it can be started while the drone is flying and
+    leaves the profiled threads untouched between samples.
+    """
+
+    def __init__(
+        self,
+        output_directory: str = "logs",
+        interval: float = 0.01,
+        thread_names: Optional[Sequence[str]] = DEFAULT_THREAD_NAMES,
+    ) -> None:
+        """
+        Initialize the SamplingProfiler object.
+        :param output_directory: the directory the profiles are written to
+        :param interval: the time between two samples in seconds
+        :param thread_names: prefixes of the names of the threads to sample, None for all
+        """
+        self.output_directory = output_directory
+        self.interval = interval
+        self.thread_names = tuple(thread_names) if thread_names else None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def running(self) -> bool:
+        """
+        Return True while a profile is being recorded.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(
+        self, duration: float, on_complete: Optional[Callable[[str], None]] = None
+    ) -> bool:
+        """
+        Start recording a profile in the background.
+        :param duration: the length of the profiled window in seconds
+        :param on_complete: called from the profiler thread with the path of the written
+        collapsed stacks file
+        :return: False if a profile is already being recorded
+        """
+        if self.running:
+            return False
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(duration, on_complete), name="profiler", daemon=True
+            )
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        """
+        Stop recording early, the profile recorded so far is still written.
+        """
+        self._stop_event.set()
+
+    def _run(self, duration: float, on_complete: Optional[Callable[[str], None]]) -> None:
+        """
+        Sample the stacks until the duration elapses and write the profile files.
+        """
+        self.logger.info("Profiling for %.1f s", duration)
+        stacks: StackCounter = StackCounter()
+        own_id = threading.get_ident()
+        start_time = time.perf_counter()
+        deadline = start_time + duration
+        thread_names: Dict[int, str] = {}
+        samples = 0
+
+        while not self._stop_event.is_set() and time.perf_counter() < deadline:
+            if samples % 100 == 0:
+                thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items(): # pylint: disable=W0212
+                name = thread_names.get(thread_id, str(thread_id))
+                if thread_id == own_id or not self._is_selected(name):
+                    continue
+                stacks[(name,) + self._walk_stack(frame)] += 1
+            samples += 1
+            self._stop_event.wait(self.interval)
+
+        elapsed = time.perf_counter() - start_time
+        path = self._write(stacks, elapsed)
+        self.logger.info("Profile with %d samples written to %s", samples, path)
+        if on_complete is not None:
+            on_complete(path)
+
+    @staticmethod
+    def _walk_stack(frame) -> Stack:
+        """
+        Return the names of the functions on the stack of the given frame, outermost first.
+        """
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            file_name = os.path.basename(code.co_filename)
+            stack.append(f"{code.co_name} ({file_name}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return tuple(reversed(stack))
+
+    def _is_selected(self, thread_name: str) -> bool:
+        """
+        Return True if the thread with the given name should be sampled.
+        """
+        return self.thread_names is None or thread_name.startswith(self.thread_names)
+
+    def _write(self, stacks: StackCounter, elapsed: float) -> str:
+        """
+        Write the profile as collapsed stacks and as a speedscope file.
+        :return: the path of the collapsed stacks file
+        """
+        os.makedirs(self.output_directory, exist_ok=True)
+        base_name = os.path.join(
+            self.output_directory, datetime.now().strftime("profile_%Y-%m-%d_%H-%M-%S")
+            )
+
+        collapsed_path = f"{base_name}.folded"
+        with open(collapsed_path, "w", encoding="utf-8") as file:
+            for stack, count in stacks.most_common():
+                file.write(f"{';'.join(stack)} {count}\n")
+
+        with open(f"{base_name}.speedscope.json", "w", encoding="utf-8") as file:
+            json.dump(self._to_speedscope(stacks, elapsed), file)
+
+        return collapsed_path
+
+    def _to_speedscope(self, stacks: StackCounter, elapsed: float) -> dict:
+        """
+        Convert the sampled stacks into the speedscope file format, one profile per thread.
+        """
+        frames: List[dict] = []
+        frame_indexes: Dict[str, int] = {}
+        profiles: Dict[str, dict] = {}
+
+        for (thread_name, *stack), count in stacks.items():
+            sample = []
+            for frame_name in stack:
+                if frame_name not in frame_indexes:
+                    frame_indexes[frame_name] = len(frames)
+                    frames.append({"name": frame_name})
+                sample.append(frame_indexes[frame_name])
+
+            profile = profiles.setdefault(thread_name, {
+                "type": "sampled",
+                "name": thread_name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": elapsed,
+                "samples": [],
+                "weights": [],
+            })
+            profile["samples"].append(sample)
+            profile["weights"].append(count * self.interval)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": "Flight loop profile",
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values()),
+        }
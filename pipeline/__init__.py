@@ -0,0 +1,7 @@
+"""Module for passing frames between the stages of the video pipeline."""
+from .frame_ring import FrameRingBuffer, RingFrame
+from .inference_server import InferenceResult, InferenceServer
+from .thread_config import (
+    ThreadConfig, active_thread_config, apply_thread_config, import_tensorflow,
+    pin_current_thread
+)
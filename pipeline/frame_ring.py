@@ -0,0 +1,199 @@
+"""Module for the FrameRingBuffer class."""
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+import os
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Per-slot metadata columns
+VERSION = 0 # seqlock counter, odd while the slot is being written
+SEQUENCE = 1 # sequence number of the frame in the slot, -1 if empty
+TIMESTAMP = 2 # time.monotonic_ns() when the frame was written
+
+HEADER_SIZE = 8 # int64 sequence number of the latest complete frame
+METADATA_COLUMNS = 3
+
+
+@dataclass(frozen=True)
+class RingFrame:
+    """Dataclass for a frame read from the ring buffer, its image is a view of shared memory."""
+
+    sequence: int
+    timestamp: float # time.monotonic() when the frame was written
+    image: np.ndarray
+    slot: int
+    version: int
+
+
+# pylint: disable=R0902
+class FrameRingBuffer:
+    """FrameRingBuffer class stores the latest frames in fixed slots of shared memory.
+    A single writer copies every frame in once; any number of readers, in threads or other
+    processes, get views of the slots without copying. Every slot is guarded by a seqlock,
+    so a reader can tell whether the writer reused the slot while it was reading.
+
+    The buffer pickles by name, so passing it to a worker process attaches to the same memory.
+    """
+
+    def __init__(
+        self,
+        shape: Tuple[int, ...],
+        slots: int = 8,
+        dtype: str = "uint8",
+        name: Optional[str] = None,
+        create: bool = True,
+    ) -> None:
+        """Creates or attaches to a ring buffer.
+        :param shape: The shape of every frame, e.g. (720, 960, 3).
+        :param slots: The number of frames kept, a view stays valid for slots - 1 newer frames.
+        :param dtype: The data type of the frames.
+        :param name: The name of the shared memory block, generated if creating without one.
+        :param create: Whether to create the block or attach to an existing one.
+        """
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.dtype = np.dtype(dtype)
+        # Forked children inherit the object without pickling, only the creator may unlink
+        self._owner_pid = os.getpid() if create else None
+        self._closed = False
+
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        metadata_bytes = slots * METADATA_COLUMNS * 8
+        size = HEADER_SIZE + metadata_bytes + slots * frame_bytes
+        self._memory = shared_memory.SharedMemory(name=name, create=create, size=size)
+        if not create:
+            # Only the creating process may unlink the block, see bpo-39959
+            # pylint: disable=W0212
+            resource_tracker.unregister(self._memory._name, "shared_memory")
+
+        buffer = self._memory.buf
+        self._header = np.ndarray((1,), dtype=np.int64, buffer=buffer)
+        self._metadata = np.ndarray(
+            (slots, METADATA_COLUMNS), dtype=np.int64, buffer=buffer, offset=HEADER_SIZE
+            )
+        self._frames = np.ndarray(
+            (slots,) + self.shape, dtype=self.dtype, buffer=buffer,
+            offset=HEADER_SIZE + metadata_bytes,
+            )
+        if create:
+            self._header[0] = -1
+            self._metadata[:, VERSION] = 0
+            self._metadata[:, SEQUENCE] = -1
+
+    @property
+    def name(self) -> str:
+        """Returns the name of the shared memory block."""
+        return self._memory.name
+
+    @property
+    def nbytes(self) -> int:
+        """Returns the size of the shared memory block in bytes."""
+        return self._memory.size
+
+    @property
+    def latest_sequence(self) -> int:
+        """Returns the sequence number of the latest complete frame, -1 if none was written."""
+        return int(self._header[0])
+
+    def write(self, image: np.ndarray, sequence: Optional[int] = None) -> np.ndarray:
+        """Copies a frame into the next slot. Must only be called by the single writer.
+        :param image: The frame, of the shape and data type of the buffer.
+        :param sequence: The sequence number of the frame, the latest one plus one by default.
+        :return: The view of the written slot.
+        """
+        if sequence is None:
+            sequence = self.latest_sequence + 1
+        slot = sequence % self.slots
+        metadata = self._metadata[slot]
+
+        metadata[VERSION] += 1 # odd, readers back off
+        self._frames[slot][...] = image
+        metadata[SEQUENCE] = sequence
+        metadata[TIMESTAMP] = time.monotonic_ns()
+        metadata[VERSION] += 1 # even, the slot is consistent again
+        self._header[0] = sequence
+        return self._frames[slot]
+
+    def get(self, sequence: Optional[int] = None) -> Optional[RingFrame]:
+        """Returns a view of a frame without copying it.
+        The view is only guaranteed to hold the frame while is_current returns True.
+        :param sequence: The sequence number of the frame, the latest one by default.
+        :return: The frame, or None if it was overwritten or is being written.
+        """
+        if sequence is None:
+            sequence = self.latest_sequence
+        if sequence < 0:
+            return None
+        slot = sequence % self.slots
+        version = int(self._metadata[slot, VERSION])
+        if version % 2 or int(self._metadata[slot, SEQUENCE]) != sequence:
+            return None
+        timestamp = int(self._metadata[slot, TIMESTAMP]) / 1e9
+        frame = RingFrame(sequence, timestamp, self._frames[slot], slot, version)
+        return frame if self.is_current(frame) else None
+
+    def is_current(self, frame: RingFrame) -> bool:
+        """Returns whether the slot of a frame still holds it, i.e. the view was not overwritten.
+        Check it after using a view to know whether what was read is consistent.
+        :param frame: The frame returned by get.
+        """
+        return int(self._metadata[frame.slot, VERSION]) == frame.version
+
+    def read(self, sequence: Optional[int] = None) -> Optional[RingFrame]:
+        """Returns a consistent copy of a frame, for readers that keep it longer than the ring.
+        :param sequence: The sequence number of the frame, the latest one by default.
+        :return: The frame, or None if it was overwritten before it could be copied.
+        """
+        frame = self.get(sequence)
+        if frame is None:
+            return None
+        image = frame.image.copy()
+        if not self.is_current(frame):
+            return None
+        return RingFrame(frame.sequence, frame.timestamp, image, frame.slot, frame.version)
+
+    def wait_for_frame(
+        self, after_sequence: int, timeout: Optional[float] = None, poll_interval: float = 0.002
+    ) -> Optional[RingFrame]:
+        """Polls until a frame newer than the given sequence number is written.
+        Works across processes, threads of the writing process can wait on its own events.
+        :param after_sequence: The sequence number of the last frame already processed.
+        :param timeout: Maximum number of seconds to wait, None waits indefinitely.
+        :param poll_interval: The number of seconds between two checks.
+        :return: A view of the latest frame, or None if the timeout expired.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self.latest_sequence > after_sequence:
+                frame = self.get()
+                if frame is not None:
+                    return frame
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(poll_interval)
+
+    def close(self) -> None:
+        """Detaches from the shared memory, and removes it if this buffer created it.
+        Views still held by readers keep the memory mapped until they are released.
+        Closing a closed buffer does nothing."""
+        if self._closed:
+            return
+        self._closed = True
+        del self._header, self._metadata, self._frames
+        if self._owner_pid == os.getpid():
+            self._memory.unlink()
+            self._owner_pid = None
+        # SharedMemory.close would unmap the block under the views, which only reference the
+        # memoryview: leave the mapping to them, it is unmapped when the last one is released
+        # pylint: disable=W0212
+        self._memory._buf = None
+        self._memory._mmap = None
+        self._memory.close()
+
+    def __reduce__(self):
+        """Pickles the buffer as an attachment to the same shared memory."""
+        return (
+            self.__class__, (self.shape, self.slots, self.dtype.str, self.name, False)
+            )
@@ -0,0 +1,298 @@
+"""Module for the InferenceServer class."""
+from dataclasses import dataclass, field
+import logging
+import os
+import pickle
+import subprocess
+import sys
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from monitoring import METRICS
+
+from .frame_ring import FrameRingBuffer, RingFrame
+from .thread_config import active_thread_config
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass(frozen=True)
+class InferenceResult:
+    """Dataclass for the detection result of a frame processed by a worker process."""
+
+    sequence: int
+    worker: int
+    detected: bool
+    center: Tuple[int, int]
+    metric: float # area or height of the bounding box
+    inference_time: float # in seconds, measured in the worker
+    received: float # time.monotonic() when the result reached the server
+
+
+@dataclass
+# pylint: disable=R0902
+class _Worker:
+    """Dataclass for the state of one supervised worker process."""
+
+    index: int
+    output_ring: FrameRingBuffer
+    process: Optional[subprocess.Popen] = None
+    ready: bool = False
+    busy: bool = False
+    failed: bool = False # gave up after failing to start too many times in a row
+    restarts: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    thread: Optional[threading.Thread] = None
+
+
+# pylint: disable=R0902
+class InferenceServer:
+    """InferenceServer class runs a detector in dedicated worker processes, so inference and
+    post-processing never compete with the UI event loop for the interpreter.
+    Frames are handed over by sequence number through the shared input ring buffer, annotated
+    frames come back through one output ring buffer per worker, and results through the
+    worker pipes. Every worker is supervised and restarted when it exits, unless it keeps
+    failing before it is ready, e.g. because the model cannot be loaded."""
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        detector_path: str,
+        detector_kwargs: dict,
+        input_ring: FrameRingBuffer,
+        workers: int = 1,
+        *,
+        restart_delay: float = 1.0,
+        max_restart_delay: float = 30.0,
+        max_startup_failures: int = 3,
+    ) -> None:
+        """Initializes the server, start must be called to launch the workers.
+        :param detector_path: The detector class as module:name, e.g. detectors:FaceDetector.
+        :param detector_kwargs: The keyword arguments of the detector.
+        :param input_ring: The ring buffer the decoded frames are written to.
+        :param workers: The number of worker processes.
+        :param restart_delay: The number of seconds before restarting a crashed worker,
+        doubled after every consecutive crash.
+        :param max_restart_delay: The maximum number of seconds before restarting a worker.
+        :param max_startup_failures: The number of consecutive exits before becoming ready
+        after which a worker is given up.
+        """
+        self.detector_path = detector_path
+        self.detector_kwargs = detector_kwargs
+        self.input_ring = input_ring
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.max_startup_failures = max_startup_failures
+
+        self.latest: Optional[InferenceResult] = None
+        self._latest_lock = threading.Lock()
+        self._workers: List[_Worker] = [
+            _Worker(
+                index, FrameRingBuffer(input_ring.shape, input_ring.slots, input_ring.dtype.str)
+                )
+            for index in range(workers)
+        ]
+        self._next_worker = 0
+        self._ready = threading.Event()
+        self._stop_event = threading.Event()
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def output_nbytes(self) -> int:
+        """Returns the size of the output ring buffers of the workers in bytes."""
+        return sum(worker.output_ring.nbytes for worker in self._workers)
+
+    @property
+    def healthy(self) -> bool:
+        """Returns whether at least one worker is ready to process frames."""
+        return any(worker.ready for worker in self._workers)
+
+    @property
+    def failed(self) -> bool:
+        """Returns whether every worker was given up, so no result will ever arrive."""
+        return all(worker.failed for worker in self._workers)
+
+    def start(self) -> None:
+        """Launches and supervises the worker processes."""
+        self._stop_event.clear()
+        for worker in self._workers:
+            worker.thread = threading.Thread(
+                target=self._supervise, args=(worker,),
+                name=f"inference-worker-{worker.index}", daemon=True,
+                )
+            worker.thread.start()
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> None:
+        """Blocks until a worker has loaded the detector.
+        :param timeout: Maximum number of seconds to wait, None waits until a worker is ready
+        or all of them were given up.
+        """
+        if not self._ready.wait(timeout):
+            raise TimeoutError("No inference worker became ready.")
+        if self.failed:
+            raise RuntimeError(
+                f"Inference workers could not load {self.detector_path}, see the worker logs."
+                )
+
+    def submit(self, sequence: int) -> bool:
+        """Hands a frame of the input ring buffer to an idle worker without blocking.
+        :param sequence: The sequence number of the frame.
+        :return: Whether a worker accepted the frame, False if all of them are busy.
+        """
+        for offset in range(len(self._workers)):
+            worker = self._workers[(self._next_worker + offset) % len(self._workers)]
+            with worker.lock:
+                if not worker.ready or worker.busy:
+                    continue
+                try:
+                    self._send(worker, sequence)
+                except OSError:
+                    continue
+                worker.busy = True
+            self._next_worker = worker.index + 1
+            return True
+        METRICS.counter("inference_frames_skipped_total", "Frames no worker was free for").inc()
+        return False
+
+    def annotated_frame(self, result: InferenceResult) -> Optional[RingFrame]:
+        """Returns the annotated frame of a result without copying it.
+        :param result: The result.
+        :return: The view of the frame, or None if the worker already overwrote it.
+        """
+        return self._workers[result.worker].output_ring.get(result.sequence)
+
+    def stop(self) -> None:
+        """Stops the workers and releases the output ring buffers."""
+        self._stop_event.set()
+        for worker in self._workers:
+            with worker.lock:
+                worker.ready = False
+                if worker.process is not None:
+                    try:
+                        self._send(worker, None)
+                    except OSError:
+                        pass
+        for worker in self._workers:
+            if worker.process is not None:
+                try:
+                    worker.process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    worker.process.kill()
+            if worker.thread is not None:
+                worker.thread.join()
+            worker.output_ring.close()
+
+    def _supervise(self, worker: _Worker) -> None:
+        """Runs a worker process, reading its results, and restarts it whenever it exits.
+        :param worker: The worker to supervise.
+        """
+        delay = self.restart_delay
+        startup_failures = 0
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            became_ready = self._run_worker(worker)
+            if self._stop_event.is_set():
+                return
+
+            exit_code = None if worker.process is None else worker.process.wait()
+            startup_failures = 0 if became_ready else startup_failures + 1
+            if startup_failures >= self.max_startup_failures:
+                self.logger.error(
+                    "Inference worker %d exited with code %s before becoming ready "
+                    "%d times in a row, giving up", worker.index, exit_code, startup_failures,
+                    )
+                worker.failed = True
+                # Wakes wait_until_ready, which raises once every worker is given up
+                if self.failed:
+                    self._ready.set()
+                return
+            worker.restarts += 1
+            METRICS.counter("inference_worker_restarts_total", "Crashed inference workers").inc()
+            # Back off when the worker keeps crashing right away, e.g. while loading the model
+            delay = self.restart_delay if time.monotonic() - started > 60 else delay
+            self.logger.error(
+                "Inference worker %d exited with code %s, restarting in %.1f s",
+                worker.index, exit_code, delay,
+                )
+            self._stop_event.wait(delay)
+            delay = min(delay * 2, self.max_restart_delay)
+
+    def _run_worker(self, worker: _Worker) -> bool:
+        """Starts a worker process and handles its messages until it exits.
+        :param worker: The worker to run.
+        :return: Whether the worker became ready before it exited.
+        """
+        became_ready = False
+        python_path = os.pathsep.join(filter(None, [PROJECT_ROOT, os.environ.get("PYTHONPATH")]))
+        with worker.lock:
+            worker.process = None
+            try:
+                worker.process = subprocess.Popen( # pylint: disable=R1732
+                    [sys.executable, "-m", "pipeline.inference_worker"],
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                    env={**os.environ, "PYTHONPATH": python_path},
+                    )
+            except (OSError, subprocess.SubprocessError) as error:
+                self.logger.error("Could not start inference worker %d: %s", worker.index, error)
+        try:
+            if worker.process is None:
+                return became_ready
+            with worker.lock:
+                self._send(worker, (
+                    worker.index, self.detector_path, self.detector_kwargs,
+                    self.input_ring, worker.output_ring, active_thread_config().to_dict(),
+                    ))
+            while True:
+                message = pickle.load(worker.process.stdout)
+                if message[0] == "ready":
+                    self.logger.info("Inference worker %d ready", worker.index)
+                    became_ready = True
+                    with worker.lock:
+                        worker.ready = True
+                    self._ready.set()
+                elif message[0] == "result":
+                    _, sequence, detected, center, metric, inference_time = message
+                    self._set_latest(InferenceResult(
+                        sequence, worker.index, detected, center, metric,
+                        inference_time, time.monotonic(),
+                        ))
+                    METRICS.histogram(
+                        "detector_inference_seconds", worker=str(worker.index)
+                        ).observe(inference_time)
+                    with worker.lock:
+                        worker.busy = False
+                else: # skipped
+                    with worker.lock:
+                        worker.busy = False
+        except (EOFError, OSError, pickle.UnpicklingError):
+            pass
+        finally:
+            with worker.lock:
+                worker.ready = False
+                worker.busy = False
+            self._ready.clear()
+            if self.healthy or self.failed:
+                self._ready.set()
+        return became_ready
+
+    def _set_latest(self, result: InferenceResult) -> None:
+        """Publishes a result unless a newer frame was already processed by another worker.
+        :param result: The result.
+        """
+        with self._latest_lock:
+            if self.latest is not None and result.sequence <= self.latest.sequence:
+                METRICS.counter(
+                    "inference_results_outdated_total", "Results older than the latest one"
+                    ).inc()
+                return
+            self.latest = result
+
+    @staticmethod
+    def _send(worker: _Worker, message) -> None:
+        """Sends a message to a worker process, must be called holding the worker lock.
+        :param worker: The worker.
+        :param message: The message to pickle.
+        """
+        pickle.dump(message, worker.process.stdin)
+        worker.process.stdin.flush()
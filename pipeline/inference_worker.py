@@ -0,0 +1,91 @@
+"""
+Entry point of an inference worker process started by the InferenceServer.
+
+The worker receives its configuration and the sequence numbers of the frames to process
+as pickled messages on stdin, reads the frames from the shared input ring buffer, writes
+the annotated frames into its own output ring buffer and answers on stdout.
+
+Usage: python -m pipeline.inference_worker
+"""
+import importlib
+import logging
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+
+from pipeline.thread_config import ThreadConfig, apply_thread_config, pin_current_thread
+
+
+def _load_detector(detector_path: str, detector_kwargs: dict):
+    """Creates the detector from its import path.
+    :param detector_path: The detector class as module:name, e.g. detectors:FaceDetector.
+    :param detector_kwargs: The keyword arguments of the detector.
+    :return: The detector.
+    """
+    module_name, class_name = detector_path.split(":")
+    detector_class = getattr(importlib.import_module(module_name), class_name)
+    return detector_class(**detector_kwargs)
+
+
+# pylint: disable=R0914
+def main() -> None:
+    """Serves inference requests until stdin is closed or a None request is received."""
+    # Libraries may print to stdout, keep the original one for the protocol only
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    protocol_in = sys.stdin.buffer
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s [%(levelname)s] [%(name)s] %(message)s"
+        )
+    logger = logging.getLogger(__name__)
+
+    def send(message: tuple) -> None:
+        pickle.dump(message, protocol_out)
+        protocol_out.flush()
+
+    worker, detector_path, detector_kwargs, input_ring, output_ring, thread_config = (
+        pickle.load(protocol_in)
+        )
+    apply_thread_config(ThreadConfig.from_dict(thread_config))
+    pin_current_thread("inference")
+    logger.info("Inference worker %d loading %s", worker, detector_path)
+    detector = _load_detector(detector_path, detector_kwargs)
+    work = np.empty(input_ring.shape, dtype=input_ring.dtype)
+    send(("ready",))
+
+    try:
+        while True:
+            sequence = pickle.load(protocol_in)
+            if sequence is None:
+                break
+
+            frame = input_ring.get(sequence)
+            if frame is not None:
+                np.copyto(work, frame.image)
+            if frame is None or not input_ring.is_current(frame):
+                # The writer reused the slot before the frame could be copied
+                send(("skipped", sequence))
+                continue
+
+            start = time.perf_counter()
+            detected, img, center, metric = detector.predict(work)
+            inference_time = time.perf_counter() - start
+            output_ring.write(img, sequence)
+            send((
+                "result", sequence, bool(detected), tuple(int(value) for value in center),
+                float(metric), inference_time,
+                ))
+    except EOFError:
+        pass
+    finally:
+        input_ring.close()
+        output_ring.close()
+    logger.info("Inference worker %d stopped", worker)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Module for configuring the library thread pools and the CPU affinity of the pipeline stages."""
+from dataclasses import dataclass, field
+import logging
+import os
+import sys
+from typing import Dict, Optional, Tuple
+
+import cv2
+
+# Stages a set of CPUs can be assigned to. The ui stage also runs the in-process detection,
+# inference covers the detector loader, whose thread pools inherit its CPUs, and the
+# inference worker processes.
+STAGES = ("ui", "decode", "recorder", "inference")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ThreadConfig:
+    """Dataclass for the thread pool sizes of the libraries and the CPUs of every stage.
+    None keeps the default of the library, an empty affinity keeps the stage on all CPUs."""
+
+    tf_intra_op: Optional[int] = None
+    tf_inter_op: Optional[int] = None
+    opencv_threads: Optional[int] = None
+    affinity: Dict[str, Tuple[int, ...]] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "ThreadConfig":
+        """Creates the configuration from its settings representation.
+        :param data: The dictionary stored in the settings, None for the defaults.
+        :return: The configuration.
+        """
+        data = data or {}
+        affinity = {
+            stage: tuple(int(cpu) for cpu in cpus)
+            for stage, cpus in (data.get("affinity") or {}).items()
+            if stage in STAGES and cpus
+        }
+        return cls(
+            data.get("tf_intra_op"), data.get("tf_inter_op"), data.get("opencv_threads"), affinity
+            )
+
+    def to_dict(self) -> dict:
+        """Returns the settings representation of the configuration."""
+        return {
+            "tf_intra_op": self.tf_intra_op,
+            "tf_inter_op": self.tf_inter_op,
+            "opencv_threads": self.opencv_threads,
+            "affinity": {stage: list(cpus) for stage, cpus in self.affinity.items()},
+        }
+
+
+_active_config = ThreadConfig()
+# The configuration the TensorFlow thread pools were sized for
+_tensorflow_config: Optional[ThreadConfig] = None # pylint: disable=C0103
+
+
+def active_thread_config() -> ThreadConfig:
+    """Returns the configuration applied to the process."""
+    return _active_config
+
+
+def apply_thread_config(config: ThreadConfig) -> None:
+    """Sizes the thread pools of OpenCV and records the configuration for pin_current_thread
+    and import_tensorflow. The TensorFlow pools are sized when it is first imported, so
+    processes running only OpenCV or Mediapipe models never load it.
+    Mediapipe exposes no thread settings, its graph threads inherit the CPUs of the stage
+    creating the detector.
+    :param config: The configuration.
+    """
+    global _active_config # pylint: disable=W0603
+    _active_config = config
+
+    if config.opencv_threads is not None:
+        cv2.setNumThreads(int(config.opencv_threads))
+    if "tensorflow" in sys.modules:
+        import_tensorflow()
+    logger.info("Thread configuration applied: %s", config.to_dict())
+
+
+def import_tensorflow():
+    """Imports TensorFlow, sizing its thread pools from the applied configuration the first
+    time. Import it through this function, the pools must be sized before TensorFlow runs its
+    first operation.
+    :return: The tensorflow module.
+    """
+    global _tensorflow_config # pylint: disable=W0603
+    import tensorflow as tf # pylint: disable=C0415
+    config = _active_config
+    if _tensorflow_config is config:
+        return tf
+    _tensorflow_config = config
+    try:
+        if config.tf_intra_op is not None:
+            tf.config.threading.set_intra_op_parallelism_threads(int(config.tf_intra_op))
+        if config.tf_inter_op is not None:
+            tf.config.threading.set_inter_op_parallelism_threads(int(config.tf_inter_op))
+    except RuntimeError as exc:
+        logger.warning("TensorFlow thread pools already initialized: %s", exc)
+    return tf
+
+
+def pin_current_thread(stage: str) -> None:
+    """Restricts the calling thread to the CPUs configured for its stage.
+    Threads started afterwards by the calling thread inherit its CPUs.
+    :param stage: The stage of the calling thread, one of STAGES.
+    """
+    cpus = _active_config.affinity.get(stage)
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        # On Linux the affinity of pid 0 is the one of the calling thread only
+        os.sched_setaffinity(0, cpus)
+    except (OSError, ValueError) as exc:
+        logger.warning("Could not pin the %s stage to CPUs %s: %s", stage, cpus, exc)
@@ -1,3 +1,4 @@
 """Module for tracking algorithms."""
+from .acquisition import AcquisitionState, TargetAcquisition
 from .face_tracker import FaceTracker
 from .human_tracker import HumanTracker
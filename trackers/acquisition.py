@@ -0,0 +1,168 @@
+"""Module for the TargetAcquisition class."""
+
+from enum import Enum
+import logging
+import math
+import time
+from typing import Callable, List, Optional
+
+from monitoring import METRICS
+
+
+class AcquisitionState(Enum):
+    """States of the acquisition of the tracked target."""
+
+    SEARCHING = "searching"
+    CANDIDATE = "candidate"
+    CONFIRMED = "confirmed"
+    LOST = "lost"
+
+
+# pylint: disable=R0902
+class TargetAcquisition:
+    """
+    Time-based state machine deciding whether a target is acquired from the detection results.
+    A detection makes the target a candidate, which is confirmed once it was seen long and
+    consistently enough, a confirmed target is lost when it is not detected for a while and
+    the search starts over when it does not come back. Durations are measured in seconds,
+    so the decisions do not change with the frame rate, and every update takes constant time.
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        *,
+        confirm_time: float = 0.3,
+        confirm_confidence: float = 0.5,
+        drop_time: float = 0.5,
+        lose_time: float = 2.0,
+        search_time: float = 5.0,
+        time_constant: float = 0.5,
+    ) -> None:
+        """
+        Initialize the state machine in the searching state.
+        :param confirm_time: seconds a candidate must be tracked before it is confirmed
+        :param confirm_confidence: minimum confidence average to confirm a candidate
+        :param drop_time: seconds without detection after which a candidate is dropped
+        :param lose_time: seconds without detection after which a confirmed target is lost
+        :param search_time: seconds a lost target is waited for before searching again
+        :param time_constant: seconds over which the confidence average decays
+        """
+        self.confirm_time = confirm_time
+        self.confirm_confidence = confirm_confidence
+        self.drop_time = drop_time
+        self.lose_time = lose_time
+        self.search_time = search_time
+        self.time_constant = time_constant
+        self._listeners: List[Callable[[AcquisitionState], None]] = []
+        self.logger = logging.getLogger(__name__)
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Forget the target and start searching again, without notifying the listeners.
+        """
+        self.state = AcquisitionState.SEARCHING
+        self.state_since: Optional[float] = None
+        self.confidence = 0.0
+        self.frames = 0 # results since entering the state
+        self.detections = 0 # positive results since entering the state
+        self.last_detection: Optional[float] = None
+        self._last_update: Optional[float] = None
+
+    def add_listener(self, listener: Callable[[AcquisitionState], None]) -> None:
+        """
+        Register a callable notified with the new state on every transition,
+        from the thread calling update.
+        :param listener: the callable
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[AcquisitionState], None]) -> None:
+        """
+        Unregister a listener.
+        :param listener: the callable
+        """
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def update(
+        self, detected: bool, confidence: Optional[float] = None, now: Optional[float] = None
+    ) -> AcquisitionState:
+        """
+        Feed one detection result to the state machine.
+        :param detected: whether the target was detected
+        :param confidence: the detection score, the detection itself counts as 1 if not given
+        :param now: the time of the result in seconds, time.monotonic() if not given
+        :return: the state after the result
+        """
+        now = time.monotonic() if now is None else now
+        if self.state_since is None:
+            self.state_since = now
+
+        # Exponential average weighted by the elapsed time instead of the number of results
+        if self._last_update is None:
+            weight = 1.0
+        else:
+            weight = 1 - math.exp(-max(now - self._last_update, 0.0) / self.time_constant)
+        sample = (1.0 if confidence is None else confidence) if detected else 0.0
+        self.confidence += weight * (sample - self.confidence)
+        self._last_update = now
+
+        self.frames += 1
+        if detected:
+            self.detections += 1
+            self.last_detection = now
+        since_detection = math.inf if self.last_detection is None else now - self.last_detection
+
+        state = self._next_state(detected, since_detection, now - self.state_since)
+        if state is not None:
+            self._transition(state, now)
+        return self.state
+
+    def _next_state(
+        self, detected: bool, since_detection: float, in_state: float
+    ) -> Optional[AcquisitionState]:
+        """
+        Decide the transition caused by a detection result.
+        :param detected: whether the target was detected
+        :param since_detection: seconds since the last detection
+        :param in_state: seconds since entering the current state
+        :return: the state to enter, None to stay in the current one
+        """
+        state = None
+        if self.state is AcquisitionState.SEARCHING:
+            if detected:
+                state = AcquisitionState.CANDIDATE
+        elif self.state is AcquisitionState.CANDIDATE:
+            if since_detection >= self.drop_time:
+                state = AcquisitionState.SEARCHING
+            elif in_state >= self.confirm_time and self.confidence >= self.confirm_confidence:
+                state = AcquisitionState.CONFIRMED
+        elif self.state is AcquisitionState.CONFIRMED:
+            if since_detection >= self.lose_time:
+                state = AcquisitionState.LOST
+        elif detected:
+            state = AcquisitionState.CANDIDATE
+        elif in_state >= self.search_time:
+            state = AcquisitionState.SEARCHING
+        return state
+
+    def _transition(self, state: AcquisitionState, now: float) -> None:
+        """
+        Enter a new state, restart its counters and notify the listeners.
+        :param state: the new state
+        :param now: the time of the transition in seconds
+        """
+        self.logger.info(
+            "Target acquisition %s -> %s after %.1f s, %d/%d detections, confidence %.2f",
+            self.state.value, state.value, now - self.state_since, self.detections, self.frames,
+            self.confidence
+            )
+        METRICS.counter("acquisition_transitions_total", state=state.value).inc()
+        self.state = state
+        self.state_since = now
+        self.frames = 0
+        self.detections = 0
+        for listener in list(self._listeners):
+            listener(state)
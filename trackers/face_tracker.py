@@ -4,6 +4,8 @@ from typing import Tuple
 
 import numpy as np
 
+from monitoring import METRICS
+
 from .base_tracker import BaseTracker, TrackerValues
 
 
@@ -71,6 +73,9 @@ class FaceTracker(BaseTracker):
             values.yaw_velocity
             )
 
+        METRICS.gauge("tracker_error", tracker="face", axis="x").set(values.current_error_x)
+        METRICS.gauge("tracker_error", tracker="face", axis="y").set(values.current_error_y)
+
         return (values.current_error_x, values.current_error_y), commands
 
     def _calculate_yaw_velocity(self, current_error_x: int, previous_error_x: int) -> int:
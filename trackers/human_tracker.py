@@ -5,6 +5,8 @@ from typing import Tuple
 
 import numpy as np
 
+from monitoring import METRICS
+
 from .base_tracker import BaseTracker, TrackerValues
 
 
@@ -84,6 +86,10 @@ class HumanTracker(BaseTracker):
             values.yaw_velocity
             )
 
+        METRICS.gauge("tracker_error", tracker="human", axis="x").set(values.current_error_x)
+        METRICS.gauge("tracker_error", tracker="human", axis="y").set(values.current_error_y)
+        METRICS.gauge("tracker_error", tracker="human", axis="z").set(values.current_error_z)
+
         return (values.current_error_x, values.current_error_y, values.current_error_z), commands
 
     def _calculate_yaw_velocity(self, current_error_x: int, previous_error_x: int) -> int: